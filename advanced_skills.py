@@ -3,15 +3,15 @@ Advanced Skills Module for World-Class Voice Assistant
 Implements weather, calculations, timers, news, web search, and more
 """
 
-import requests
 import json
 import re
 from datetime import datetime, timedelta
-import threading
-import time
-import math
 from typing import Optional, Dict, Any
-import wikipedia
+
+# Heavy dependencies (requests, wikipedia) are imported inside the services that
+# use them so that importing this module stays cheap; see skill_registry.py.
+# Weather and Wikipedia requests go through weather_service.py and
+# knowledge_service.py, which add connection pooling and caching.
 
 # ============================================================================
 # WEATHER SKILL
@@ -20,10 +20,9 @@ import wikipedia
 def get_weather(city: str = "Delhi") -> str:
     """Get current weather for a city"""
     try:
-        # Using wttr.in - no API key needed
-        url = f"https://wttr.in/{city}?format=j1"
-        response = requests.get(url, timeout=5)
-        data = response.json()
+        from weather_service import get_weather_service
+        # Using wttr.in - no API key needed; cached and shared with the forecast
+        data = get_weather_service().get_wttr(city)
         
         current = data['current_condition'][0]
         temp_c = current['temp_C']
@@ -38,9 +37,8 @@ def get_weather(city: str = "Delhi") -> str:
 def get_weather_forecast(city: str = "Delhi", days: int = 3) -> str:
     """Get weather forecast for next few days"""
     try:
-        url = f"https://wttr.in/{city}?format=j1"
-        response = requests.get(url, timeout=5)
-        data = response.json()
+        from weather_service import get_weather_service
+        data = get_weather_service().get_wttr(city)
         
         forecast_text = f"Weather forecast for {city}:\n"
         for i, day in enumerate(data['weather'][:days]):
@@ -59,34 +57,12 @@ def get_weather_forecast(city: str = "Delhi", days: int = 3) -> str:
 # ============================================================================
 
 def calculate(expression: str) -> str:
-    """Perform mathematical calculations"""
+    """Perform mathematical calculations (sandboxed, see safe_math.py)"""
+    from safe_math import evaluate_spoken, CalculationError
     try:
-        # Clean the expression
-        expression = expression.lower()
-        expression = expression.replace('x', '*').replace('×', '*').replace('÷', '/')
-        expression = expression.replace('plus', '+').replace('minus', '-')
-        expression = expression.replace('times', '*').replace('divided by', '/')
-        expression = expression.replace('squared', '**2').replace('cubed', '**3')
-        
-        # Handle special functions
-        if 'square root' in expression or 'sqrt' in expression:
-            num = re.search(r'(\d+\.?\d*)', expression)
-            if num:
-                result = math.sqrt(float(num.group(1)))
-                return f"The square root is {result}"
-        
-        if 'factorial' in expression:
-            num = re.search(r'(\d+)', expression)
-            if num:
-                result = math.factorial(int(num.group(1)))
-                return f"The factorial is {result}"
-        
-        # Extract numbers and operators
-        clean_expr = re.sub(r'[^0-9+\-*/().\s]', '', expression)
-        
-        # Evaluate safely
-        result = eval(clean_expr, {"__builtins__": {}}, {"math": math})
-        return f"The answer is {result}"
+        return evaluate_spoken(expression)
+    except CalculationError as e:
+        return f"Sorry. {e}."
     except Exception as e:
         return "Sorry, I couldn't calculate that. Please try again."
 
@@ -121,28 +97,17 @@ def convert_units(value: float, from_unit: str, to_unit: str) -> str:
 # TIMER & REMINDER SKILL
 # ============================================================================
 
-active_timers = {}
-
 def set_timer(duration_minutes: int, message: str = "Timer finished") -> str:
     """Set a timer"""
-    timer_id = len(active_timers) + 1
-    
-    def timer_callback():
-        time.sleep(duration_minutes * 60)
-        print(f"\n⏰ TIMER ALERT: {message}")
-        # You can add TTS here to speak the message
-        if timer_id in active_timers:
-            del active_timers[timer_id]
+    from scheduler import get_scheduler
+    task = get_scheduler().schedule_in(duration_minutes * 60, message, kind="timer")
     
-    thread = threading.Thread(target=timer_callback, daemon=True)
-    thread.start()
-    active_timers[timer_id] = {'duration': duration_minutes, 'message': message}
-    
-    return f"Timer set for {duration_minutes} minutes: {message}"
+    return f"Timer {task['id']} set for {duration_minutes} minutes: {message}"
 
 def set_reminder(time_str: str, message: str) -> str:
     """Set a reminder for a specific time"""
     try:
+        from scheduler import get_scheduler
         # Parse time (simple format: HH:MM)
         reminder_time = datetime.strptime(time_str, "%H:%M").time()
         now = datetime.now()
@@ -151,19 +116,43 @@ def set_reminder(time_str: str, message: str) -> str:
         if reminder_datetime < now:
             reminder_datetime += timedelta(days=1)
         
-        delay_seconds = (reminder_datetime - now).total_seconds()
-        
-        def reminder_callback():
-            time.sleep(delay_seconds)
-            print(f"\n🔔 REMINDER: {message}")
+        task = get_scheduler().schedule(reminder_datetime, message, kind="reminder")
         
-        thread = threading.Thread(target=reminder_callback, daemon=True)
-        thread.start()
-        
-        return f"Reminder set for {time_str}: {message}"
+        return f"Reminder {task['id']} set for {time_str}: {message}"
     except Exception as e:
         return "Sorry, I couldn't set that reminder. Use format HH:MM (e.g., 14:30)"
 
+def list_scheduled(kind: Optional[str] = None) -> str:
+    """List pending timers and/or reminders"""
+    from scheduler import get_scheduler
+    tasks = get_scheduler().list_tasks(kind)
+    label = f"{kind}s" if kind else "timers or reminders"
+    
+    if not tasks:
+        return f"You have no active {label}"
+    
+    parts = []
+    for task in tasks[:5]:
+        due = datetime.fromtimestamp(task['due']).strftime("%I:%M %p")
+        parts.append(f"{task['kind']} {task['id']} at {due}: {task['message']}")
+    more = f" and {len(tasks) - 5} more" if len(tasks) > 5 else ""
+    return f"You have {len(tasks)} active {label}: " + "; ".join(parts) + more
+
+def cancel_scheduled(task_id: int) -> str:
+    """Cancel a timer or reminder by ID"""
+    from scheduler import get_scheduler
+    if get_scheduler().cancel(task_id):
+        return f"Cancelled {task_id}"
+    return f"I couldn't find an active timer or reminder {task_id}"
+
+def snooze_scheduled(task_id: int, minutes: int = 5) -> str:
+    """Push a timer or reminder back by a few minutes"""
+    from scheduler import get_scheduler
+    task = get_scheduler().snooze(task_id, minutes * 60)
+    if task:
+        return f"Snoozed {task['kind']} {task_id} for {minutes} minutes"
+    return f"I couldn't find an active timer or reminder {task_id}"
+
 # ============================================================================
 # NEWS SKILL
 # ============================================================================
@@ -193,15 +182,16 @@ def get_news(category: str = "general", country: str = "in") -> str:
 # WEB SEARCH & INFORMATION SKILL
 # ============================================================================
 
-def search_wikipedia(query: str) -> str:
-    """Search Wikipedia for information"""
+def search_wikipedia(query: str, lang: str = "en") -> str:
+    """Search Wikipedia for information (cached, see knowledge_service.py)"""
     try:
-        wikipedia.set_lang("en")
-        summary = wikipedia.summary(query, sentences=2)
-        return summary
-    except wikipedia.exceptions.DisambiguationError as e:
-        return f"Multiple results found. Please be more specific. Options: {', '.join(e.options[:5])}"
-    except wikipedia.exceptions.PageError:
+        from knowledge_service import get_knowledge_service
+        result = get_knowledge_service().lookup(query, lang)
+        
+        if result["kind"] == "summary":
+            return result["summary"]
+        if result["kind"] == "disambiguation":
+            return f"Multiple results found. Please be more specific. Options: {', '.join(result['options'][:5])}"
         return f"Sorry, I couldn't find information about '{query}'"
     except Exception as e:
         return "Sorry, I couldn't search for that information"
@@ -250,8 +240,8 @@ def get_fun_fact() -> str:
 # MUSIC & VIDEO PLAYBACK SKILL
 # ============================================================================
 
-import webbrowser
 import urllib.parse
+from browser_launcher import open_url
 
 def play_music(query: str, platform: str = "youtube") -> str:
     """Play music/video on YouTube, Spotify, or other platforms"""
@@ -264,66 +254,61 @@ def play_music(query: str, platform: str = "youtube") -> str:
             # Better approach: Use a direct link that searches and plays
             youtube_search_url = f"https://www.youtube.com/results?search_query={query_encoded}"
             
-            # Alternative: Try to get video ID and play directly
+            # Resolve the first video ID (cached, stops reading at the first match)
             try:
-                import requests
-                # Search YouTube and get first video ID
-                search_url = f"https://www.youtube.com/results?search_query={query_encoded}"
-                response = requests.get(search_url, timeout=5)
+                from video_resolver import get_video_resolver
+                resolver = get_video_resolver()
+                video_id = resolver.resolve(query)
                 
-                # Extract first video ID from search results
-                import re
-                video_id_match = re.search(r'"videoId":"([^"]+)"', response.text)
-                
-                if video_id_match:
-                    video_id = video_id_match.group(1)
+                if video_id:
                     # Direct play URL
                     youtube_url = f"https://www.youtube.com/watch?v={video_id}&autoplay=1"
-                    webbrowser.open(youtube_url)
+                    open_url(youtube_url)
+                    resolver.note_played(query)
                     return f"Playing '{query}' on YouTube"
                 else:
                     # Fallback to search
-                    webbrowser.open(youtube_search_url)
+                    open_url(youtube_search_url)
                     return f"Searching '{query}' on YouTube - click the first result to play"
-            except:
-                # If API fails, use search URL
-                webbrowser.open(youtube_search_url)
+            except Exception:
+                # If resolution fails, use search URL
+                open_url(youtube_search_url)
                 return f"Opening '{query}' on YouTube"
         
         elif platform == "spotify":
             # Spotify - Direct search
             spotify_url = f"https://open.spotify.com/search/{query_encoded}"
-            webbrowser.open(spotify_url)
+            open_url(spotify_url)
             return f"Searching '{query}' on Spotify - click to play"
         
         elif platform == "music" or platform == "apple":
             # Apple Music
             music_url = f"https://music.apple.com/search?term={query_encoded}"
-            webbrowser.open(music_url)
+            open_url(music_url)
             return f"Searching '{query}' on Apple Music"
         
         elif platform == "soundcloud":
             # SoundCloud
             soundcloud_url = f"https://soundcloud.com/search?q={query_encoded}"
-            webbrowser.open(soundcloud_url)
+            open_url(soundcloud_url)
             return f"Searching '{query}' on SoundCloud"
         
         elif platform == "gaana":
             # Gaana (Indian music platform)
             gaana_url = f"https://gaana.com/search/{query_encoded}"
-            webbrowser.open(gaana_url)
+            open_url(gaana_url)
             return f"Searching '{query}' on Gaana"
         
         elif platform == "jiosaavn" or platform == "saavn":
             # JioSaavn (Indian music platform)
             saavn_url = f"https://www.jiosaavn.com/search/{query_encoded}"
-            webbrowser.open(saavn_url)
+            open_url(saavn_url)
             return f"Searching '{query}' on JioSaavn"
         
         else:
             # Default to YouTube with auto-play attempt
             youtube_search_url = f"https://www.youtube.com/results?search_query={query_encoded}"
-            webbrowser.open(youtube_search_url)
+            open_url(youtube_search_url)
             return f"Playing '{query}' on YouTube"
             
     except Exception as e:
@@ -364,106 +349,174 @@ def open_application(app_name: str) -> str:
         return f"Sorry, I couldn't open {app_name}"
 
 # ============================================================================
-# SKILL DETECTOR
+# SYSTEM STATUS SKILL
 # ============================================================================
 
-def detect_and_execute_skill(user_input: str) -> Optional[str]:
-    """Detect which skill to use and execute it"""
-    text = user_input.lower()
-    
-    # Music/Video Playback - HIGH PRIORITY
-    if any(word in text for word in ["play", "listen", "song", "music", "video"]):
-        # Detect platform
-        platform = "youtube"  # Default
-        if "spotify" in text:
-            platform = "spotify"
-        elif "apple music" in text or "itunes" in text:
-            platform = "music"
-        elif "soundcloud" in text:
-            platform = "soundcloud"
-        elif "gaana" in text:
-            platform = "gaana"
-        elif "jiosaavn" in text or "saavn" in text:
-            platform = "jiosaavn"
-        
-        # Extract song/video name
-        query = text
-        # Remove platform names
-        query = re.sub(r'(on |from )?(youtube|spotify|apple music|soundcloud|gaana|jiosaavn|saavn)', '', query)
-        # Remove command words
-        query = re.sub(r'^(play|listen to|listen|show me|find|search for|search)\s+', '', query)
-        query = query.strip()
-        
-        if query:
-            return play_music(query, platform)
-    
-    # Weather
-    if any(word in text for word in ["weather", "temperature", "forecast"]):
-        city_match = re.search(r'in ([a-z\s]+)', text)
-        city = city_match.group(1).strip() if city_match else "Delhi"
-        
-        if "forecast" in text:
-            return get_weather_forecast(city)
-        return get_weather(city)
-    
-    # Calculations
-    if any(word in text for word in ["calculate", "what is", "plus", "minus", "times", "divided", "multiply"]):
-        if any(op in text for op in ['+', '-', '*', '/', 'plus', 'minus', 'times', 'divided']):
-            return calculate(text)
-    
-    # Unit conversion
-    if "convert" in text:
-        match = re.search(r'(\d+\.?\d*)\s*(\w+)\s*to\s*(\w+)', text)
-        if match:
-            value, from_unit, to_unit = match.groups()
-            return convert_units(float(value), from_unit, to_unit)
+def get_system_status(about_self: bool = False) -> str:
+    """System or assistant resource use from the background sampler"""
+    try:
+        from system_monitor import get_system_monitor, format_system_status, format_self_report
+        monitor = get_system_monitor()
+        if about_self:
+            return format_self_report(monitor.self_report())
+        return format_system_status(monitor.latest())
+    except Exception as e:
+        return "Sorry, couldn't fetch system information"
+
+# ============================================================================
+# SKILL HANDLERS
+# ============================================================================
+# Each handler receives the lowercased user text once its trigger patterns in
+# skill_registry.py have matched, and returns None to let the next skill try.
+
+def handle_music(text: str) -> Optional[str]:
+    """Play music or video on the requested platform"""
+    # Detect platform
+    platform = "youtube"  # Default
+    if "spotify" in text:
+        platform = "spotify"
+    elif "apple music" in text or "itunes" in text:
+        platform = "music"
+    elif "soundcloud" in text:
+        platform = "soundcloud"
+    elif "gaana" in text:
+        platform = "gaana"
+    elif "jiosaavn" in text or "saavn" in text:
+        platform = "jiosaavn"
     
-    # Timer
-    if "timer" in text or "set a timer" in text:
-        match = re.search(r'(\d+)\s*minute', text)
-        if match:
-            minutes = int(match.group(1))
-            message_match = re.search(r'for (.+)', text)
-            message = message_match.group(1) if message_match else "Timer"
-            return set_timer(minutes, message)
+    # Extract song/video name
+    query = text
+    # Remove platform names
+    query = re.sub(r'(on |from )?(youtube|spotify|apple music|soundcloud|gaana|jiosaavn|saavn)', '', query)
+    # Remove command words
+    query = re.sub(r'^(play|listen to|listen|show me|find|search for|search)\s+', '', query)
+    query = query.strip()
     
-    # Reminder
-    if "remind" in text:
-        time_match = re.search(r'at (\d{1,2}):(\d{2})', text)
-        if time_match:
-            time_str = f"{time_match.group(1)}:{time_match.group(2)}"
-            message_match = re.search(r'to (.+?) at', text)
-            message = message_match.group(1) if message_match else "Reminder"
-            return set_reminder(time_str, message)
+    if query:
+        return play_music(query, platform)
+    return None
+
+def handle_weather(text: str) -> Optional[str]:
+    """Answer current weather or forecast questions"""
+    city_match = re.search(r'in ([a-z\s]+)', text)
+    city = city_match.group(1).strip() if city_match else "Delhi"
     
-    # News
-    if "news" in text:
-        category = "general"
-        if "technology" in text or "tech" in text:
-            category = "technology"
-        elif "sports" in text:
-            category = "sports"
-        elif "business" in text:
-            category = "business"
-        return get_news(category)
+    if "forecast" in text:
+        return get_weather_forecast(city)
+    return get_weather(city)
+
+def handle_calculation(text: str) -> Optional[str]:
+    """Evaluate spoken arithmetic"""
+    if any(op in text for op in ['+', '-', '*', '/', 'plus', 'minus', 'times', 'divided']):
+        return calculate(text)
+    return None
+
+def handle_unit_conversion(text: str) -> Optional[str]:
+    """Convert between units"""
+    match = re.search(r'(\d+\.?\d*)\s*(\w+)\s*to\s*(\w+)', text)
+    if match:
+        value, from_unit, to_unit = match.groups()
+        return convert_units(float(value), from_unit, to_unit)
+    return None
+
+def _manage_scheduled(text: str, kind: str) -> Optional[str]:
+    """Handle list/cancel/snooze commands for timers and reminders"""
+    id_match = re.search(r'(?:timer|reminder)\s*(?:number\s*)?(\d+)', text)
     
-    # Wikipedia/Information
-    if any(phrase in text for phrase in ["who is", "what is", "tell me about", "information about"]):
-        query = re.sub(r'(who is|what is|tell me about|information about)\s*', '', text)
-        return search_wikipedia(query)
+    if any(word in text for word in ["list", "show", "what", "active", "pending"]):
+        return list_scheduled(kind)
     
-    # Jokes
-    if "joke" in text or "make me laugh" in text:
-        return tell_joke()
+    if any(word in text for word in ["cancel", "stop", "delete", "remove"]):
+        if id_match:
+            return cancel_scheduled(int(id_match.group(1)))
+        tasks = get_scheduled_ids(kind)
+        if len(tasks) == 1:
+            return cancel_scheduled(tasks[0])
+        return f"Which {kind}? Say its number, for example 'cancel {kind} 2'"
     
-    # Fun facts
-    if "fun fact" in text or "interesting fact" in text:
-        return get_fun_fact()
+    if "snooze" in text:
+        minutes_match = re.search(r'for (\d+)\s*minute', text)
+        minutes = int(minutes_match.group(1)) if minutes_match else 5
+        if id_match:
+            return snooze_scheduled(int(id_match.group(1)), minutes)
+        tasks = get_scheduled_ids(kind)
+        if tasks:
+            return snooze_scheduled(tasks[0], minutes)
+        return f"You have no active {kind}s"
     
-    # Open application
-    if "open" in text:
-        app_match = re.search(r'open\s+(\w+)', text)
-        if app_match:
-            return open_application(app_match.group(1))
+    return None
+
+def get_scheduled_ids(kind: str) -> list:
+    """IDs of pending tasks of one kind, soonest first"""
+    from scheduler import get_scheduler
+    return [task['id'] for task in get_scheduler().list_tasks(kind)]
+
+def handle_timer(text: str) -> Optional[str]:
+    """Set, list, cancel or snooze a countdown timer"""
+    match = re.search(r'(\d+)\s*minute', text)
+    if "set" not in text or not match:
+        managed = _manage_scheduled(text, "timer")
+        if managed:
+            return managed
     
-    return None  # No skill matched
+    if match:
+        minutes = int(match.group(1))
+        message_match = re.search(r'for (.+)', text)
+        message = message_match.group(1) if message_match else "Timer"
+        return set_timer(minutes, message)
+    return None
+
+def handle_reminder(text: str) -> Optional[str]:
+    """Set, list, cancel or snooze a reminder for a clock time"""
+    time_match = re.search(r'at (\d{1,2}):(\d{2})', text)
+    if time_match:
+        time_str = f"{time_match.group(1)}:{time_match.group(2)}"
+        message_match = re.search(r'to (.+?) at', text)
+        message = message_match.group(1) if message_match else "Reminder"
+        return set_reminder(time_str, message)
+    return _manage_scheduled(text, "reminder")
+
+def handle_system_status(text: str) -> Optional[str]:
+    """Report system status, or the assistant's own resource use"""
+    about_self = any(phrase in text for phrase in ["you using", "your memory", "your cpu", "your resource", "assistant"])
+    return get_system_status(about_self)
+
+def handle_news(text: str) -> Optional[str]:
+    """Read out news headlines"""
+    category = "general"
+    if "technology" in text or "tech" in text:
+        category = "technology"
+    elif "sports" in text:
+        category = "sports"
+    elif "business" in text:
+        category = "business"
+    return get_news(category)
+
+def handle_wikipedia(text: str) -> Optional[str]:
+    """Answer who/what questions from Wikipedia"""
+    query = re.sub(r'(who is|what is|tell me about|information about)\s*', '', text)
+    return search_wikipedia(query)
+
+def handle_joke(text: str) -> Optional[str]:
+    """Tell a joke"""
+    return tell_joke()
+
+def handle_fun_fact(text: str) -> Optional[str]:
+    """Share a fun fact"""
+    return get_fun_fact()
+
+def handle_open_application(text: str) -> Optional[str]:
+    """Open a desktop application"""
+    app_match = re.search(r'open\s+(\w+)', text)
+    if app_match:
+        return open_application(app_match.group(1))
+    return None
+
+# ============================================================================
+# SKILL DETECTOR
+# ============================================================================
+
+def detect_and_execute_skill(user_input: str) -> Optional[str]:
+    """Detect which skill to use and execute it"""
+    from skill_registry import get_skill_registry
+    return get_skill_registry().dispatch(user_input)
@@ -21,6 +21,12 @@ import webbrowser
 import urllib.parse
 import subprocess
 import platform
+import sys
+
+# Shared modules (booking flow, sessions) live in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from booking_nodes import run_booking_turn
+from session_manager import get_session_manager
 
 load_dotenv()
 
@@ -34,7 +40,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-executor = ThreadPoolExecutor(max_workers=3)
+# Turns block on the LLM/network; one thread per in-flight turn across all users
+executor = ThreadPoolExecutor(max_workers=32)
 
 class ConversationState(TypedDict):
     messages: Annotated[list, operator.add]
@@ -95,6 +102,35 @@ def process_with_llm_sync(messages):
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def process_turn_sync(session_id: str, text: str):
+    """One turn for a session: the booking flow first, else the LLM with the session's history"""
+    with get_session_manager().session(session_id) as session:
+        state = {
+            "user_input": text,
+            "response_to_speak": "",
+            "skip_processing": False,
+            "language": session.language,
+            "user_id": session.user_id,
+            "session_id": session.session_id,
+            "client_opens_urls": True,  # never launch a browser on the server
+            **session.booking_state()
+        }
+        state = run_booking_turn(state)
+        session.update_booking(state)
+        
+        response_text = state.get("response_to_speak")
+        if not response_text:
+            messages = [HumanMessage(content=turn["content"]) if turn["role"] == "user" else AIMessage(content=turn["content"])
+                        for turn in session.history[-10:]]
+            messages.append(HumanMessage(content=text))
+            llm_result = process_with_llm_sync(messages)
+            if not llm_result["success"]:
+                return llm_result
+            response_text = llm_result["content"]
+        
+        session.add_turn(text, response_text)
+        return {"success": True, "content": response_text, "urls": state.get("booking_urls") or []}
+
 def text_to_speech_sync(text: str):
     try:
         engine = pyttsx3.init()
@@ -121,6 +157,7 @@ def text_to_speech_sync(text: str):
 async def process_audio(audio_data: dict):
     try:
         audio_bytes = base64.b64decode(audio_data["audio"])
+        session_id = audio_data.get("session_id") or get_session_manager().new_session_id()
         
         loop = asyncio.get_event_loop()
         transcription_result = await loop.run_in_executor(executor, process_audio_data, audio_bytes)
@@ -139,24 +176,29 @@ async def process_audio(audio_data: dict):
                 "audio": audio_base64,
                 "action": command_result.get("action"),
                 "url": command_result.get("url"),
-                "song_name": command_result.get("song_name")
+                "song_name": command_result.get("song_name"),
+                "session_id": session_id
             }
         
-        messages = [HumanMessage(content=text)]
-        llm_result = await loop.run_in_executor(executor, process_with_llm_sync, messages)
+        turn_result = await loop.run_in_executor(executor, process_turn_sync, session_id, text)
         
-        if not llm_result["success"]:
-            raise HTTPException(status_code=500, detail=llm_result["error"])
+        if not turn_result["success"]:
+            raise HTTPException(status_code=500, detail=turn_result["error"])
         
-        response_text = llm_result["content"]
+        response_text = turn_result["content"]
         
         audio_base64 = await loop.run_in_executor(executor, text_to_speech_sync, response_text)
         
-        return {
+        result = {
             "transcription": text,
             "response": response_text,
-            "audio": audio_base64
+            "audio": audio_base64,
+            "session_id": session_id
         }
+        if turn_result["urls"]:
+            # Booking sites are opened by the client, like the open_url commands
+            result.update({"action": "open_urls", "urls": turn_result["urls"]})
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -174,9 +216,19 @@ async def text_to_speech(data: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.delete("/api/session/{session_id}")
+async def end_session(session_id: str):
+    get_session_manager().end(session_id)
+    return {"status": "ended"}
+
+@app.on_event("shutdown")
+async def flush_sessions():
+    # Sessions in memory are written out so they resume after a restart
+    get_session_manager().flush()
+
 @app.get("/api/health")
 async def health_check():
-    return {"status": "ok"}
+    return {"status": "ok", "sessions": get_session_manager().live_count()}
 
 if __name__ == "__main__":
     import uvicorn
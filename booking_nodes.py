@@ -5,11 +5,9 @@ These nodes handle the travel booking flow
 
 from typing import Dict
 from datetime import datetime
-import dateparser
-from travel_booking import get_booking_service
-from travel_rag import get_travel_rag
 
-# Services will be initialized lazily
+# Services will be initialized lazily: travel_booking (LangChain)
+# and travel_rag (FAISS, embeddings) are imported inside the nodes that use them
 
 def detect_booking_intent_node(state: Dict) -> Dict:
     """Detect if user wants to book travel or is providing missing info"""
@@ -36,6 +34,9 @@ def detect_booking_intent_node(state: Dict) -> Dict:
                 return state
     
     # No booking intent detected
+    if state.get("booking_step") == "collecting_info":
+        from booking_prefetch import DEFAULT_SESSION_ID, get_booking_prefetcher
+        get_booking_prefetcher().drop(state.get("session_id") or DEFAULT_SESSION_ID)
     state["booking_intent"] = None
     state["booking_step"] = "initial"
     return state
@@ -43,6 +44,7 @@ def detect_booking_intent_node(state: Dict) -> Dict:
 def extract_entities_node(state: Dict) -> Dict:
     """Extract booking entities from user input"""
     if state.get("booking_intent"):
+        from travel_booking import get_booking_service
         booking_service = get_booking_service()
         
         # If we're collecting info, merge with existing data
@@ -72,146 +74,110 @@ def extract_entities_node(state: Dict) -> Dict:
         else:
             # We have all info, proceed to search
             state["booking_step"] = "searching"
+        
+        # Only the date missing: search the likely dates while the user answers
+        # (and drop that speculation once the dialog moves on)
+        from booking_prefetch import speculate_from_state
+        speculate_from_state(state)
     
     return state
 
 def search_travel_node(state: Dict) -> Dict:
     """Open maximum booking websites with all search parameters pre-filled"""
     if state["booking_step"] == "searching":
-        import webbrowser
-        import urllib.parse
-        from datetime import datetime
-        import time
+        from browser_launcher import get_browser_launcher
         
         booking_data = state["booking_data"]
         travel_mode = state["booking_intent"]
         
         # Parse date
-        date = booking_data.get("parsed_date") or datetime.now()
+        from date_resolver import now_ist
+        date = booking_data.get("parsed_date") or now_ist()
         origin = booking_data.get("origin", "").strip()
         destination = booking_data.get("destination", "").strip()
         passengers = booking_data.get("passengers", 1)
         
-        # Comprehensive IATA code mapping for Indian cities
-        iata_codes = {
-            "delhi": "DEL", "new delhi": "DEL", "mumbai": "BOM", "bangalore": "BLR", "bengaluru": "BLR",
-            "chennai": "MAA", "kolkata": "CCU", "hyderabad": "HYD", "pune": "PNQ",
-            "ahmedabad": "AMD", "jaipur": "JAI", "lucknow": "LKO", "goa": "GOI", "panaji": "GOI",
-            "kochi": "COK", "cochin": "COK", "thiruvananthapuram": "TRV", "bhubaneswar": "BBI",
-            "indore": "IDR", "chandigarh": "IXC", "coimbatore": "CJB", "nagpur": "NAG",
-            "vadodara": "BDQ", "patna": "PAT", "ranchi": "IXR", "raipur": "RPR",
-            "bhopal": "BHO", "amritsar": "ATQ", "srinagar": "SXR", "guwahati": "GAU",
-            "visakhapatnam": "VTZ", "vizag": "VTZ", "vijayawada": "VGA", "mangalore": "IXE",
-            "calicut": "CCJ", "kozhikode": "CCJ", "trivandrum": "TRV", "madurai": "IXM",
-            "varanasi": "VNS", "agra": "AGR", "udaipur": "UDR", "jodhpur": "JDH"
-        }
+        # Resolve spoken/misspelt names against the shared city index
+        from city_index import get_city_index
+        city_index = get_city_index()
+        origin_city = city_index.resolve(origin)
+        dest_city = city_index.resolve(destination)
+        if origin_city:
+            origin = origin_city.name
+        if dest_city:
+            destination = dest_city.name
+        
+        # Airport-code sites are skipped for cities without one (Shimla, Manali); name-based ones still fill in
+        no_airport = [name for name, city in [(origin, origin_city), (destination, dest_city)]
+                      if not (city and city.iata)] if travel_mode == "flight" else []
         
-        # Get IATA codes
-        origin_code = iata_codes.get(origin.lower(), origin.upper()[:3])
-        dest_code = iata_codes.get(destination.lower(), destination.upper()[:3])
+        # "Around the 25th": price the nearby days in one batch and open the sites once, for the cheapest
+        from date_resolver import is_flexible
+        calendar_summary = ""
+        if is_flexible(booking_data.get("date")):
+            from travel_booking import get_booking_service
+            service = get_booking_service()
+            calendar = service.search_price_calendar(travel_mode, origin, destination, date, passengers)
+            if calendar["cheapest"]:
+                date = calendar["cheapest"]["date"]
+                calendar_summary = service.format_price_calendar(calendar, travel_mode) + " "
         
-        # Format dates in multiple formats for different sites
+        # Fill every site for this mode in one pass (templates: data/booking_sites.json)
+        from booking_sites import cached_booking_urls, join_names
+        sites = cached_booking_urls(travel_mode, origin, destination, date, passengers, origin_city, dest_city)
+        names = join_names([name for name, _ in sites])
         date_str = date.strftime("%d/%m/%Y")
-        date_yyyy_mm_dd = date.strftime("%Y-%m-%d")
-        date_ddmmyyyy = date.strftime("%d%m%Y")
-        date_dd_mm_yyyy = date.strftime("%d-%m-%Y")
         
         # Open booking websites based on travel mode
         if travel_mode == "flight":
-            print(f"\n🛫 Opening 6 flight booking sites with pre-filled details...")
-            
-            # 1. Google Flights - Most comprehensive
-            google_flights = f"https://www.google.com/travel/flights?q=Flights+from+{urllib.parse.quote(origin)}+to+{urllib.parse.quote(destination)}+on+{date_yyyy_mm_dd}+for+{passengers}+passengers"
-            
-            # 2. MakeMyTrip - India's largest
-            makemytrip = f"https://www.makemytrip.com/flight/search?itinerary={origin_code}-{dest_code}-{date_ddmmyyyy}&tripType=O&paxType=A-{passengers}_C-0_I-0&intl=false&cabinClass=E&rKey=DCALC"
-            
-            # 3. Yatra - Reliable Indian site
-            yatra = f"https://www.yatra.com/online-flight-booking?origin={origin_code}&destination={dest_code}&departure_date={date_yyyy_mm_dd}&adult={passengers}&child=0&infant=0&class=Economy&search_source=search_box"
-            
-            # 4. Ixigo - Price comparison
-            ixigo = f"https://www.ixigo.com/search/result/flight?from={origin_code}&to={dest_code}&date={date_yyyy_mm_dd}&adults={passengers}&children=0&infants=0&class=e"
-            
-            # 5. EaseMyTrip - Budget flights
-            easemytrip = f"https://www.easemytrip.com/flights/search/{origin_code}/{dest_code}/{date_ddmmyyyy}/1/{passengers}/0/0/E"
-            
-            # 6. Cleartrip - Clean interface
-            cleartrip = f"https://www.cleartrip.com/flights/results?from={origin_code}&to={dest_code}&depart_date={date_dd_mm_yyyy}&adults={passengers}&childs=0&infants=0&class=Economy&airline=&carrier=&sd=1734912000000"
-            
-            # Open all sites in separate thread to avoid blocking
-            def open_sites_async():
-                for url in [google_flights, makemytrip, yatra, ixigo, easemytrip, cleartrip]:
-                    webbrowser.open(url)
-                    time.sleep(0.2)
-            
-            import threading
-            thread = threading.Thread(target=open_sites_async, daemon=True)
-            thread.start()
-            
-            state["response_to_speak"] = f"Opening 6 flight booking sites for {origin} to {destination} on {date_str} for {passengers} passenger(s). All details are pre-filled on Google Flights, MakeMyTrip, Yatra, Ixigo, EaseMyTrip, and Cleartrip. Compare prices and book the best deal!"
+            print(f"\n🛫 Opening {len(sites)} flight booking sites with pre-filled details...")
+            state["response_to_speak"] = f"Opening {len(sites)} flight booking sites for {origin} to {destination} on {date_str} for {passengers} passenger(s). All details are pre-filled on {names}. Compare prices and book the best deal!"
+            if no_airport:
+                state["response_to_speak"] += f" I couldn't find an airport code for {' or '.join(no_airport)}, so the other sites need a manual search."
             
         elif travel_mode == "train":
-            print(f"\n🚂 Opening 5 train booking sites with pre-filled details...")
-            
-            # 1. Google Search - Shows all options
-            google_trains = f"https://www.google.com/search?q=trains+from+{urllib.parse.quote(origin)}+to+{urllib.parse.quote(destination)}+on+{date_yyyy_mm_dd}+IRCTC"
-            
-            # 2. Ixigo Trains - Comprehensive
-            ixigo_trains = f"https://www.ixigo.com/search/result/trains?from={urllib.parse.quote(origin)}&to={urllib.parse.quote(destination)}&date={date_yyyy_mm_dd}"
-            
-            # 3. RailYatri - Popular platform
-            railyatri = f"https://www.railyatri.in/train-ticket/trains-from-{origin.lower().replace(' ', '-')}-to-{destination.lower().replace(' ', '-')}"
-            
-            # 4. MakeMyTrip Trains
-            makemytrip_trains = f"https://www.makemytrip.com/railways/search?from={urllib.parse.quote(origin)}&to={urllib.parse.quote(destination)}&date={date_ddmmyyyy}"
-            
-            # 5. ConfirmTkt - Availability predictor
-            confirmtkt = f"https://www.confirmtkt.com/train-tickets/{origin.lower().replace(' ', '-')}-to-{destination.lower().replace(' ', '-')}"
-            
-            # Open all sites in separate thread to avoid blocking
-            def open_sites_async():
-                for url in [google_trains, ixigo_trains, railyatri, makemytrip_trains, confirmtkt]:
-                    webbrowser.open(url)
-                    time.sleep(0.2)
-            
-            import threading
-            thread = threading.Thread(target=open_sites_async, daemon=True)
-            thread.start()
-            
-            state["response_to_speak"] = f"Opening 5 train booking sites for {origin} to {destination} on {date_str}. Check Google Search, Ixigo Trains, RailYatri, MakeMyTrip, and ConfirmTkt for all available trains with timings, prices, and seat availability."
+            print(f"\n🚂 Opening {len(sites)} train booking sites with pre-filled details...")
+            state["response_to_speak"] = f"Opening {len(sites)} train booking sites for {origin} to {destination} on {date_str}. Check {names} for all available trains with timings, prices, and seat availability."
             
         elif travel_mode == "bus":
             print(f"\n🚌 Opening bus booking sites...")
-            
-            # 1. Google Search - Comprehensive search with all details
-            google_buses = f"https://www.google.com/search?q=bus+tickets+from+{urllib.parse.quote(origin)}+to+{urllib.parse.quote(destination)}+on+{date_str}+RedBus+Ixigo+AbhiBus+MakeMyTrip+timings+price"
-            
-            # 2. RedBus - Try with route in URL
-            origin_slug = origin.lower().replace(" ", "-").replace(",", "")
-            dest_slug = destination.lower().replace(" ", "-").replace(",", "")
-            redbus = f"https://www.redbus.in/bus-tickets/{origin_slug}-to-{dest_slug}"
-            
-            # 3. Ixigo Bus - Homepage (manual search needed)
-            ixigo_bus = f"https://www.ixigo.com/bus"
-            
-            # 4. AbhiBus - Try with route
-            abhibus = f"https://www.abhibus.com/{origin_slug}-to-{dest_slug}-bus"
-            
-            # 5. MakeMyTrip Bus - Homepage
-            makemytrip_bus = f"https://www.makemytrip.com/bus-tickets/"
-            
-            # Open all sites in separate thread to avoid blocking
-            def open_sites_async():
-                for url in [google_buses, redbus, ixigo_bus, abhibus, makemytrip_bus]:
-                    webbrowser.open(url)
-                    time.sleep(0.2)
-            
-            import threading
-            thread = threading.Thread(target=open_sites_async, daemon=True)
-            thread.start()
-            
             state["response_to_speak"] = f"Opening bus booking sites for {origin} to {destination} on {date_str}. Google Search shows comprehensive results with timings and prices. RedBus and AbhiBus may have the route pre-filled. For Ixigo and MakeMyTrip, please search manually with your route and date."
         
+        # Merged fares from every provider: a cache hit when the prefetcher (or the calendar) got
+        # there first, otherwise one concurrent search that returns once the cheapest fares are stable
+        from search_cache import get_search_cache, search_key
+        from travel_booking import get_booking_service
+        service = get_booking_service()
+        search = {"flight": service.search_flights, "train": service.search_trains,
+                  "bus": service.search_buses}.get(travel_mode)
+        try:
+            fares = search(origin, destination, date, passengers) if search else []
+        except Exception as e:
+            print(f"⚠️ Fare search failed: {e}")
+            fares = []
+        fares_summary = ""
+        if fares:
+            state["search_results"] = fares[:3]
+            if not calendar_summary:
+                provider = fares[0].get("provider")
+                fares_summary = f"Fares start at ₹{fares[0]['price']:,}{f' on {provider}' if provider else ''}. "
+        
+        # Route record the prefetcher warmed (the RAG index is never queried on this turn)
+        cache = get_search_cache()
+        route_key = search_key("route_info", origin, destination, None)
+        route_info = cache.get(route_key) if cache.peek(route_key) else None
+        route_summary = ""
+        if route_info and route_info["route"]:
+            route_summary = f"{origin} to {destination} is about {route_info['route']['distance_km']:,} km. "
+        
+        state["response_to_speak"] = calendar_summary + fares_summary + route_summary + state.get("response_to_speak", "")
+        
+        # Remote clients (the HTTP backend) open the sites themselves; locally they are
+        # queued on the shared launcher (batched, off the voice loop)
+        state["booking_urls"] = [url for _, url in sites]
+        if sites and not state.get("client_opens_urls"):
+            get_browser_launcher().open(state["booking_urls"], label=f"{travel_mode} search")
+        
         state["booking_step"] = "completed"
         state["booking_intent"] = None
         state["skip_processing"] = True
@@ -249,18 +215,22 @@ def handle_selection_node(state: Dict) -> Dict:
 def confirm_booking_node(state: Dict) -> Dict:
     """Confirm and complete booking"""
     if state["booking_step"] == "confirming":
+        from travel_booking import get_booking_service
         booking_service = get_booking_service()
         selected = state.get("selected_option")
         
         if selected:
             # Create booking
+            parsed_date = state["booking_data"].get("parsed_date")
             booking_details = {
                 **selected,
+                "travel_mode": state["booking_intent"],
                 "passenger_count": state["booking_data"].get("passengers", 1),
-                "travel_date": state["booking_data"].get("date", "")
+                # ISO date when known so history can be queried by travel date
+                "travel_date": parsed_date.strftime("%Y-%m-%d") if parsed_date else state["booking_data"].get("date", "")
             }
             
-            booking = booking_service.book_travel(booking_details)
+            booking = booking_service.book_travel(booking_details, user_id=state.get("user_id", "local"))
             
             # Format confirmation message
             travel_mode = state["booking_intent"]
@@ -277,3 +247,19 @@ def confirm_booking_node(state: Dict) -> Dict:
             state["skip_processing"] = True
     
     return state
+
+def run_booking_turn(state: Dict) -> Dict:
+    """
+    The booking branch of the conversation graph, for callers without the
+    LangGraph workflow (e.g. the HTTP backend)
+    
+    Leaves response_to_speak empty when the turn is not about booking. With
+    client_opens_urls set, booking sites are returned in booking_urls
+    instead of being opened on this machine.
+    """
+    state = detect_booking_intent_node(state)
+    if state.get("booking_intent"):
+        state = extract_entities_node(state)
+        if state.get("booking_step") == "searching":
+            state = search_travel_node(state)
+    return state
@@ -0,0 +1,174 @@
+"""
+Booking Prefetch - speculative searches while the booking dialog waits for a date
+Once origin and destination are known, the likely answers (today, tomorrow,
+this weekend) are searched in the background and land in the shared search
+cache, so the turn that supplies the date is answered from cache: the site
+URLs, the fares quoted in the reply, the price calendar's days and the
+route info (once per dialog, it doesn't depend on the date). Each
+session's dialog is tracked separately; work for a dialog that changes (new
+route, new mode, topic switch) is dropped.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SESSION_ID = "local"  # the voice assistant's single session
+
+def likely_dates(now: Optional[datetime] = None) -> List[datetime]:
+    """Today, tomorrow and this weekend (Saturday and Sunday) in Asia/Kolkata, without duplicates"""
+    from date_resolver import now_ist
+    today = (now or now_ist()).replace(hour=0, minute=0, second=0, microsecond=0)
+    saturday = today + timedelta(days=(5 - today.weekday()) % 7)
+    dates = [today, today + timedelta(days=1)]
+    if today.weekday() == 6:
+        dates.append(today)  # Sunday: "this weekend" is today
+    else:
+        dates += [saturday, saturday + timedelta(days=1)]
+    return sorted(set(dates))
+
+class SpeculativePrefetcher:
+    """Background warm-up of search results, booking URLs and route info, per session's dialog"""
+
+    def __init__(self, max_workers: int = 2):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="booking-prefetch")
+        self._lock = threading.Lock()
+        # session_id -> (signature, generation, futures); an entry lives only while its dialog waits
+        self._dialogs: Dict[str, Tuple[Tuple, int, List[Future]]] = {}
+        self._generations = 0
+        self.stats = {"started": 0, "completed": 0, "dropped": 0}
+
+    def speculate(self, travel_mode: str, origin: str, destination: str, passengers: int = 1,
+                  dates: Optional[List[datetime]] = None, session_id: str = DEFAULT_SESSION_ID) -> bool:
+        """
+        Start prefetching for a session's partially known booking
+
+        Returns False if the same dialog is already being prefetched
+        """
+        signature = (travel_mode, origin.strip().lower(), destination.strip().lower(), passengers)
+        with self._lock:
+            dialog = self._dialogs.get(session_id)
+            if dialog and dialog[0] == signature:
+                return False
+            self._drop_locked(session_id)
+            # Other sessions' finished dialogs are forgotten, so abandoned ones don't accumulate
+            for other in [sid for sid, (_, _, futures) in self._dialogs.items()
+                          if all(future.done() for future in futures)]:
+                del self._dialogs[other]
+            self._generations += 1
+            generation = self._generations
+            futures = []
+            for date in dates or likely_dates():
+                futures.append(self._pool.submit(
+                    self._warm, session_id, generation, travel_mode, origin, destination, date, passengers))
+                self.stats["started"] += 1
+            futures.append(self._pool.submit(self._warm_route, session_id, generation, origin, destination))
+            self.stats["started"] += 1
+            self._dialogs[session_id] = (signature, generation, futures)
+        print(f"🔮 Prefetching {travel_mode} searches for {origin} to {destination}")
+        return True
+
+    def drop(self, session_id: str = DEFAULT_SESSION_ID):
+        """Abandon prefetches for a session's dialog (it changed or finished)"""
+        with self._lock:
+            self._drop_locked(session_id)
+
+    def _drop_locked(self, session_id: str):
+        dialog = self._dialogs.pop(session_id, None)
+        if dialog:
+            for future in dialog[2]:
+                if future.cancel():
+                    self.stats["dropped"] += 1
+
+    def _current(self, session_id: str, generation: int) -> bool:
+        with self._lock:
+            dialog = self._dialogs.get(session_id)
+            return bool(dialog) and dialog[1] == generation
+
+    def _warm(self, session_id: str, generation: int, travel_mode: str, origin: str, destination: str,
+              date: datetime, passengers: int):
+        from booking_sites import cached_booking_urls
+        from city_index import get_city_index
+
+        # Same resolution search_travel_node does, so the cache keys match
+        city_index = get_city_index()
+        origin_city = city_index.resolve(origin)
+        dest_city = city_index.resolve(destination)
+        origin_name = origin_city.name if origin_city else origin
+        dest_name = dest_city.name if dest_city else destination
+
+        steps = [
+            lambda: cached_booking_urls(travel_mode, origin_name, dest_name, date, passengers,
+                                        origin_city, dest_city),
+            lambda: self._search(travel_mode, origin_name, dest_name, date, passengers),
+        ]
+        for step in steps:
+            # Check between steps: a changed dialog stops the rest of the work
+            if not self._current(session_id, generation):
+                with self._lock:
+                    self.stats["dropped"] += 1
+                return
+            try:
+                step()
+            except Exception as e:
+                print(f"⚠️ Prefetch failed: {e}")
+                return
+        with self._lock:
+            self.stats["completed"] += 1
+
+    def _warm_route(self, session_id: str, generation: int, origin: str, destination: str):
+        from city_index import get_city_index
+        from travel_rag import cached_route_info
+        if not self._current(session_id, generation):
+            with self._lock:
+                self.stats["dropped"] += 1
+            return
+        city_index = get_city_index()
+        try:
+            cached_route_info(city_index.canonical_name(origin) or origin,
+                              city_index.canonical_name(destination) or destination)
+        except Exception as e:
+            print(f"⚠️ Prefetch failed: {e}")
+            return
+        with self._lock:
+            self.stats["completed"] += 1
+
+    @staticmethod
+    def _search(travel_mode: str, origin: str, destination: str, date: datetime, passengers: int):
+        from travel_booking import get_booking_service
+        search = {
+            "flight": get_booking_service().search_flights,
+            "train": get_booking_service().search_trains,
+            "bus": get_booking_service().search_buses,
+        }.get(travel_mode)
+        if search:
+            search(origin, destination, date, passengers)
+
+    def pending(self, session_id: Optional[str] = None) -> int:
+        with self._lock:
+            dialogs = [self._dialogs.get(session_id)] if session_id else list(self._dialogs.values())
+            return sum(not future.done() for dialog in dialogs if dialog for future in dialog[2])
+
+# Singleton instance
+_prefetcher_instance = None
+_prefetcher_lock = threading.Lock()
+
+def get_booking_prefetcher() -> SpeculativePrefetcher:
+    """Get or create SpeculativePrefetcher singleton instance"""
+    global _prefetcher_instance
+    if _prefetcher_instance is None:
+        with _prefetcher_lock:
+            if _prefetcher_instance is None:
+                _prefetcher_instance = SpeculativePrefetcher()
+    return _prefetcher_instance
+
+def speculate_from_state(state: Dict):
+    """Prefetch when only the date is missing; otherwise drop the session's stale speculation"""
+    data = state.get("booking_data") or {}
+    session_id = state.get("session_id") or DEFAULT_SESSION_ID
+    if state.get("booking_intent") and data.get("origin") and data.get("destination") and not data.get("date"):
+        get_booking_prefetcher().speculate(state["booking_intent"], data["origin"], data["destination"],
+                                           data.get("passengers") or 1, session_id=session_id)
+    else:
+        get_booking_prefetcher().drop(session_id)
@@ -0,0 +1,214 @@
+"""
+Booking Sites - declarative URL templates for flight/train/bus search sites
+Sites are data in data/booking_sites.json (template, date format, code type,
+modes). Templates are parsed and validated once at load; per request the
+shared values (quoted names, slugs, codes, each distinct date format) are
+computed once and every site of a mode is filled in a single pass.
+"""
+
+import json
+import threading
+import urllib.parse
+from datetime import datetime
+from string import Formatter
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SITES_PATH = "data/booking_sites.json"
+
+# Placeholders a template may use
+TEMPLATE_FIELDS = {"origin", "destination", "origin_slug", "dest_slug", "origin_code", "dest_code",
+                   "date", "passengers"}
+CODE_TYPES = {"name", "iata", "station"}
+
+class BookingSite:
+    """One site, compiled to a str.format_map template over the trip context"""
+
+    def __init__(self, name: str, modes: List[str], template: str,
+                 date_format: Optional[str] = None, code_type: str = "name"):
+        self.name = name
+        self.modes = modes
+        self.template = template
+        self.date_format = date_format
+        self.code_type = code_type
+        self.needs_codes = False
+        self.date_key = None
+        self._compiled = None
+
+    def compile(self, date_keys: Dict[str, str]):
+        self.date_key = date_keys.get(self.date_format)
+        self._compiled = self._rewrite()
+
+    def _rewrite(self) -> str:
+        """Rewrite placeholders onto context keys: codes by type, dates by format"""
+        if self.code_type not in CODE_TYPES:
+            raise ValueError(f"{self.name}: unknown code type '{self.code_type}'")
+        parts = []
+        for literal, field, spec, conversion in Formatter().parse(self.template):
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is None:
+                continue
+            if field not in TEMPLATE_FIELDS or spec or conversion:
+                raise ValueError(f"{self.name}: unsupported placeholder '{{{field}}}'")
+            if field in ("origin_code", "dest_code"):
+                if self.code_type == "name":
+                    raise ValueError(f"{self.name}: '{{{field}}}' needs an iata or station code type")
+                self.needs_codes = True
+                field = f"{self.code_type}_{field}"
+            elif field == "date":
+                if not self.date_format:
+                    raise ValueError(f"{self.name}: '{{date}}' needs a date_format")
+                field = self.date_key
+            parts.append("{" + field + "}")
+        return "".join(parts)
+
+    def specialize(self, route: Dict) -> str:
+        """Pre-fill the route fields, leaving only date/passengers placeholders"""
+        escaped = {key: str(value).replace("{", "{{").replace("}", "}}") for key, value in route.items()}
+        return self._compiled.format_map(_KeepMissing(escaped))
+
+class _KeepMissing(dict):
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+class SiteCatalog:
+    """All booking sites, grouped by travel mode"""
+
+    def __init__(self, sites: List[BookingSite]):
+        self.sites = sites
+        self.by_mode: Dict[str, List[BookingSite]] = {}
+        # Each distinct date format gets one context key ("date_0", ...)
+        formats = sorted({site.date_format for site in sites if site.date_format})
+        self.date_formats = {f"date_{i}": fmt for i, fmt in enumerate(formats)}
+        date_keys = {fmt: key for key, fmt in self.date_formats.items()}
+        for site in sites:
+            site.compile(date_keys)
+            for mode in site.modes:
+                self.by_mode.setdefault(mode, []).append(site)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SITES_PATH) -> "SiteCatalog":
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls([BookingSite(**entry) for entry in data.get("sites", [])])
+
+    def sites_for(self, mode: str) -> List[BookingSite]:
+        return self.by_mode.get(mode, [])
+
+    def route_context(self, origin: str, destination: str, origin_city=None, dest_city=None) -> Dict:
+        """Route values (quoted names, slugs, codes), each computed once"""
+        route = {
+            "origin": urllib.parse.quote(origin),
+            "destination": urllib.parse.quote(destination),
+            "origin_slug": _slug(origin),
+            "dest_slug": _slug(destination),
+        }
+        for code_type in ("iata", "station"):
+            route[f"{code_type}_origin_code"] = getattr(origin_city, code_type, None)
+            route[f"{code_type}_dest_code"] = getattr(dest_city, code_type, None)
+        return route
+
+    def available_sites(self, mode: str, route: Dict) -> List[BookingSite]:
+        """Sites of a mode that the route has the codes for"""
+        return [site for site in self.sites_for(mode)
+                if not site.needs_codes or (route[f"{site.code_type}_origin_code"] and
+                                            route[f"{site.code_type}_dest_code"])]
+
+    def build_urls(self, mode: str, origin: str, destination: str, date: datetime, passengers: int = 1,
+                   origin_city=None, dest_city=None) -> List[Tuple[str, str]]:
+        """(site name, url) for every site of a mode; sites missing a code are skipped"""
+        return self.build_many(mode, origin, destination, [(date, passengers)], origin_city, dest_city)[0]
+
+    def build_many(self, mode: str, origin: str, destination: str, trips: List[Tuple[datetime, int]],
+                   origin_city=None, dest_city=None) -> List[List[Tuple[str, str]]]:
+        """
+        URLs for many (date, passengers) trips on one route, e.g. a date range
+
+        Route fields are baked into the templates once, and each date is
+        formatted once per distinct format however many trips share it.
+        """
+        route = self.route_context(origin, destination, origin_city, dest_city)
+        sites = [(site.name, site.specialize(route)) for site in self.available_sites(mode, route)]
+        dates: Dict[datetime, Dict] = {}
+        results = []
+        for date, passengers in trips:
+            context = dates.get(date)
+            if context is None:
+                context = dates[date] = {key: date.strftime(fmt) for key, fmt in self.date_formats.items()}
+            context["passengers"] = passengers
+            results.append([(name, template.format_map(context)) for name, template in sites])
+        return results
+
+def cached_booking_urls(travel_mode: str, origin: str, destination: str, date: datetime, passengers: int = 1,
+                        origin_city=None, dest_city=None) -> List[Tuple[str, str]]:
+    """build_urls through the shared search cache (key: mode, city codes, date, passengers)"""
+    from search_cache import get_search_cache, search_key
+    return get_search_cache().get_or_compute(
+        search_key("urls", origin, destination, date, passengers, variant=travel_mode),
+        lambda: get_site_catalog().build_urls(travel_mode, origin, destination, date, passengers,
+                                              origin_city, dest_city)
+    )
+
+def _slug(name: str) -> str:
+    return name.lower().replace(" ", "-").replace(",", "")
+
+def join_names(names: List[str]) -> str:
+    """'A, B, and C' for speech"""
+    if len(names) <= 2:
+        return " and ".join(names)
+    return f"{', '.join(names[:-1])}, and {names[-1]}"
+
+# Singleton instance
+_site_catalog_instance = None
+_site_catalog_lock = threading.Lock()
+
+def get_site_catalog() -> SiteCatalog:
+    """Get or create SiteCatalog singleton instance"""
+    global _site_catalog_instance
+    if _site_catalog_instance is None:
+        with _site_catalog_lock:
+            if _site_catalog_instance is None:
+                _site_catalog_instance = SiteCatalog.load()
+    return _site_catalog_instance
+
+if __name__ == "__main__":
+    import time
+    from datetime import timedelta
+    from city_index import get_city_index
+
+    catalog = get_site_catalog()
+    cities = get_city_index()
+    origin, destination = cities.resolve("Delhi"), cities.resolve("Mumbai")
+    for name, url in catalog.build_urls("flight", origin.name, destination.name, datetime(2026, 12, 10), 2,
+                                        origin, destination):
+        print(f"{name:15} {url}")
+
+    # Bulk: 60-day date range x 1-9 passengers x every mode
+    start_date = datetime(2026, 12, 1)
+    trips = [(start_date + timedelta(days=d), p) for d in range(60) for p in range(1, 10)]
+
+    def naive(date, passengers):
+        # The per-request f-string approach this module replaces
+        q = urllib.parse.quote
+        urls = [
+            f"https://www.google.com/travel/flights?q=Flights+from+{q(origin.name)}+to+{q(destination.name)}+on+{date.strftime('%Y-%m-%d')}+for+{passengers}+passengers",
+            f"https://www.makemytrip.com/flight/search?itinerary={origin.iata}-{destination.iata}-{date.strftime('%d%m%Y')}&tripType=O&paxType=A-{passengers}_C-0_I-0&intl=false&cabinClass=E&rKey=DCALC",
+            f"https://www.yatra.com/online-flight-booking?origin={origin.iata}&destination={destination.iata}&departure_date={date.strftime('%Y-%m-%d')}&adult={passengers}&child=0&infant=0&class=Economy&search_source=search_box",
+            f"https://www.ixigo.com/search/result/flight?from={origin.iata}&to={destination.iata}&date={date.strftime('%Y-%m-%d')}&adults={passengers}&children=0&infants=0&class=e",
+            f"https://www.easemytrip.com/flights/search/{origin.iata}/{destination.iata}/{date.strftime('%d%m%Y')}/1/{passengers}/0/0/E",
+            f"https://www.cleartrip.com/flights/results?from={origin.iata}&to={destination.iata}&depart_date={date.strftime('%d-%m-%Y')}&adults={passengers}&childs=0&infants=0&class=Economy&airline=&carrier=&sd=1734912000000",
+        ]
+        return urls
+
+    start = time.perf_counter()
+    naive_count = sum(len(naive(date, p)) for date, p in trips)
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batches = catalog.build_many("flight", origin.name, destination.name, trips, origin, destination)
+    compiled_count = sum(len(batch) for batch in batches)
+    compiled_time = time.perf_counter() - start
+    assert [url for _, url in batches[-1]] == naive(*trips[-1])
+
+    print(f"\n{len(trips)} trips -> {compiled_count} flight URLs")
+    print(f"f-strings: {naive_time * 1000:.1f} ms ({naive_count} urls), "
+          f"compiled templates: {compiled_time * 1000:.1f} ms")
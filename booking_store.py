@@ -0,0 +1,207 @@
+"""
+Booking Store - durable, indexed booking repository on SQLite (WAL mode)
+Booking IDs come from an AUTOINCREMENT key assigned inside the insert
+transaction, so concurrent threads (or processes) can never receive the same
+ID. Bookings survive restarts and history is served by indexed, keyset-
+paginated queries by user, route and travel date.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DEFAULT_STORE_PATH = "data/bookings.sqlite3"
+FIRST_BOOKING_NUMBER = 1001  # IDs continue the old in-memory counter: BK1001, BK1002, ...
+BUSY_TIMEOUT_MS = 10000
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS bookings ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "booking_id TEXT NOT NULL UNIQUE, "
+    "user_id TEXT NOT NULL, "
+    "travel_mode TEXT, "
+    "origin TEXT, "
+    "destination TEXT, "
+    "travel_date TEXT, "
+    "status TEXT NOT NULL, "
+    "booked_at TEXT NOT NULL, "
+    "details TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS bookings_user ON bookings (user_id, id)",
+    "CREATE INDEX IF NOT EXISTS bookings_route ON bookings (origin, destination, id)",
+    "CREATE INDEX IF NOT EXISTS bookings_travel_date ON bookings (travel_date, id)",
+]
+
+class BookingStore:
+    """SQLite-backed booking repository, safe to share between threads"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            # Start numbering where the in-memory counter used to
+            if not conn.execute("SELECT 1 FROM sqlite_sequence WHERE name = 'bookings'").fetchone():
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('bookings', ?)",
+                             (FIRST_BOOKING_NUMBER - 1,))
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside the writer"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def add(self, details: Dict, user_id: str = "local") -> Dict:
+        """Store a confirmed booking and return it with its new booking ID"""
+        booked_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front: the AUTOINCREMENT id
+        # and the booking_id derived from it are allocated atomically
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row_id = conn.execute(
+                "INSERT INTO bookings (booking_id, user_id, travel_mode, origin, destination, travel_date, "
+                "status, booked_at, details) VALUES ('pending', ?, ?, ?, ?, ?, 'CONFIRMED', ?, '{}')",
+                (user_id, details.get("travel_mode"),
+                 details.get("origin"), details.get("destination"), details.get("travel_date"), booked_at)
+            ).lastrowid
+            booking = {
+                "booking_id": f"BK{row_id}",
+                "status": "CONFIRMED",
+                "booked_at": booked_at,
+                **details,
+            }
+            conn.execute("UPDATE bookings SET booking_id = ?, details = ? WHERE id = ?",
+                         (booking["booking_id"], json.dumps(booking, default=str), row_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return booking
+
+    def get(self, booking_id: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT details, status FROM bookings WHERE booking_id = ?", (booking_id,)
+        ).fetchone()
+        return self._decode(row) if row else None
+
+    def set_status(self, booking_id: str, status: str) -> bool:
+        """e.g. CANCELLED; returns False if the booking does not exist"""
+        cursor = self._connection().execute(
+            "UPDATE bookings SET status = ? WHERE booking_id = ?", (status, booking_id))
+        return cursor.rowcount > 0
+
+    def history(self, user_id: Optional[str] = None, origin: Optional[str] = None,
+                destination: Optional[str] = None, travel_date: Optional[str] = None,
+                limit: int = 20, before: Optional[int] = None) -> Dict:
+        """
+        Newest-first page of bookings matching the filters
+
+        Returns:
+            {"bookings": [...], "next": cursor or None}; pass `before=next` to
+            get the following page (keyset pagination, no OFFSET scans)
+        """
+        clauses, params = [], []
+        for column, value in [("user_id", user_id), ("origin", origin),
+                              ("destination", destination), ("travel_date", travel_date)]:
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if before is not None:
+            clauses.append("id < ?")
+            params.append(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT id, details, status FROM bookings {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit + 1)
+        ).fetchall()
+        page = rows[:limit]
+        return {
+            "bookings": [self._decode(row) for row in page],
+            "next": page[-1]["id"] if len(rows) > limit else None,
+        }
+
+    def count(self, user_id: Optional[str] = None) -> int:
+        if user_id is None:
+            return self._connection().execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM bookings WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict:
+        booking = json.loads(row["details"])
+        booking["status"] = row["status"]
+        return booking
+
+# Singleton instance
+_booking_store_instance = None
+_booking_store_lock = threading.Lock()
+
+def get_booking_store() -> BookingStore:
+    """Get or create BookingStore singleton instance"""
+    global _booking_store_instance
+    if _booking_store_instance is None:
+        with _booking_store_lock:
+            if _booking_store_instance is None:
+                _booking_store_instance = BookingStore()
+    return _booking_store_instance
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    threads, per_thread = 32, 300
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BookingStore(os.path.join(tmp, "bookings.sqlite3"))
+        routes = [("Delhi", "Mumbai"), ("Bangalore", "Chennai"), ("Pune", "Goa")]
+
+        def worker(n: int) -> List[str]:
+            ids = []
+            for i in range(per_thread):
+                origin, destination = routes[i % len(routes)]
+                booking = store.add({"travel_mode": "flight", "origin": origin, "destination": destination,
+                                     "travel_date": f"2026-12-{i % 28 + 1:02d}", "price": 4500},
+                                    user_id=f"user{n % 8}")
+                ids.append(booking["booking_id"])
+            return ids
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            ids = [booking_id for batch in pool.map(worker, range(threads)) for booking_id in batch]
+        elapsed = time.perf_counter() - start
+        print(f"{len(ids)} bookings from {threads} threads in {elapsed:.2f}s "
+              f"({len(ids) / elapsed:.0f}/s), unique IDs: {len(set(ids)) == len(ids)}, "
+              f"first {min(ids, key=lambda b: int(b[2:]))}")
+
+        # Page through one user's Delhi -> Mumbai history
+        start = time.perf_counter()
+        pages, seen, cursor = 0, 0, None
+        while True:
+            page = store.history(user_id="user3", limit=50, before=cursor)
+            pages += 1
+            seen += len(page["bookings"])
+            cursor = page["next"]
+            if cursor is None:
+                break
+        print(f"user3 history: {seen} bookings in {pages} pages, "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms total")
+        route = store.history(origin="Pune", destination="Goa", travel_date="2026-12-03", limit=5)
+        print(f"Pune -> Goa on 2026-12-03: {[b['booking_id'] for b in route['bookings']]}")
+
+        reopened = BookingStore(store.path)
+        print(f"After reopening: {reopened.count()} bookings, next ID {reopened.add({})['booking_id']}")
@@ -0,0 +1,179 @@
+"""
+Browser Launcher - one background queue for every URL the assistant opens
+URLs are batched into a single browser invocation where the platform allows
+it, repeated opens are deduplicated, and callers get a job they can wait on.
+The opener is pluggable so tests can record launches instead of opening tabs.
+"""
+
+import platform
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import webbrowser
+from typing import Callable, Dict, List, Optional
+
+# Wait this long after the first URL for more to arrive in the same batch
+BATCH_WINDOW_SECONDS = 0.05
+# The same URL opened again within this window is skipped
+DEDUP_WINDOW_SECONDS = 10.0
+
+# Browsers that accept several URLs on one command line (each opens a tab)
+MULTI_URL_BROWSERS = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+                      "firefox", "microsoft-edge", "brave-browser"]
+
+class LaunchJob:
+    """Handle for a group of URLs submitted together"""
+
+    def __init__(self, urls: List[str], label: str = "",
+                 on_complete: Optional[Callable[["LaunchJob"], None]] = None):
+        self.urls = urls
+        self.label = label
+        self.on_complete = on_complete
+        self.opened: List[str] = []
+        self.skipped: List[str] = []
+        self.failed: List[str] = []  # handed to the opener, which raised
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+class SystemOpener:
+    """Open a batch of URLs with as few browser processes as possible"""
+
+    def __init__(self):
+        self.system = platform.system()
+        self.browser = None
+        if self.system == "Linux":
+            self.browser = next((b for b in MULTI_URL_BROWSERS if shutil.which(b)), None)
+
+    def __call__(self, urls: List[str]):
+        if not urls:
+            return
+        if self.system == "Darwin":
+            # `open` hands every URL to the default browser in one call
+            subprocess.Popen(["open", *urls], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elif self.browser:
+            subprocess.Popen([self.browser, *urls], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            # No multi-URL launcher: first URL may start the browser, the rest become tabs
+            webbrowser.open(urls[0])
+            for url in urls[1:]:
+                webbrowser.open_new_tab(url)
+
+class RecordingOpener:
+    """Stand-in opener for tests: records each batch instead of launching"""
+
+    def __init__(self):
+        self.batches: List[List[str]] = []
+
+    def __call__(self, urls: List[str]):
+        self.batches.append(list(urls))
+
+    @property
+    def urls(self) -> List[str]:
+        return [url for batch in self.batches for url in batch]
+
+class BrowserLauncher:
+    """Queue + single worker thread that opens URLs off the voice loop"""
+
+    def __init__(self, opener: Optional[Callable[[List[str]], None]] = None,
+                 batch_window: float = BATCH_WINDOW_SECONDS, dedup_window: float = DEDUP_WINDOW_SECONDS):
+        self.opener = opener or SystemOpener()
+        self.batch_window = batch_window
+        self.dedup_window = dedup_window
+        self._queue: "queue.Queue[LaunchJob]" = queue.Queue()
+        self._recent: Dict[str, float] = {}  # url -> last opened
+        self._thread = threading.Thread(target=self._run, name="browser-launcher", daemon=True)
+        self._thread.start()
+
+    def open(self, urls, label: str = "", on_complete: Optional[Callable[[LaunchJob], None]] = None) -> LaunchJob:
+        """Queue one URL or a list of URLs; returns immediately"""
+        if isinstance(urls, str):
+            urls = [urls]
+        job = LaunchJob(list(urls), label, on_complete)
+        self._queue.put(job)
+        return job
+
+    def _run(self):
+        while True:
+            jobs = [self._queue.get()]
+            # Collect whatever else arrives within the batch window
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    jobs.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._launch(jobs)
+
+    def _launch(self, jobs: List[LaunchJob]):
+        now = time.monotonic()
+        batch: List[str] = []
+        queued: Dict[LaunchJob, List[str]] = {}
+        seen = set()
+        for job in jobs:
+            queued[job] = []
+            for url in job.urls:
+                recently_opened = url in self._recent and now - self._recent[url] < self.dedup_window
+                if url in seen or recently_opened:
+                    job.skipped.append(url)
+                    continue
+                seen.add(url)
+                batch.append(url)
+                queued[job].append(url)
+
+        error = None
+        try:
+            self.opener(batch)
+        except Exception as e:
+            error = str(e)
+            print(f"⚠️ Browser launch error: {e}")
+
+        # Only successful opens count for dedup, so a failed URL can be retried straight away
+        if error is None:
+            for url in batch:
+                self._recent[url] = now
+        # Forget old entries so the dedup map stays small
+        if len(self._recent) > 1000:
+            self._recent = {u: t for u, t in self._recent.items() if now - t < self.dedup_window}
+
+        for job in jobs:
+            job.error = error
+            (job.failed if error else job.opened).extend(queued[job])
+            if job.label and not error:
+                print(f"🌐 Opened {len(job.opened)} {job.label} tab(s)" +
+                      (f", skipped {len(job.skipped)} duplicate(s)" if job.skipped else ""))
+            job.done.set()
+            if job.on_complete:
+                try:
+                    job.on_complete(job)
+                except Exception as e:
+                    print(f"⚠️ Launch callback error: {e}")
+
+# Singleton instance
+_browser_launcher_instance = None
+_browser_launcher_lock = threading.Lock()
+
+def get_browser_launcher() -> BrowserLauncher:
+    """Get or create BrowserLauncher singleton instance"""
+    global _browser_launcher_instance
+    if _browser_launcher_instance is None:
+        with _browser_launcher_lock:
+            if _browser_launcher_instance is None:
+                _browser_launcher_instance = BrowserLauncher()
+    return _browser_launcher_instance
+
+def set_browser_launcher(launcher: BrowserLauncher):
+    """Replace the singleton (e.g. with a RecordingOpener-backed launcher in tests)"""
+    global _browser_launcher_instance
+    _browser_launcher_instance = launcher
+
+def open_url(url: str, label: str = "") -> LaunchJob:
+    """Queue a single URL on the shared launcher"""
+    return get_browser_launcher().open(url, label)
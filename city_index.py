@@ -0,0 +1,291 @@
+"""
+City Index - precomputed lookup for every way a user can name a city
+Canonical names, aliases (Bengaluru/Bangalore, Vizag), native-script names,
+IATA and railway station codes are loaded once from data/cities.json into
+hash maps. Misspelt speech-to-text output is resolved through a phonetic key
+and then a trigram-filtered edit distance, so no LLM round-trip is needed and
+lookups stay fast with thousands of cities.
+"""
+
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_CITIES_PATH = "data/cities.json"
+
+# Minimum similarity (1 - distance / length) for an edit-distance match
+MIN_FUZZY_SCORE = 0.75
+# A shared phonetic skeleton also needs this similarity to the matched name
+# ('hydrabad' -> Hyderabad is 0.89; 'tirupati' -> Hyderabad, same skeleton, is 0.11)
+MIN_PHONETIC_SCORE = 0.65
+# Fuzzy candidates (sharing the most trigrams) scored with edit distance
+MAX_FUZZY_CANDIDATES = 50
+
+# Trailing words that are not part of the city name
+_SUFFIXES = re.compile(r'\s+(city|airport|railway station|station|junction|jn|bus stand|international)$')
+
+# ============================================================================
+# NORMALIZATION
+# ============================================================================
+
+# Brahmi-derived scripts share Devanagari's layout 0x80 code points apart
+# (Bengali/Assamese, Gurmukhi, Gujarati, Odia, Tamil, Telugu, Kannada, Malayalam),
+# so every Indic script folds onto Devanagari by its offset within the block
+_INDIC_START, _INDIC_END = 0x0900, 0x0D80
+
+# Devanagari consonant classes for the phonetic skeleton: aspirated, voiced,
+# retroflex and sibilant variants collapse together because the southern
+# scripts (Tamil in particular) do not distinguish them
+_DEVANAGARI_CLASSES = {}
+for _group in ["कखगघ", "चछजझ", "टठडढतथदध", "पफबभव", "नणऩङञ", "रऱ", "लळऴ", "शषस"]:
+    for _char in _group:
+        _DEVANAGARI_CLASSES[_char] = _group[0]
+
+# Latin digraphs and letters mapped onto the same classes as above
+_LATIN_REPLACEMENTS = [
+    (re.compile(r'chh|ch'), 'c'), (re.compile(r'sh'), 's'), (re.compile(r'zh'), 'l'),
+    (re.compile(r'ph'), 'p'), (re.compile(r'([kgjtdbc])h'), r'\1'), (re.compile(r'x'), 'ks'),
+    (re.compile(r'[aeiouyh]'), ''),
+]
+_LATIN_CLASSES = str.maketrans({
+    "g": "k", "q": "k", "c": "k", "j": "k", "d": "t", "b": "p", "v": "p", "w": "p", "f": "p", "z": "s",
+})
+
+def fold_script(text: str) -> str:
+    """Map any Indic script onto Devanagari code points"""
+    chars = []
+    for char in text:
+        code = ord(char)
+        if _INDIC_START + 0x80 <= code < _INDIC_END:
+            char = chr(_INDIC_START + code % 0x80)
+        chars.append(char)
+    return "".join(chars)
+
+def normalize_name(text: str) -> str:
+    """Case-, punctuation- and script-insensitive form used as the lookup key"""
+    text = unicodedata.normalize("NFC", text).lower().strip()
+    text = re.sub(r'[\s,.\-_/()]+', ' ', text).strip()
+    text = _SUFFIXES.sub('', text)
+    return fold_script(text)
+
+def phonetic_key(text: str) -> str:
+    """
+    Consonant skeleton of a normalized name: 'bengaluru', 'bangalore' and
+    'banglore' all give 'pnklr'; Devanagari names get the same treatment
+    """
+    if any(_INDIC_START <= ord(c) < _INDIC_START + 0x80 for c in text):
+        # Keep consonants only (drops vowel signs, virama, nukta, anusvara)
+        key = [_DEVANAGARI_CLASSES.get(c, c) for c in text if unicodedata.category(c) == "Lo" and not "ऄ" <= c <= "औ"]
+    else:
+        text = re.sub(r'[^a-z]', '', text)
+        for pattern, replacement in _LATIN_REPLACEMENTS:
+            text = pattern.sub(replacement, text)
+        key = list(text.translate(_LATIN_CLASSES))
+    # Collapse doubled consonants ('kolkatta' == 'kolkata')
+    return "".join(c for i, c in enumerate(key) if i == 0 or c != key[i - 1])
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance with early exit once every path exceeds `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+def _similarity(a: str, b: str) -> float:
+    """1 - edit distance / length of the longer string"""
+    length = max(len(a), len(b)) or 1
+    return 1 - edit_distance(a, b, length) / length
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class City:
+    """One city and every name it is known by"""
+
+    def __init__(self, name: str, iata: Optional[str] = None, stations: Optional[List[str]] = None,
+                 aliases: Optional[List[str]] = None, native: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.iata = iata
+        self.stations = stations or []
+        self.aliases = aliases or []
+        self.native = native or {}
+
+    @property
+    def station(self) -> Optional[str]:
+        """Main railway station code"""
+        return self.stations[0] if self.stations else None
+
+    def names(self) -> List[str]:
+        return [self.name, *self.aliases, *self.native.values()]
+
+    def __repr__(self):
+        return f"City({self.name!r}, iata={self.iata!r})"
+
+class CityMatch:
+    """Result of a lookup: the city, how it matched and how confidently"""
+
+    def __init__(self, city: City, method: str, score: float, matched: str):
+        self.city = city
+        self.method = method    # exact, code, phonetic or fuzzy
+        self.score = score
+        self.matched = matched  # the indexed name that matched
+
+    def __repr__(self):
+        return f"CityMatch({self.city.name!r}, {self.method}, {self.score:.2f}, {self.matched!r})"
+
+class CityIndex:
+    """Hash maps + trigram index over all city names, built once at load"""
+
+    def __init__(self, cities: List[City]):
+        self.cities = cities
+        self._names: Dict[str, City] = {}
+        self._codes: Dict[str, City] = {}
+        self._phonetic: Dict[str, List[Tuple[City, str]]] = defaultdict(list)
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)
+        self._keys: List[Tuple[str, City]] = []
+        self._cache: Dict[str, Optional[CityMatch]] = {}
+
+        for city in cities:
+            for name in city.names():
+                key = normalize_name(name)
+                if not key or key in self._names:
+                    continue
+                self._names[key] = city
+                self._phonetic[phonetic_key(key)].append((city, name))
+                for gram in _trigrams(key):
+                    self._trigrams[gram].append(len(self._keys))
+                self._keys.append((key, city))
+            for code in filter(None, [city.iata, *city.stations]):
+                self._codes.setdefault(code.upper(), city)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_CITIES_PATH) -> "CityIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls([City(**entry) for entry in data.get("cities", [])])
+
+    def lookup(self, text: str) -> Optional[CityMatch]:
+        """Resolve a spoken/typed city name (any script, misspelt) or code"""
+        if not text:
+            return None
+        key = normalize_name(text)
+        if key in self._cache:
+            return self._cache[key]
+        match = self._lookup(key, text.strip())
+        if len(self._cache) > 10000:
+            self._cache.clear()
+        self._cache[key] = match
+        return match
+
+    def _lookup(self, key: str, raw: str) -> Optional[CityMatch]:
+        # 1. Exact name, alias or native-script name
+        city = self._names.get(key)
+        if city:
+            return CityMatch(city, "exact", 1.0, key)
+
+        # 2. IATA / station code
+        code = raw.upper()
+        if len(code) >= 2 and code in self._codes:
+            return CityMatch(self._codes[code], "code", 1.0, code)
+
+        # 3. Same phonetic skeleton, if it points at a single city and the spelling is close
+        skeleton = phonetic_key(key)
+        candidates = self._phonetic.get(skeleton, []) if len(skeleton) >= 2 else []
+        if len({c.name for c, _ in candidates}) == 1:
+            score, name = max((_similarity(key, normalize_name(name)), name) for _, name in candidates)
+            if score >= MIN_PHONETIC_SCORE:
+                return CityMatch(candidates[0][0], "phonetic", score, name)
+
+        # 4. Edit distance over the keys sharing the most trigrams
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key: str) -> Optional[CityMatch]:
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in _trigrams(key):
+            for position in self._trigrams.get(gram, ()):
+                shared[position] += 1
+        if not shared:
+            return None
+
+        ranked = sorted(shared, key=shared.get, reverse=True)[:MAX_FUZZY_CANDIDATES]
+        best = None
+        for position in ranked:
+            name, city = self._keys[position]
+            length = max(len(name), len(key))
+            limit = int(length * (1 - MIN_FUZZY_SCORE))
+            distance = edit_distance(key, name, limit)
+            if distance > limit:
+                continue
+            score = 1 - distance / length
+            if best is None or score > best.score:
+                best = CityMatch(city, "fuzzy", score, name)
+        return best
+
+    def resolve(self, text: str) -> Optional[City]:
+        match = self.lookup(text)
+        return match.city if match else None
+
+    def canonical_name(self, text: str) -> Optional[str]:
+        city = self.resolve(text)
+        return city.name if city else None
+
+    def iata_code(self, text: str) -> Optional[str]:
+        city = self.resolve(text)
+        return city.iata if city else None
+
+    def station_code(self, text: str) -> Optional[str]:
+        city = self.resolve(text)
+        return city.station if city else None
+
+# Singleton instance
+_city_index_instance = None
+_city_index_lock = threading.Lock()
+
+def get_city_index() -> CityIndex:
+    """Get or create CityIndex singleton instance"""
+    global _city_index_instance
+    if _city_index_instance is None:
+        with _city_index_lock:
+            if _city_index_instance is None:
+                _city_index_instance = CityIndex.load()
+    return _city_index_instance
+
+if __name__ == "__main__":
+    import random
+    import string
+
+    index = get_city_index()
+    samples = [
+        "Bengaluru", "bangalore", "Banglore", "vizag", "Kolkatta", "Hydrabad", "Tiruvanantapuram",
+        "दिल्ली", "சென்னை", "ಬೆಂಗಳೂರು", "কলকাতা", "ممبئی", "BOM", "ndls", "Bombay airport", "Atlantis",
+        "Tirupati", "Mathura", "Shimla",
+    ]
+    for sample in samples:
+        print(f"{sample!r:22} -> {index.lookup(sample)}")
+
+    # Scale check: pad the index with thousands of synthetic cities
+    rng = random.Random(7)
+    synthetic = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))) for _ in range(5000)]
+    big = CityIndex(index.cities + [City(name.title()) for name in synthetic])
+    queries = [name[:-1] + "x" for name in rng.sample(synthetic, 500)]
+    start = time.perf_counter()
+    found = sum(big.lookup(q) is not None for q in queries)
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(big.cities)} cities: {len(queries)} misspelt lookups in {elapsed * 1000:.1f} ms "
+          f"({elapsed / len(queries) * 1e6:.0f} µs each, {found} resolved)")
@@ -0,0 +1,296 @@
+"""
+Date Resolver - fast-path parsing of spoken travel dates
+Common forms ("tomorrow", "25th December", "next Friday", "25/12", "kal",
+"परसों", "நாளை") are resolved with precompiled patterns, anchored to
+Asia/Kolkata, and memoized per (phrase, day). dateparser - one of the
+slowest imports in the project - is only loaded for the long tail.
+"""
+
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+# India has a fixed UTC+5:30 offset (no DST), so no tz database is needed
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+
+def now_ist() -> datetime:
+    """Current Asia/Kolkata wall-clock time as a naive datetime"""
+    return datetime.now(IST).replace(tzinfo=None)
+
+# ============================================================================
+# VOCABULARY
+# ============================================================================
+
+# Phrase -> days from today, across the supported languages
+RELATIVE_DAYS = {
+    # English
+    "today": 0, "tonight": 0, "now": 0, "tomorrow": 1, "tmrw": 1, "tomorow": 1,
+    "day after tomorrow": 2, "the day after tomorrow": 2, "overmorrow": 2,
+    # Hindi / Urdu (romanized and native)
+    "aaj": 0, "आज": 0, "kal": 1, "कल": 1, "parso": 2, "parson": 2, "परसों": 2, "परसो": 2,
+    "آج": 0, "کل": 1, "پرسوں": 2,
+    # Marathi
+    "उद्या": 1, "udya": 1, "परवा": 2,
+    # Tamil
+    "இன்று": 0, "நாளை": 1, "நாளை மறுநாள்": 2,
+    # Telugu
+    "ఈరోజు": 0, "ఈ రోజు": 0, "రేపు": 1, "ఎల్లుండి": 2,
+    # Bengali / Assamese
+    "আজ": 0, "আজি": 0, "আগামীকাল": 1, "কাল": 1, "কাইলৈ": 1, "পরশু": 2, "পৰহিলৈ": 2,
+    # Gujarati
+    "આજે": 0, "આજ": 0, "આવતીકાલે": 1, "કાલે": 1, "પરમદિવસે": 2,
+    # Kannada
+    "ಇಂದು": 0, "ನಾಳೆ": 1, "ನಾಡಿದ್ದು": 2,
+    # Malayalam
+    "ഇന്ന്": 0, "നാളെ": 1, "മറ്റന്നാൾ": 2,
+    # Punjabi
+    "ਅੱਜ": 0, "ਕੱਲ੍ਹ": 1, "ਕੱਲ": 1, "ਪਰਸੋਂ": 2,
+    # Odia
+    "ଆଜି": 0, "ଆସନ୍ତାକାଲି": 1, "କାଲି": 1,
+}
+
+WEEKDAYS = {}
+for _index, _names in enumerate([
+    ["monday", "mon", "somvar", "सोमवार"],
+    ["tuesday", "tue", "tues", "mangalvar", "मंगलवार"],
+    ["wednesday", "wed", "budhvar", "बुधवार"],
+    ["thursday", "thu", "thurs", "guruvar", "brihaspativar", "गुरुवार", "बृहस्पतिवार"],
+    ["friday", "fri", "shukravar", "शुक्रवार"],
+    ["saturday", "sat", "shanivar", "शनिवार"],
+    ["sunday", "sun", "ravivar", "रविवार"],
+]):
+    for _name in _names:
+        WEEKDAYS[_name] = _index
+
+MONTHS = {}
+for _index, _names in enumerate([
+    ["january", "jan", "जनवरी"], ["february", "feb", "फरवरी", "फ़रवरी"], ["march", "mar", "मार्च"],
+    ["april", "apr", "अप्रैल"], ["may", "मई"], ["june", "jun", "जून"], ["july", "jul", "जुलाई"],
+    ["august", "aug", "अगस्त"], ["september", "sep", "sept", "सितंबर", "सितम्बर"],
+    ["october", "oct", "अक्टूबर"], ["november", "nov", "नवंबर", "नवम्बर"],
+    ["december", "dec", "दिसंबर", "दिसम्बर"],
+], 1):
+    for _name in _names:
+        MONTHS[_name] = _index
+
+ORDINAL_WORDS = {
+    word: day for day, word in enumerate([
+        "first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth",
+        "eleventh", "twelfth", "thirteenth", "fourteenth", "fifteenth", "sixteenth", "seventeenth",
+        "eighteenth", "nineteenth", "twentieth", "twenty first", "twenty second", "twenty third",
+        "twenty fourth", "twenty fifth", "twenty sixth", "twenty seventh", "twenty eighth",
+        "twenty ninth", "thirtieth", "thirty first",
+    ], 1)
+}
+
+# Longest first, so "twenty fifth" wins over "fifth"
+_ORDINALS = re.compile(r'\b(?:' + "|".join(
+    w.replace(" ", "[ -]") for w in sorted(ORDINAL_WORDS, key=len, reverse=True)) + r')\b')
+
+# "next"/"this" in English and Hindi
+_NEXT = r'(?:next|agle|अगले|अगला)'
+_THIS = r'(?:this|coming|on|is|इस)'
+# "around the 25th": resolved like "the 25th", but the traveller is flexible by a few days
+FLEXIBLE_WORDS = {"around", "about", "approximately", "roughly", "near", "aaspaas", "lagbhag",
+                  "आसपास", "लगभग"}
+_FILLER = {"on", "the", "for", "of", "by", "morning", "evening", "night", "afternoon", "ko", "को"} | FLEXIBLE_WORDS
+
+_WEEKDAY_NAMES = "|".join(sorted(map(re.escape, WEEKDAYS), key=len, reverse=True))
+_MONTH_NAMES = "|".join(sorted(map(re.escape, MONTHS), key=len, reverse=True))
+_DAY = r'(\d{1,2})(?:st|nd|rd|th)?'
+
+_PATTERNS = {
+    "in_days": re.compile(r'^(?:in|after)\s+(\d+|a|one)\s+(day|days|week|weeks)(?:\s+from now)?$|^(\d+)\s+(day|days|week|weeks)\s+(?:from now|later|baad|बाद)$'),
+    "weekday": re.compile(rf'^(?:({_NEXT}|{_THIS})\s+)?({_WEEKDAY_NAMES})$'),
+    "weekend": re.compile(rf'^(?:({_NEXT}|{_THIS})\s+)?weekend$'),
+    "next_week": re.compile(rf'^{_NEXT}\s+(?:week|hafte|हफ्ते)$'),
+    "day_month": re.compile(rf'^{_DAY}\s+({_MONTH_NAMES})(?:\s+(\d{{4}}))?$'),
+    "month_day": re.compile(rf'^({_MONTH_NAMES})\s+{_DAY}(?:\s+(\d{{4}}))?$'),
+    "numeric": re.compile(r'^(\d{1,2})[/.-](\d{1,2})(?:[/.-](\d{2}|\d{4}))?$'),
+    "iso": re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$'),
+    "day_only": re.compile(rf'^{_DAY}$'),
+}
+
+# ============================================================================
+# RESOLUTION
+# ============================================================================
+
+def normalize_phrase(phrase: str) -> str:
+    text = unicodedata.normalize("NFC", phrase).lower().strip()
+    # Native digits (०-९, ௦-௯, ...) -> ASCII
+    text = "".join(str(unicodedata.decimal(c)) if c.isdigit() and not c.isascii() else c for c in text)
+    text = re.sub(r'[,!?।]', ' ', text)
+    # Token-wise: \b is unreliable next to Indic vowel signs
+    text = " ".join(word for word in text.split() if word not in _FILLER)
+    return _ORDINALS.sub(lambda m: str(ORDINAL_WORDS[m.group(0).replace("-", " ")]), text)
+
+def _future_date(today: datetime, year: Optional[int], month: int, day: int) -> Optional[datetime]:
+    """The given day/month; without a year, the next occurrence from today"""
+    try:
+        if year:
+            return today.replace(year=year, month=month, day=day)
+        candidate = today.replace(month=month, day=day)
+        if candidate < today:
+            candidate = candidate.replace(year=today.year + 1)
+        return candidate
+    except ValueError:
+        return None
+
+def _fast_path(text: str, today: datetime) -> Optional[datetime]:
+    if text in RELATIVE_DAYS:
+        return today + timedelta(days=RELATIVE_DAYS[text])
+
+    match = _PATTERNS["in_days"].match(text)
+    if match:
+        count = match.group(1) or match.group(3)
+        unit = match.group(2) or match.group(4)
+        count = 1 if count in ("a", "one") else int(count)
+        return today + timedelta(days=count * (7 if unit.startswith("week") else 1))
+
+    match = _PATTERNS["weekday"].match(text)
+    if match:
+        target = WEEKDAYS[match.group(2)]
+        ahead = (target - today.weekday()) % 7
+        if match.group(1) and re.fullmatch(_NEXT, match.group(1)):
+            # "next Friday" is the coming Friday, a week out when said on a Friday
+            ahead = ahead or 7
+        return today + timedelta(days=ahead)
+
+    match = _PATTERNS["weekend"].match(text)
+    if match:
+        saturday = today + timedelta(days=(5 - today.weekday()) % 7)
+        if today.weekday() == 6:
+            saturday = today - timedelta(days=1)
+        if match.group(1) and re.fullmatch(_NEXT, match.group(1)):
+            saturday += timedelta(days=7)
+        return max(saturday, today)
+
+    if _PATTERNS["next_week"].match(text):
+        return today + timedelta(days=7 - today.weekday())
+
+    match = _PATTERNS["day_month"].match(text)
+    if match:
+        year = int(match.group(3)) if match.group(3) else None
+        return _future_date(today, year, MONTHS[match.group(2)], int(match.group(1)))
+
+    match = _PATTERNS["month_day"].match(text)
+    if match:
+        year = int(match.group(3)) if match.group(3) else None
+        return _future_date(today, year, MONTHS[match.group(1)], int(match.group(2)))
+
+    match = _PATTERNS["numeric"].match(text)
+    if match:
+        # Indian order: day/month[/year]
+        year = match.group(3)
+        year = (2000 + int(year) if len(year) == 2 else int(year)) if year else None
+        return _future_date(today, year, int(match.group(2)), int(match.group(1)))
+
+    match = _PATTERNS["iso"].match(text)
+    if match:
+        return _future_date(today, int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+    match = _PATTERNS["day_only"].match(text)
+    if match:
+        # "the 25th": this month, or next month once it has passed
+        day = int(match.group(1))
+        month, year = today.month, today.year
+        for _ in range(2):
+            try:
+                candidate = today.replace(year=year, month=month, day=day)
+                if candidate >= today:
+                    return candidate
+            except ValueError:
+                pass
+            month, year = (1, year + 1) if month == 12 else (month + 1, year)
+    return None
+
+_dateparser = None
+_dateparser_lock = threading.Lock()
+
+def _long_tail(phrase: str, today: datetime) -> Optional[datetime]:
+    """dateparser for everything the fast path does not cover (imported on first use)"""
+    global _dateparser
+    if _dateparser is None:
+        with _dateparser_lock:
+            if _dateparser is None:
+                try:
+                    import dateparser
+                    _dateparser = dateparser
+                except ImportError:
+                    _dateparser = False
+    if not _dateparser:
+        return None
+    parsed = _dateparser.parse(phrase, settings={"PREFER_DATES_FROM": "future", "RELATIVE_BASE": today})
+    return parsed.replace(hour=0, minute=0, second=0, microsecond=0) if parsed else None
+
+stats = {"fast": 0, "fallback": 0, "unresolved": 0}
+
+@lru_cache(maxsize=4096)
+def _resolve(phrase: str, day_ordinal: int) -> Optional[datetime]:
+    today = datetime.fromordinal(day_ordinal)
+    result = _fast_path(normalize_phrase(phrase), today)
+    if result:
+        stats["fast"] += 1
+        return result
+    result = _long_tail(phrase, today)
+    stats["fallback" if result else "unresolved"] += 1
+    return result
+
+def resolve_date(phrase: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Resolve a spoken date to midnight (naive, Asia/Kolkata) of that day
+
+    Memoized per (phrase, current IST day), so answers roll over at midnight IST.
+    """
+    if not phrase or not phrase.strip():
+        return None
+    today = (now or now_ist()).date()
+    return _resolve(phrase.strip(), today.toordinal())
+
+def is_flexible(phrase: Optional[str]) -> bool:
+    """True for approximate dates ("around the 25th", "25 tarikh ke aaspaas")"""
+    return bool(phrase) and any(word in FLEXIBLE_WORDS for word in re.split(r'[\s,]+', phrase.lower()))
+
+def cache_info():
+    return _resolve.cache_info()
+
+if __name__ == "__main__":
+    import time
+
+    anchor = datetime(2026, 10, 19)  # a Monday
+    corpus = [
+        "tomorrow", "today", "day after tomorrow", "Tomorrow morning", "next Friday", "this Friday",
+        "friday", "on Saturday", "this weekend", "next weekend", "next week", "in 3 days", "in a week",
+        "25th December", "December 25", "25 dec 2026", "dec 25th", "25/12", "25-12-2026", "2026-12-25",
+        "the 25th", "twenty fifth", "1st of January", "kal", "parso", "aaj", "agle shukravar",
+        "कल", "परसों", "अगले शुक्रवार", "२५ दिसंबर", "நாளை", "రేపు", "আগামীকাল", "ನಾಳೆ", "നാളെ",
+        "ਕੱਲ੍ਹ", "કાલે", "کل", "first monday of next month", "two weeks from tomorrow",
+    ]
+    for phrase in corpus:
+        resolved = resolve_date(phrase, anchor)
+        print(f"{phrase!r:32} -> {resolved.strftime('%a %d %b %Y') if resolved else None}")
+
+    rounds = 1000
+    _resolve.cache_clear()
+    start = time.perf_counter()
+    for phrase in corpus:
+        _fast_path(normalize_phrase(phrase), anchor)
+    cold = (time.perf_counter() - start) / len(corpus)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for phrase in corpus:
+            resolve_date(phrase, anchor)
+    warm = (time.perf_counter() - start) / (rounds * len(corpus))
+    print(f"\nFast path: {cold * 1e6:.1f} µs/phrase uncached, {warm * 1e6:.2f} µs/phrase memoized; "
+          f"{stats}, {cache_info()}")
+
+    if _dateparser:
+        start = time.perf_counter()
+        for phrase in corpus:
+            _dateparser.parse(phrase, settings={"PREFER_DATES_FROM": "future", "RELATIVE_BASE": anchor})
+        print(f"dateparser: {(time.perf_counter() - start) / len(corpus) * 1e6:.0f} µs/phrase")
+    else:
+        print("dateparser not installed: long-tail phrases stay unresolved")
@@ -0,0 +1,307 @@
+"""
+Fare Aggregator - concurrent multi-provider fare search with a top-k merge
+Every provider adapter is queried in parallel with its own timeout and
+circuit breaker. Fares are merged into a bounded max-heap as each provider
+answers (no global sort), snapshots can be streamed to the caller, and a
+search returns as soon as the cheapest-k window has stopped changing.
+Stand-in providers with configurable latency and failure rates make the
+whole path testable offline.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_TOP_K = 5
+PROVIDER_TIMEOUT_SECONDS = 2.0
+# The answer is ready once the top-k has been full and unchanged for this long
+STABLE_SECONDS = 0.15
+
+QUEUE_POLL_SECONDS = 0.02     # how often to check whether queued calls have started
+QUEUE_TIMEOUT_SECONDS = 5.0   # calls never picked up by a worker are dropped after this
+
+BREAKER_FAILURES = 3           # consecutive failures before the breaker opens
+BREAKER_RESET_SECONDS = 30.0   # open breakers let one trial call through after this
+
+class CircuitBreaker:
+    """closed -> open after repeated failures -> half-open trial after a cool-down"""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """A trial call that never ran: let the next one through"""
+        with self._lock:
+            self._trial_running = False
+
+class StandInProvider:
+    """Local provider with configurable latency and failure rate"""
+
+    def __init__(self, name: str, latency: Tuple[float, float] = (0.05, 0.3), failure_rate: float = 0.0,
+                 price_factor: float = 1.0, seed: Optional[int] = None):
+        import numpy as np
+        self.name = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.price_factor = price_factor
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self, query: Dict) -> List[Dict]:
+        from itinerary_generator import generate
+        with self._lock:
+            delay = self._rng.uniform(*self.latency)
+            fails = self._rng.random() < self.failure_rate
+            batch = generate(query["mode"], [(query["origin"], query["destination"], query["date"],
+                                              query.get("passengers", 1))], rng=self._rng)
+        time.sleep(delay)
+        if fails:
+            raise ConnectionError(f"{self.name} is unavailable")
+        fares = batch.to_dicts()
+        for fare in fares:
+            fare["price"] = int(fare["price"] * self.price_factor)
+        return fares
+
+class Provider:
+    """A named fare source: adapter callable + timeout + circuit breaker"""
+
+    def __init__(self, name: str, search: Callable[[Dict], List[Dict]],
+                 timeout: float = PROVIDER_TIMEOUT_SECONDS, breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.search = search
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+
+class ProviderCall:
+    """One submitted provider search; its breaker outcome is recorded exactly once"""
+
+    def __init__(self, provider: Provider):
+        self.provider = provider
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None  # set when a worker picks the call up
+        self._settled = False
+        self._lock = threading.Lock()
+
+    @property
+    def deadline(self) -> Optional[float]:
+        # Time spent queued behind other searches doesn't count against the provider
+        started_at = self.started_at
+        return None if started_at is None else started_at + self.provider.timeout
+
+    def run(self, query: Dict) -> List[Dict]:
+        self.started_at = time.monotonic()
+        return self.provider.search(query)
+
+    def settle(self, ok: Optional[bool]):
+        """Record the outcome on the breaker (None: the call never ran)"""
+        with self._lock:
+            if self._settled:
+                return
+            self._settled = True
+        if ok is None:
+            self.provider.breaker.release_trial()
+        elif ok:
+            self.provider.breaker.record_success()
+        else:
+            self.provider.breaker.record_failure()
+
+    def on_done(self, future):
+        # Also fires for calls the stream stopped waiting on, so a half-open trial always resolves
+        self.settle(None if future.cancelled() else future.exception() is None)
+
+class FareAggregator:
+    """Fan a query out to every provider and merge the cheapest k"""
+
+    def __init__(self, providers: List[Provider], max_workers: int = 8):
+        self.providers = providers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fare")
+        self._sequence = itertools.count()
+
+    def stream(self, query: Dict, k: int = DEFAULT_TOP_K,
+               stable_for: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Yield an event per provider outcome with the current cheapest k
+
+        Events: {"provider", "status" (ok/error/timeout/skipped), "fares",
+        "top"}. With `stable_for`, a final {"status": "stable"} event is
+        yielded (and the stream ends) once the full top-k has not changed for
+        that long, without waiting for slower providers. A provider's timeout
+        runs from when its call starts, not while it waits for a worker.
+        """
+        heap: List[Tuple[int, int, Dict]] = []  # (-price, seq, fare): max-heap of the cheapest k
+        pending = {}
+        for provider in self.providers:
+            if not provider.breaker.allow():
+                yield {"provider": provider.name, "status": "skipped", "fares": 0, "top": self._top(heap)}
+                continue
+            call = ProviderCall(provider)
+            future = self._pool.submit(call.run, query)
+            future.add_done_callback(call.on_done)
+            pending[future] = call
+
+        stable_at = None
+        while pending:
+            now = time.monotonic()
+            deadlines = [call.deadline for call in pending.values()]
+            wake_at = [deadline for deadline in deadlines if deadline is not None]
+            if None in deadlines:
+                wake_at.append(now + QUEUE_POLL_SECONDS)
+            if stable_at is not None:
+                wake_at.append(stable_at)
+            done, _ = wait(pending, timeout=max(0.0, min(wake_at) - now), return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+
+            for future in done:
+                provider = pending.pop(future).provider
+                try:
+                    fares = future.result()
+                except Exception as e:
+                    yield {"provider": provider.name, "status": "error", "error": str(e), "fares": 0,
+                           "top": self._top(heap)}
+                    continue
+                changed = False
+                for fare in fares:
+                    fare.setdefault("provider", provider.name)
+                    entry = (-fare["price"], next(self._sequence), fare)
+                    if len(heap) < k:
+                        heapq.heappush(heap, entry)
+                        changed = True
+                    elif fare["price"] < -heap[0][0]:
+                        heapq.heapreplace(heap, entry)
+                        changed = True
+                if changed and stable_for is not None and len(heap) == k:
+                    stable_at = now + stable_for
+                yield {"provider": provider.name, "status": "ok", "fares": len(fares), "top": self._top(heap)}
+
+            for future, call in list(pending.items()):
+                deadline = call.deadline
+                if deadline is not None and now >= deadline:
+                    del pending[future]
+                    # A provider that misses its timeout counts against its breaker
+                    call.settle(ok=False)
+                    yield {"provider": call.provider.name, "status": "timeout", "fares": 0, "top": self._top(heap)}
+                elif deadline is None and now - call.submitted_at >= QUEUE_TIMEOUT_SECONDS and future.cancel():
+                    # Never started (every worker busy): not the provider's fault
+                    del pending[future]
+                    yield {"provider": call.provider.name, "status": "timeout", "fares": 0, "top": self._top(heap)}
+
+            if pending and stable_at is not None and now >= stable_at:
+                # Calls still running settle their breakers from their done callbacks
+                yield {"provider": None, "status": "stable", "fares": 0, "top": self._top(heap),
+                       "waiting_on": [call.provider.name for call in pending.values()]}
+                return
+
+    def search(self, query: Dict, k: int = DEFAULT_TOP_K, stable_for: float = STABLE_SECONDS) -> Dict:
+        """Cheapest k fares, returned as soon as the top-k is stable"""
+        started = time.perf_counter()
+        outcomes: Dict[str, str] = {}
+        top: List[Dict] = []
+        complete = True
+        for event in self.stream(query, k, stable_for):
+            top = event["top"]
+            if event["status"] == "stable":
+                complete = False
+                for name in event["waiting_on"]:
+                    outcomes[name] = "pending"
+            else:
+                outcomes[event["provider"]] = event["status"]
+        return {
+            "fares": top,
+            "providers": outcomes,
+            "complete": complete,
+            "elapsed_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    @staticmethod
+    def _top(heap: List[Tuple[int, int, Dict]]) -> List[Dict]:
+        return [fare for _, _, fare in sorted(heap, key=lambda entry: (-entry[0], entry[1]))]
+
+def default_providers() -> List[Provider]:
+    """Stand-ins for the booking sites until real adapters are plugged in"""
+    return [
+        Provider("MakeMyTrip", StandInProvider("MakeMyTrip", latency=(0.05, 0.25), failure_rate=0.02)),
+        Provider("Yatra", StandInProvider("Yatra", latency=(0.1, 0.4), failure_rate=0.05, price_factor=0.98)),
+        Provider("Ixigo", StandInProvider("Ixigo", latency=(0.05, 0.2), failure_rate=0.02, price_factor=1.02)),
+        Provider("EaseMyTrip", StandInProvider("EaseMyTrip", latency=(0.2, 0.8), failure_rate=0.1, price_factor=0.95)),
+        Provider("Cleartrip", StandInProvider("Cleartrip", latency=(0.1, 3.0), failure_rate=0.05)),
+    ]
+
+def make_query(mode: str, origin: str, destination: str, date: datetime, passengers: int = 1) -> Dict:
+    return {"mode": mode, "origin": origin, "destination": destination, "date": date, "passengers": passengers}
+
+# Singleton instance
+_fare_aggregator_instance = None
+_fare_aggregator_lock = threading.Lock()
+
+def get_fare_aggregator() -> FareAggregator:
+    """Get or create FareAggregator singleton instance"""
+    global _fare_aggregator_instance
+    if _fare_aggregator_instance is None:
+        with _fare_aggregator_lock:
+            if _fare_aggregator_instance is None:
+                _fare_aggregator_instance = FareAggregator(default_providers())
+    return _fare_aggregator_instance
+
+if __name__ == "__main__":
+    query = make_query("flight", "Delhi", "Mumbai", datetime(2026, 12, 10), 2)
+
+    print("Streaming:")
+    aggregator = FareAggregator([
+        Provider("fast", StandInProvider("fast", latency=(0.05, 0.1), seed=1)),
+        Provider("medium", StandInProvider("medium", latency=(0.2, 0.3), seed=2, price_factor=0.9)),
+        Provider("flaky", StandInProvider("flaky", latency=(0.05, 0.1), failure_rate=1.0, seed=3)),
+        Provider("slow", StandInProvider("slow", latency=(5, 5), seed=4), timeout=1.0),
+    ])
+    for event in aggregator.stream(query, k=3):
+        prices = [f"₹{fare['price']} ({fare['provider']})" for fare in event["top"]]
+        print(f"  {event['provider']:7} {event['status']:8} top: {', '.join(prices)}")
+
+    print("\nEarly answer once the top-k is stable:")
+    result = aggregator.search(query, k=3)
+    print(f"  {result['elapsed_ms']:.0f} ms, complete={result['complete']}, providers={result['providers']}")
+
+    print("\nCircuit breaker on the always-failing provider:")
+    for _ in range(3):
+        result = aggregator.search(query, k=3)
+    flaky = aggregator.providers[2]
+    print(f"  flaky breaker: {flaky.breaker.state}, outcome: {result['providers']['flaky']}")
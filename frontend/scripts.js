@@ -12,6 +12,7 @@ let mediaRecorder;
 let audioChunks = [];
 let isRecording = false;
 let isProcessing = false;
+let sessionId = null;  // Assigned by the backend on the first turn
 
 micBtn.addEventListener('click', toggleRecording);
 newChatBtn.addEventListener('click', startNewChat);
@@ -86,7 +87,7 @@ async function processAudio(audioBlob) {
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({ audio: base64Audio })
+                body: JSON.stringify({ audio: base64Audio, session_id: sessionId })
             });
 
             if (!response.ok) {
@@ -94,6 +95,7 @@ async function processAudio(audioBlob) {
             }
 
             const data = await response.json();
+            sessionId = data.session_id || sessionId;
             
             addMessage(data.transcription, 'user');
             
@@ -107,6 +109,14 @@ async function processAudio(audioBlob) {
                 }, 500);
             }
             
+            if (data.action === 'open_urls' && data.urls) {
+                data.urls.forEach((url, i) => {
+                    setTimeout(() => {
+                        window.open(url, '_blank');
+                    }, 500 + i * 300);
+                });
+            }
+            
             if (data.audio) {
                 setTimeout(() => {
                     playAudio(data.audio);
@@ -161,6 +171,10 @@ function playAudio(base64Audio) {
 }
 
 function startNewChat() {
+    if (sessionId) {
+        fetch(`${API_URL}/api/session/${sessionId}`, { method: 'DELETE' }).catch(() => {});
+        sessionId = null;
+    }
     messages.innerHTML = '';
     welcomeScreen.style.display = 'flex';
     showNotification('New chat started', 'success');
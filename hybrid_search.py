@@ -0,0 +1,276 @@
+"""
+Hybrid Search - BM25 + vector retrieval with metadata pre-filtering
+Documents are indexed twice: a BM25 inverted index with NumPy postings and
+their embedding vectors (from the embedding cache or read back from the FAISS
+index, so nothing is re-embedded).
+Metadata filters (type, origin, destination, modes, cities) pick the
+candidate set first; both scorers rank only those candidates and the two
+rankings are merged with reciprocal rank fusion. Without vectors (offline,
+no embeddings) the lexical side still answers.
+"""
+
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60             # reciprocal rank fusion constant
+FUSION_DEPTH = 50      # ranks taken from each scorer before fusing
+# Above this many candidates the vector side asks FAISS instead of scoring every row
+EXACT_VECTOR_LIMIT = 50000
+
+FILTER_FIELDS = ("type", "origin", "destination", "modes", "cities")
+STOPWORDS = {"a", "an", "the", "to", "from", "for", "in", "of", "on", "and", "or", "is", "by", "at", "how", "what", "i"}
+
+Filters = Dict[str, Union[str, Iterable[str]]]
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in re.findall(r"\w+", text.lower()) if token not in STOPWORDS]
+
+def _filter_value(field: str, value: str) -> str:
+    """Cities compare by canonical name, everything else case-insensitively"""
+    if field in ("origin", "destination", "cities"):
+        from city_index import get_city_index
+        return (get_city_index().canonical_name(value) or value).lower()
+    return str(value).lower()
+
+class BM25Index:
+    """Okapi BM25 over a fixed document list"""
+
+    def __init__(self, texts: List[str]):
+        postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[doc] = len(tokens)
+            for token in tokens:
+                postings[token][doc] = postings[token].get(doc, 0) + 1
+
+        n = len(texts)
+        self.size = n
+        avg_length = float(lengths.mean()) if n else 0.0
+        # Per-document part of the BM25 denominator, computed once
+        self._norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / (avg_length or 1.0))
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray, float]] = {}
+        for token, docs in postings.items():
+            doc_ids = np.fromiter(docs.keys(), dtype=np.int64, count=len(docs))
+            freqs = np.fromiter(docs.values(), dtype=np.float32, count=len(docs))
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            self._postings[token] = (doc_ids, freqs, idf)
+
+    def scores(self, query: str, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """BM25 score per document (0 outside `candidates`, a boolean mask)"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for token in set(tokenize(query)):
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            doc_ids, freqs, idf = posting
+            if candidates is not None:
+                keep = candidates[doc_ids]
+                doc_ids, freqs = doc_ids[keep], freqs[keep]
+            scores[doc_ids] += idf * freqs * (BM25_K1 + 1) / (freqs + self._norm[doc_ids])
+        return scores
+
+class HybridRetriever:
+    """Metadata pre-filter, then BM25 + vector ranking fused by reciprocal rank"""
+
+    def __init__(self, documents: List, index=None):
+        from rag_index import content_hash
+        self.documents = documents
+        self.ids = [content_hash(doc.page_content) for doc in documents]
+        self.bm25 = BM25Index([doc.page_content for doc in documents])
+        self.index = index
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        self._filters = self._build_filters(documents)
+        self.vectors = self._load_vectors()
+
+    @staticmethod
+    def _build_filters(documents: List) -> Dict[str, Dict[str, np.ndarray]]:
+        values: Dict[str, Dict[str, List[int]]] = {field: defaultdict(list) for field in FILTER_FIELDS}
+        for i, doc in enumerate(documents):
+            metadata = dict(doc.metadata)
+            metadata["cities"] = [metadata[field] for field in ("origin", "destination", "city") if metadata.get(field)]
+            for field in FILTER_FIELDS:
+                value = metadata.get(field)
+                for item in (value if isinstance(value, list) else [value] if value else []):
+                    values[field][_filter_value(field, item)].append(i)
+        return {field: {value: np.array(rows, dtype=np.int64) for value, rows in by_value.items()}
+                for field, by_value in values.items()}
+
+    def _load_vectors(self) -> Optional[np.ndarray]:
+        """Unit-length document vectors in document order (None: rank with FAISS, or lexical only)"""
+        if self.index is None or self.index.vector_store is None:
+            return None
+        if len(self.documents) > EXACT_VECTOR_LIMIT:
+            return None  # every vector ranking goes to FAISS; no dense copy
+        embeddings = self.index.embeddings
+        vectors = embeddings.cache.get_many(embeddings.model, self.ids)
+        missing = set(self.ids) - set(vectors)
+        if missing:
+            # Warm start without the embedding cache: read the vectors back out of the index
+            vectors.update(self._reconstruct(missing))
+            missing -= set(vectors)
+        if missing:
+            print(f"⚠️ {len(missing)} document vectors unavailable; vector ranking falls back to FAISS")
+            return None
+        matrix = np.stack([vectors[doc_id] for doc_id in self.ids]) if self.ids else np.zeros((0, 0), np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def _reconstruct(self, wanted: set) -> Dict[str, np.ndarray]:
+        """Vectors of `wanted` documents as stored in the FAISS index (PQ codes decode approximately)"""
+        import faiss
+        store = self.index.vector_store
+        index = store.index
+        try:
+            if isinstance(index, faiss.IndexIVF):
+                # IVF lists have no id -> vector map by default; build one on a copy, not the live index
+                index = faiss.clone_index(index)
+                index.make_direct_map()
+            matrix = index.reconstruct_n(0, index.ntotal)
+        except Exception as e:
+            print(f"⚠️ Could not read vectors back from the index: {e}")
+            return {}
+        ids = store.index_to_docstore_id
+        return {ids[position]: matrix[position] for position in range(len(matrix)) if ids[position] in wanted}
+
+    def candidates(self, filters: Optional[Filters]) -> Optional[np.ndarray]:
+        """Boolean mask of documents matching every filter (None = no filter)"""
+        if not filters:
+            return None
+        mask = np.ones(len(self.documents), dtype=bool)
+        for field, wanted in filters.items():
+            wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+            field_mask = np.zeros(len(self.documents), dtype=bool)
+            for value in wanted:
+                rows = self._filters.get(field, {}).get(_filter_value(field, value))
+                if rows is not None:
+                    field_mask[rows] = True
+            mask &= field_mask
+        return mask
+
+    def search(self, query: str, k: int = 3, filters: Optional[Filters] = None) -> List[Tuple[object, float]]:
+        """Top-k (document, fused score) among documents passing `filters`"""
+        mask = self.candidates(filters)
+        if mask is not None and not mask.any():
+            return []
+        depth = max(FUSION_DEPTH, k)
+
+        lexical = self.bm25.scores(query, mask)
+        rankings = [self._top(lexical, depth, lexical > 0)]
+        vector_ranking = self._vector_ranking(query, mask, depth)
+        if vector_ranking is not None:
+            rankings.append(vector_ranking)
+
+        fused: Dict[int, float] = defaultdict(float)
+        for ranking in rankings:
+            for rank, doc in enumerate(ranking):
+                fused[doc] += 1.0 / (RRF_K + rank + 1)
+        best = sorted(fused.items(), key=lambda item: -item[1])[:k]
+        return [(self.documents[doc], score) for doc, score in best]
+
+    @staticmethod
+    def _top(scores: np.ndarray, depth: int, eligible: np.ndarray) -> np.ndarray:
+        rows = np.nonzero(eligible)[0]
+        if len(rows) > depth:
+            rows = rows[np.argpartition(-scores[rows], depth - 1)[:depth]]
+        return rows[np.argsort(-scores[rows], kind="stable")]
+
+    def _vector_ranking(self, query: str, mask: Optional[np.ndarray], depth: int) -> Optional[np.ndarray]:
+        if self.index is None or self.index.vector_store is None:
+            return None
+        try:
+            vector = np.asarray(self.index.embeddings.embed_query(query), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ Query embedding failed, lexical results only: {e}")
+            return None
+        vector /= np.linalg.norm(vector) or 1.0
+
+        candidate_count = len(self.documents) if mask is None else int(mask.sum())
+        if self.vectors is not None and candidate_count <= EXACT_VECTOR_LIMIT:
+            rows = np.arange(len(self.documents)) if mask is None else np.nonzero(mask)[0]
+            similarity = np.full(len(self.documents), -np.inf, dtype=np.float32)
+            similarity[rows] = self.vectors[rows] @ vector
+            return self._top(similarity, depth, np.isfinite(similarity))
+
+        # Huge candidate sets (or no dense copy): approximate neighbours from FAISS, then the filter
+        results = self.index.vector_store.similarity_search_with_score_by_vector(vector.tolist(), k=depth * 4)
+        rows = [self._positions[doc_id] for doc_id in (self._doc_id(doc) for doc, _ in results) if doc_id in self._positions]
+        return np.array([row for row in rows if mask is None or mask[row]][:depth], dtype=np.int64)
+
+    @staticmethod
+    def _doc_id(doc) -> str:
+        from rag_index import content_hash
+        return content_hash(doc.page_content)
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    import zlib
+    from langchain_core.embeddings import Embeddings
+    from travel_rag import TravelRAG
+
+    class HashingEmbeddings(Embeddings):
+        """Offline stand-in: hashed word and character-trigram counts"""
+
+        model = "hashing-512"
+
+        def embed_documents(self, texts):
+            return [self.embed_query(text) for text in texts]
+
+        def embed_query(self, text):
+            vector = np.zeros(512, dtype=np.float32)
+            words = re.findall(r"\w+", text.lower())
+            for feature in words + [w[i:i + 3] for w in words for i in range(max(1, len(w) - 2))]:
+                vector[zlib.crc32(feature.encode()) % 512] += 1
+            return (vector / (np.linalg.norm(vector) or 1)).tolist()
+
+    if os.getenv("OPENAI_API_KEY"):
+        embeddings = None
+        print("Embeddings: OpenAI")
+    else:
+        embeddings = HashingEmbeddings()
+        print("Embeddings: offline hashing stand-in (set OPENAI_API_KEY for the real comparison)")
+    rag = TravelRAG(embeddings=embeddings, index_dir=tempfile.mkdtemp())
+
+    # Labelled questions: each has exactly one relevant document
+    cases = []
+    for route in rag.travel_data["routes"]:
+        o, d = route["origin"], route["destination"]
+        filters = {"type": "route", "cities": [o, d]}
+        for question in [f"Travel from {o} to {d}", f"How do I get from {o} to {d}?",
+                         f"{d} from {o} by {route['modes'][-1]}"]:
+            cases.append((question, "route", lambda doc, o=o, d=d: doc.metadata.get("origin") == o
+                          and doc.metadata.get("destination") == d, filters))
+    for dest in rag.travel_data["popular_destinations"]:
+        city = dest["city"]
+        for question in [f"Things to do in {city}", f"Best time to visit {city}"]:
+            cases.append((question, "destination", lambda doc, c=city: doc.metadata.get("city") == c,
+                          {"type": "destination", "cities": [city]}))
+
+    def baseline(question, doc_type, k):
+        # The current approach: vector top-k, then drop other document types
+        docs = rag.index.similarity_search(question, k=k)
+        return [doc for doc in docs if doc.metadata.get("type") == doc_type]
+
+    def hybrid(question, doc_type, k, filters):
+        return [doc for doc, _ in rag.retriever.search(question, k=k, filters=filters)]
+
+    # Embed every question up front so both approaches are timed on retrieval alone
+    rag.index.embeddings.embed_queries([case[0] for case in cases])
+    for k in [1, 3]:
+        for name, run in [("vector + post-filter", lambda q, t, f: baseline(q, t, k)),
+                          ("hybrid, type filter", lambda q, t, f: hybrid(q, t, k, {"type": t})),
+                          ("hybrid, type + cities", lambda q, t, f: hybrid(q, t, k, f))]:
+            hits, start = 0, time.perf_counter()
+            for question, doc_type, relevant, filters in cases:
+                hits += any(relevant(doc) for doc in run(question, doc_type, filters))
+            elapsed = (time.perf_counter() - start) / len(cases)
+            print(f"recall@{k} {name:22} {hits / len(cases):.2f}  ({elapsed * 1000:.2f} ms/query, "
+                  f"{len(cases)} questions)")
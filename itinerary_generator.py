@@ -0,0 +1,200 @@
+"""
+Itinerary Generator - vectorized synthetic flight/train/bus search results
+Results for many (origin, destination, date, passengers) queries are drawn
+in one batch from a seeded NumPy Generator into a columnar structured array,
+sorted by (query, price) with a single lexsort. Rows become dicts only at
+the presentation boundary (ResultBatch.to_dicts), so load tests can work
+with millions of itineraries without building Python objects per row.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Query = Tuple[str, str, datetime, int]  # origin, destination, date, passengers
+
+# Per-mode generation parameters (same distributions as the original mock search)
+MODE_SPECS = {
+    "flight": {
+        "count": (3, 5), "base_price": (3000, 8000), "variation": (-1000, 2000), "rank_step": 500,
+        "hours": [6, 9, 12, 15, 18, 21], "minutes": [0, 15, 30, 45], "duration_minutes": (90, 180),
+        "seats": (5, 50), "id_prefix": "FL", "id_range": (1000, 9999),
+        "carriers": ["Air India", "IndiGo", "SpiceJet", "Vistara", "Go First"],
+        "number_prefixes": ["6E", "AI", "SG", "UK"], "number_range": (100, 999),
+        "classes": ["Economy"],
+    },
+    "train": {
+        "count": (3, 5), "base_price": (800, 2500), "variation": (-300, 800), "rank_step": 200,
+        "hours": [7, 10, 14, 17, 20, 23], "minutes": [0, 15, 30], "duration_minutes": (6 * 60, 20 * 60 + 59),
+        "seats": (10, 100), "id_prefix": "TR", "id_range": (10000, 99999),
+        "carriers": ["Rajdhani Express", "Shatabdi Express", "Duronto Express",
+                     "Garib Rath", "Jan Shatabdi", "Superfast Express"],
+        "number_prefixes": [""], "number_range": (10000, 99999),
+        "classes": ["3AC", "2AC", "1AC", "Sleeper"],
+    },
+    "bus": {
+        "count": (4, 6), "base_price": (500, 1500), "variation": (-200, 400), "rank_step": 150,
+        "hours": [6, 9, 12, 15, 18, 21, 23], "minutes": [0, 30], "duration_minutes": (6 * 60, 14 * 60 + 59),
+        "seats": (5, 40), "id_prefix": "BS", "id_range": (1000, 9999),
+        "carriers": ["RedBus", "VRL Travels", "SRS Travels", "Orange Travels", "Kallada Travels"],
+        "number_prefixes": [""], "number_range": (0, 0),
+        "classes": ["AC Sleeper", "AC Seater", "Non-AC Sleeper", "Volvo AC"],
+    },
+}
+
+RESULT_DTYPE = np.dtype([
+    ("query", np.int32),          # index into ResultBatch.queries
+    ("id", np.int32),
+    ("carrier", np.uint8),        # index into MODE_SPECS[mode]["carriers"]
+    ("number_prefix", np.uint8),
+    ("number", np.int32),
+    ("travel_class", np.uint8),
+    ("departure", "datetime64[m]"),
+    ("duration", np.int32),       # minutes
+    ("price", np.int64),          # total for all passengers
+    ("seats", np.int16),
+])
+
+def _between(rng: np.random.Generator, bounds: Tuple[int, int], size: int) -> np.ndarray:
+    return rng.integers(bounds[0], bounds[1] + 1, size=size)
+
+class ResultBatch:
+    """Columnar results for a list of queries, sorted by (query, price)"""
+
+    def __init__(self, mode: str, queries: Sequence[Query], results: np.ndarray, offsets: np.ndarray):
+        self.mode = mode
+        self.queries = queries
+        self.results = results
+        self.offsets = offsets  # results of query i are results[offsets[i]:offsets[i + 1]]
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def for_query(self, index: int) -> np.ndarray:
+        return self.results[self.offsets[index]:self.offsets[index + 1]]
+
+    def cheapest(self) -> np.ndarray:
+        """Cheapest price per query (rows are already price-sorted within a query)"""
+        return self.results["price"][self.offsets[:-1]]
+
+    def to_dicts(self, index: int = 0, top_n: Optional[int] = None) -> List[Dict]:
+        """Presentation rows for one query, in the shape TravelBookingService returns"""
+        spec = MODE_SPECS[self.mode]
+        origin, destination, _, _ = self.queries[index]
+        rows = self.for_query(index)[:top_n]
+        # Column-wise conversion: one tolist() per field instead of per-row numpy scalars
+        departures = rows["departure"].tolist()
+        arrivals = (rows["departure"] + rows["duration"].astype("timedelta64[m]")).tolist()
+        columns = zip(rows["id"].tolist(), rows["carrier"].tolist(), rows["number_prefix"].tolist(),
+                      rows["number"].tolist(), rows["travel_class"].tolist(), rows["duration"].tolist(),
+                      rows["price"].tolist(), rows["seats"].tolist(), departures, arrivals)
+        arrival_format = "%I:%M %p" if self.mode == "flight" else "%I:%M %p, %d %b"
+        options = []
+        for row_id, carrier, prefix, number, travel_class, duration, price, seats, departure, arrival in columns:
+            option = {"id": f"{spec['id_prefix']}{row_id}"}
+            if self.mode == "flight":
+                option["airline"] = spec["carriers"][carrier]
+                option["flight_number"] = f"{spec['number_prefixes'][prefix]}{number}"
+            elif self.mode == "train":
+                option["name"] = spec["carriers"][carrier]
+                option["train_number"] = str(number)
+            else:
+                option["operator"] = spec["carriers"][carrier]
+                option["bus_type"] = spec["classes"][travel_class]
+            option.update({
+                "origin": origin,
+                "destination": destination,
+                "departure": departure.strftime("%I:%M %p"),
+                "arrival": arrival.strftime(arrival_format),
+                "duration": f"{duration // 60}h {duration % 60}m",
+                "price": price,
+                "seats_available": seats,
+            })
+            if self.mode != "bus":
+                option["class"] = spec["classes"][travel_class]
+            options.append(option)
+        return options
+
+def generate(mode: str, queries: Sequence[Query], rng: Optional[np.random.Generator] = None,
+             seed: Optional[int] = None) -> ResultBatch:
+    """
+    Draw search results for every query in one vectorized pass
+
+    Args:
+        mode: "flight", "train" or "bus"
+        queries: (origin, destination, date, passengers) tuples
+        rng: Generator to draw from (else one is created from `seed`)
+    """
+    spec = MODE_SPECS[mode]
+    rng = rng or np.random.default_rng(seed)
+    n = len(queries)
+
+    dates = np.array([np.datetime64(q[2].date(), "D") for q in queries], dtype="datetime64[D]")
+    passengers = np.array([q[3] for q in queries], dtype=np.int64)
+    return _generate(mode, spec, rng, n, dates, passengers, queries)
+
+def generate_columns(mode: str, dates: np.ndarray, passengers: np.ndarray,
+                     rng: Optional[np.random.Generator] = None, seed: Optional[int] = None) -> np.ndarray:
+    """Results for date/passenger columns directly (no per-query Python objects)"""
+    spec = MODE_SPECS[mode]
+    rng = rng or np.random.default_rng(seed)
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    return _generate(mode, spec, rng, len(dates), dates, np.asarray(passengers, dtype=np.int64), None).results
+
+def _generate(mode: str, spec: Dict, rng: np.random.Generator, n: int, dates: np.ndarray,
+              passengers: np.ndarray, queries) -> ResultBatch:
+    counts = _between(rng, spec["count"], n)
+    total = int(counts.sum())
+    starts = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=starts[1:])
+    query = np.repeat(np.arange(n, dtype=np.int32), counts)
+    rank = np.arange(total) - np.repeat(starts[:-1], counts)  # position within its query
+
+    results = np.empty(total, dtype=RESULT_DTYPE)
+    results["query"] = query
+    results["id"] = _between(rng, spec["id_range"], total)
+    results["carrier"] = rng.integers(0, len(spec["carriers"]), size=total)
+    results["number_prefix"] = rng.integers(0, len(spec["number_prefixes"]), size=total)
+    results["number"] = _between(rng, spec["number_range"], total)
+    results["travel_class"] = rng.integers(0, len(spec["classes"]), size=total)
+
+    hours = np.array(spec["hours"])[rng.integers(0, len(spec["hours"]), size=total)]
+    minutes = np.array(spec["minutes"])[rng.integers(0, len(spec["minutes"]), size=total)]
+    results["departure"] = (dates[query].astype("datetime64[m]") +
+                            (hours * 60 + minutes).astype("timedelta64[m]"))
+    results["duration"] = _between(rng, spec["duration_minutes"], total)
+
+    base_price = _between(rng, spec["base_price"], n)[query]
+    price = base_price + _between(rng, spec["variation"], total) + rank * spec["rank_step"]
+    results["price"] = price * passengers[query]
+    results["seats"] = _between(rng, spec["seats"], total)
+
+    # One sort for the whole batch: by query, then price
+    results = results[np.lexsort((results["price"], results["query"]))]
+    return ResultBatch(mode, queries, results, starts)
+
+if __name__ == "__main__":
+    import time
+    from datetime import timedelta
+
+    batch = generate("flight", [("Delhi", "Mumbai", datetime(2026, 12, 10), 2)], seed=42)
+    for option in batch.to_dicts():
+        print(option)
+
+    # Load-test scale: one million queries (~4M itineraries per mode)
+    n = 1_000_000
+    rng = np.random.default_rng(7)
+    dates = np.datetime64("2026-12-01") + rng.integers(0, 90, size=n).astype("timedelta64[D]")
+    passengers = rng.integers(1, 7, size=n)
+    for mode in MODE_SPECS:
+        start = time.perf_counter()
+        results = generate_columns(mode, dates, passengers, rng=rng)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:6} {len(results):>9,} itineraries in {elapsed:.2f}s "
+              f"({len(results) / elapsed / 1e6:.1f}M/s, {results.nbytes / 1e6:.0f} MB)")
+
+    # Same seed -> same results
+    a = generate("train", [("Pune", "Goa", datetime(2026, 12, 1) + timedelta(days=d), 1) for d in range(30)], seed=1)
+    b = generate("train", [("Pune", "Goa", datetime(2026, 12, 1) + timedelta(days=d), 1) for d in range(30)], seed=1)
+    print(f"\nReproducible with a fixed seed: {np.array_equal(a.results, b.results)}")
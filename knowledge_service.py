@@ -0,0 +1,306 @@
+"""
+Knowledge Lookup Service - cached and prefetched Wikipedia summaries
+Summaries are kept in a persistent SQLite cache keyed by normalized title and
+language, disambiguation candidates are prefetched in the background, and an
+optional offline index built from a dump file answers without network.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = "data/knowledge_cache.sqlite3"
+
+# Not-found answers are remembered for a day; summaries for a month
+SUMMARY_TTL_SECONDS = 30 * 24 * 3600
+NOT_FOUND_TTL_SECONDS = 24 * 3600
+PREFETCH_CANDIDATES = 3
+
+class KnowledgeNotFound(Exception):
+    """No article matches the query"""
+
+class KnowledgeAmbiguous(Exception):
+    """The query matches several articles"""
+
+    def __init__(self, options: List[str]):
+        super().__init__(f"Ambiguous: {', '.join(options[:5])}")
+        self.options = options
+
+def normalize_title(query: str) -> str:
+    """Cache key form of a query: lowercase, no punctuation or leading article"""
+    text = query.lower().strip()
+    text = re.sub(r"[?!.,;:\"'()]", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    text = re.sub(r"^(the|a|an) ", "", text)
+    return text
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class WikipediaBackend:
+    """Online lookups through the `wikipedia` package (imported on first use)"""
+
+    def __init__(self, sentences: int = 2):
+        self.sentences = sentences
+        self._lang = None
+        self._lock = threading.Lock()
+
+    def summary(self, query: str, lang: str) -> str:
+        import wikipedia
+        # The library's language is process-wide: hold the lock for the whole
+        # lookup so a prefetch in another language can't switch it mid-request
+        with self._lock:
+            # set_lang clears the library's caches, so only call it on change
+            if self._lang != lang:
+                wikipedia.set_lang(lang)
+                self._lang = lang
+            try:
+                return wikipedia.summary(query, sentences=self.sentences)
+            except wikipedia.exceptions.DisambiguationError as e:
+                raise KnowledgeAmbiguous(list(e.options))
+            except wikipedia.exceptions.PageError:
+                raise KnowledgeNotFound(query)
+
+class OfflineIndex:
+    """
+    Read-only title -> summary index built from a dump file
+
+    Supported dumps:
+        - Wikipedia abstract dumps (*-abstract.xml), streamed with iterparse
+        - JSONL with {"title": ..., "summary": ...} (or "abstract"/"text")
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, dump_path: str, index_path: str, lang: str = "en", batch_size: int = 5000) -> "OfflineIndex":
+        """Stream a dump file into an SQLite index"""
+        start = time.perf_counter()
+        conn = sqlite3.connect(index_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS articles (title TEXT, lang TEXT, summary TEXT, PRIMARY KEY (title, lang))")
+
+        count = 0
+        batch = []
+        for title, summary in _iter_dump(dump_path):
+            if not summary:
+                continue
+            batch.append((normalize_title(title), lang, summary))
+            if len(batch) >= batch_size:
+                conn.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?)", batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?)", batch)
+            count += len(batch)
+        conn.commit()
+        conn.close()
+
+        print(f"✅ Built offline knowledge index with {count} articles in {time.perf_counter() - start:.1f}s")
+        return cls(index_path)
+
+    def lookup(self, title: str, lang: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM articles WHERE title = ? AND lang = ?", (title, lang)
+            ).fetchone()
+        return row[0] if row else None
+
+def _iter_dump(dump_path: str) -> Iterator[Tuple[str, str]]:
+    """Yield (title, summary) pairs from a dump file without loading it whole"""
+    if dump_path.endswith(".xml"):
+        import xml.etree.ElementTree as ET
+        for _, elem in ET.iterparse(dump_path, events=("end",)):
+            if elem.tag == "doc":
+                title = elem.findtext("title") or ""
+                title = re.sub(r"^Wikipedia:\s*", "", title)
+                yield title, (elem.findtext("abstract") or "").strip()
+                elem.clear()
+    else:
+        with open(dump_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                summary = record.get("summary") or record.get("abstract") or record.get("text") or ""
+                yield record.get("title", ""), summary.strip()
+
+# ============================================================================
+# SERVICE
+# ============================================================================
+
+class KnowledgeService:
+    """Cache-first knowledge lookups with background prefetching"""
+
+    def __init__(self, cache_path: Optional[str] = DEFAULT_CACHE_PATH,
+                 backend: Optional[Callable[[str, str], str]] = None,
+                 offline_index: Optional[OfflineIndex] = None):
+        """
+        Args:
+            cache_path: SQLite cache file (":memory:" or None for in-process only)
+            backend: Callable(query, lang) -> summary raising KnowledgeNotFound /
+                KnowledgeAmbiguous; defaults to WikipediaBackend
+            offline_index: Optional OfflineIndex consulted before the backend
+        """
+        self.backend = backend or WikipediaBackend().summary
+        self.offline_index = offline_index
+        self._conn = sqlite3.connect(cache_path or ":memory:", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "title TEXT, lang TEXT, kind TEXT, payload TEXT, fetched_at REAL, "
+            "PRIMARY KEY (title, lang))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="knowledge-prefetch")
+        self._prefetching = set()
+        self.stats = {"hits": 0, "offline_hits": 0, "misses": 0, "prefetched": 0}
+
+    def lookup(self, query: str, lang: str = "en") -> Dict:
+        """
+        Look up a topic
+
+        Returns:
+            Dict with kind ("summary", "disambiguation" or "not_found"),
+            summary or options, and source ("cache", "offline" or "online")
+        """
+        title = normalize_title(query)
+        cached = self._read_cache(title, lang)
+        if cached:
+            self.stats["hits"] += 1
+            if cached["kind"] == "disambiguation":
+                self._prefetch(cached["options"], lang)
+            return {**cached, "source": "cache"}
+
+        if self.offline_index:
+            summary = self.offline_index.lookup(title, lang)
+            if summary:
+                self.stats["offline_hits"] += 1
+                return {"kind": "summary", "summary": summary, "source": "offline"}
+
+        self.stats["misses"] += 1
+        result = self._fetch(query, title, lang)
+        if result["kind"] == "disambiguation":
+            self._prefetch(result["options"], lang)
+        return {**result, "source": "online"}
+
+    def _fetch(self, query: str, title: str, lang: str) -> Dict:
+        try:
+            result = {"kind": "summary", "summary": self.backend(query, lang)}
+        except KnowledgeAmbiguous as e:
+            result = {"kind": "disambiguation", "options": e.options[:10]}
+        except KnowledgeNotFound:
+            result = {"kind": "not_found"}
+        self._write_cache(title, lang, result)
+        return result
+
+    def _prefetch(self, options: List[str], lang: str):
+        """Warm the cache with the top disambiguation candidates"""
+        for option in options[:PREFETCH_CANDIDATES]:
+            title = normalize_title(option)
+            if self._read_cache(title, lang):
+                continue
+            with self._lock:
+                if (title, lang) in self._prefetching:
+                    continue
+                self._prefetching.add((title, lang))
+            self._prefetch_pool.submit(self._prefetch_one, option, title, lang)
+
+    def _prefetch_one(self, option: str, title: str, lang: str):
+        try:
+            self._fetch(option, title, lang)
+            self.stats["prefetched"] += 1
+        except Exception as e:
+            print(f"⚠️ Knowledge prefetch failed for '{option}': {e}")
+        finally:
+            with self._lock:
+                self._prefetching.discard((title, lang))
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _read_cache(self, title: str, lang: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT kind, payload, fetched_at FROM summaries WHERE title = ? AND lang = ?",
+                (title, lang)
+            ).fetchone()
+        if not row:
+            return None
+        kind, payload, fetched_at = row
+        ttl = NOT_FOUND_TTL_SECONDS if kind == "not_found" else SUMMARY_TTL_SECONDS
+        if time.time() - fetched_at > ttl:
+            return None
+        return {"kind": kind, **json.loads(payload)}
+
+    def _write_cache(self, title: str, lang: str, result: Dict):
+        payload = json.dumps({k: v for k, v in result.items() if k != "kind"})
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+                (title, lang, result["kind"], payload, time.time())
+            )
+            self._conn.commit()
+
+    def wait_for_prefetch(self, timeout: float = 10.0):
+        """Block until queued prefetches finish (for tests and benchmarks)"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._lock:
+                if not self._prefetching:
+                    return
+            time.sleep(0.01)
+
+# Singleton instance
+_knowledge_service_instance = None
+_knowledge_service_lock = threading.Lock()
+
+def get_knowledge_service() -> KnowledgeService:
+    """Get or create KnowledgeService singleton instance"""
+    global _knowledge_service_instance
+    if _knowledge_service_instance is None:
+        with _knowledge_service_lock:
+            if _knowledge_service_instance is None:
+                index_path = os.getenv("KNOWLEDGE_OFFLINE_INDEX")
+                offline_index = OfflineIndex(index_path) if index_path and os.path.exists(index_path) else None
+                _knowledge_service_instance = KnowledgeService(offline_index=offline_index)
+    return _knowledge_service_instance
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) == 3:
+        # python3 knowledge_service.py <dump.xml|dump.jsonl> <index.sqlite3>
+        OfflineIndex.build(sys.argv[1], sys.argv[2])
+        sys.exit(0)
+
+    # Demo with a fake backend: first lookup pays the latency, repeats don't
+    articles = {"python programming language": "Python is a programming language.",
+                "python snake": "Pythons are snakes."}
+
+    def fake_backend(query: str, lang: str) -> str:
+        time.sleep(0.5)
+        title = normalize_title(query)
+        if title == "python":
+            raise KnowledgeAmbiguous(["Python (programming language)", "Python (snake)"])
+        if title in articles:
+            return articles[title]
+        raise KnowledgeNotFound(query)
+
+    service = KnowledgeService(cache_path=None, backend=fake_backend)
+    for q in ["Python", "Python", "Python programming language", "python snake?"]:
+        start = time.perf_counter()
+        result = service.lookup(q)
+        print(f"{q!r}: {result['kind']} from {result['source']} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        service.wait_for_prefetch()
+    print(f"Stats: {service.stats}")
@@ -0,0 +1,473 @@
+"""
+RAG Index - incremental FAISS index over content-hashed documents
+Documents are identified by the SHA-256 of their text and their embeddings
+are kept in a persistent cache keyed by (model, content hash), so a data
+change only embeds the documents that are new or edited. A sync applies the
+delta to a copy of the live index (removed documents are deleted from the
+FAISS index in place, new ones are added) and swaps it in with a single
+reference assignment: readers are never blocked and never see a half-updated
+index.
+
+Large corpora get an approximate index (IVF, HNSW or IVF-PQ, trained on a
+sample of the vectors) instead of the flat exact one, and uncached texts
+are embedded in concurrent batches that back off together when the API
+rate-limits.
+"""
+
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_EMBEDDING_CACHE_PATH = "data/embedding_cache.sqlite3"
+SQLITE_MAX_PARAMS = 500  # hashes per IN (...) lookup
+QUERY_CACHE_BYTES = 16 * 1024 * 1024  # ~2,500 ada-002 sized query vectors
+
+# Approximate nearest neighbour index types; "auto" picks by corpus size
+INDEX_TYPES = ("auto", "flat", "ivf", "hnsw", "pq")
+AUTO_FLAT_LIMIT = 20000       # "auto" keeps exact search up to this many documents
+TRAIN_SAMPLE_SIZE = 100000    # vectors used to train IVF / PQ quantizers
+IVF_NPROBE = 16               # inverted lists scanned per query
+HNSW_M = 32                   # graph neighbours per node
+HNSW_EF_SEARCH = 128
+PQ_SUBVECTOR_DIMS = 8         # dimensions encoded per PQ byte
+PQ_MIN_TRAIN = 39 * 256       # FAISS wants 39 points per PQ centroid; fewer falls back to IVF
+
+EMBED_BATCH_SIZE = 512        # texts per embeddings request
+EMBED_WORKERS = 4             # concurrent embeddings requests
+EMBED_MAX_RETRIES = 6
+EMBED_BACKOFF_SECONDS = 1.0   # first retry delay, doubled per attempt
+EMBED_MAX_BACKOFF_SECONDS = 60.0
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def model_name(embeddings) -> str:
+    return getattr(embeddings, "model", None) or type(embeddings).__name__
+
+def resolve_index_type(index_type: str, count: int) -> str:
+    """The concrete index type for `count` vectors ("auto": flat, then IVF)"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}, expected one of {INDEX_TYPES}")
+    if index_type == "auto":
+        return "flat" if count <= AUTO_FLAT_LIMIT else "ivf"
+    return index_type
+
+def new_ann_index(index_type: str, sample: np.ndarray, count: int):
+    """
+    An empty FAISS index (L2, like LangChain's default) trained on `sample`
+
+    `count` is the expected corpus size; it sets the number of IVF lists.
+    """
+    import faiss
+    index_type = resolve_index_type(index_type, count)
+    dim = sample.shape[1]
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, HNSW_M)
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+
+    if len(sample) > TRAIN_SAMPLE_SIZE:
+        sample = sample[np.random.default_rng(0).choice(len(sample), TRAIN_SAMPLE_SIZE, replace=False)]
+    sample = np.ascontiguousarray(sample, dtype=np.float32)
+    # ~4 sqrt(n) lists, with at least 39 training vectors per list (FAISS's minimum)
+    nlist = int(max(1, min(4 * np.sqrt(count), len(sample) // 39)))
+    quantizer = faiss.IndexFlatL2(dim)
+    if index_type == "pq" and len(sample) >= PQ_MIN_TRAIN:
+        subvectors = max(1, dim // PQ_SUBVECTOR_DIMS)
+        while dim % subvectors:
+            subvectors -= 1
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, subvectors, 8)
+    else:
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+    index.train(sample)
+    index.nprobe = min(IVF_NPROBE, nlist)
+    return index
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying `error`, or None if it is not transient"""
+    response = getattr(error, "response", None)
+    status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+    name = type(error).__name__
+    if not (status == 429 or (status or 0) >= 500 or name in ("RateLimitError", "APIConnectionError",
+                                                               "APITimeoutError", "Timeout", "ConnectionError")):
+        return None
+    retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        if retry_after:
+            return min(float(retry_after), EMBED_MAX_BACKOFF_SECONDS)
+    except ValueError:
+        pass
+    # Full jitter so concurrent workers don't retry in lockstep
+    return random.uniform(0.5, 1.0) * min(EMBED_MAX_BACKOFF_SECONDS, EMBED_BACKOFF_SECONDS * 2 ** attempt)
+
+class BatchEmbedder:
+    """
+    Embeds long text lists in concurrent batches
+
+    A rate-limited (429) or failed request is retried with exponential
+    backoff, and every worker pauses until the backoff ends, so the whole
+    batch slows down instead of hammering the API.
+    """
+
+    def __init__(self, embeddings: Embeddings, batch_size: int = EMBED_BATCH_SIZE,
+                 workers: int = EMBED_WORKERS, max_retries: int = EMBED_MAX_RETRIES):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0}
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """float32 matrix of vectors, in the order of `texts`"""
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        if len(batches) <= 1 or self.workers <= 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(batches)), thread_name_prefix="embed") as pool:
+                results = list(pool.map(self._embed_batch, batches))
+        return np.vstack(results) if results else np.zeros((0, 0), dtype=np.float32)
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.call(self.embeddings.embed_documents, texts), dtype=np.float32)
+
+    def call(self, request, *args):
+        """Run one embeddings request, retrying transient failures with backoff"""
+        for attempt in range(self.max_retries + 1):
+            pause = self._resume_at - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            try:
+                with self._lock:
+                    self.stats["requests"] += 1
+                return request(*args)
+            except Exception as e:
+                delay = _retry_delay(e, attempt)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                    self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                print(f"⏳ Embeddings request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+
+class EmbeddingCache:
+    """Persistent (model, content hash) -> float32 vector store on SQLite"""
+
+    def __init__(self, path: Optional[str] = DEFAULT_EMBEDDING_CACHE_PATH):
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, content_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, content_hash))"
+            )
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(hashes), SQLITE_MAX_PARAMS):
+                chunk = hashes[start:start + SQLITE_MAX_PARAMS]
+                rows = self._conn.execute(
+                    f"SELECT content_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND content_hash IN ({','.join('?' * len(chunk))})", [model, *chunk]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, Iterable[float]]):
+        rows = [(model, key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in vectors.items()]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+
+    def count(self, model: Optional[str] = None) -> int:
+        with self._lock:
+            if model:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+def normalize_query(text: str) -> str:
+    """Cache key form of a query: NFC, lowercase, single spaces, no trailing punctuation"""
+    text = unicodedata.normalize("NFC", text).lower()
+    return re.sub(r"\s+", " ", text).strip(" ?!.,")
+
+class QueryEmbeddingCache:
+    """LRU of normalized query -> vector, bounded by memory rather than entry count"""
+
+    def __init__(self, max_bytes: int = QUERY_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _size(key: str, vector: np.ndarray) -> int:
+        return vector.nbytes + len(key.encode("utf-8"))
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return vector
+
+    def put(self, key: str, vector: Iterable[float]):
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._size(key, self._entries.pop(key))
+            self._entries[key] = vector
+            self._bytes += self._size(key, vector)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_vector = self._entries.popitem(last=False)
+                self._bytes -= self._size(old_key, old_vector)
+                self.stats["evictions"] += 1
+
+    def info(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {**self.stats, "entries": len(self._entries), "bytes": self._bytes,
+                    "hit_rate": self.stats["hits"] / lookups if lookups else 0.0}
+
+class CachingEmbeddings(Embeddings):
+    """
+    Document vectors come from the persistent cache when the text is
+    unchanged, query vectors from an in-memory LRU; misses are embedded in
+    one call
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: Optional[EmbeddingCache] = None,
+                 query_cache: Optional[QueryEmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.model = model_name(embeddings)
+        self.cache = cache or EmbeddingCache()
+        self.queries = query_cache or QueryEmbeddingCache()
+        self.embedder = BatchEmbedder(embeddings)
+        self.stats = {"cached": 0, "embedded": 0}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_array(self, texts: List[str], hashes: Optional[List[str]] = None) -> np.ndarray:
+        """Document vectors as a float32 matrix; misses go out in concurrent batches"""
+        hashes = hashes or [content_hash(text) for text in texts]
+        vectors = self.cache.get_many(self.model, list(set(hashes)))
+        missing = {key: text for key, text in zip(hashes, texts) if key not in vectors}
+        if missing:
+            fresh = dict(zip(missing.keys(), self.embedder.embed(list(missing.values()))))
+            self.cache.put_many(self.model, fresh)
+            vectors.update(fresh)
+        self.stats["embedded"] += len(missing)
+        self.stats["cached"] += len(texts) - len(missing)
+        if not hashes:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in hashes])
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Vectors for many queries; all cache misses go to the API in one batch"""
+        keys = [normalize_query(text) for text in texts]
+        # The cache is keyed by the normalized form, but the API sees the query as spoken
+        originals = {}
+        for key, text in zip(keys, texts):
+            originals.setdefault(key, text)
+        vectors = {}
+        for key in originals:
+            vector = self.queries.get(key)
+            if vector is not None:
+                vectors[key] = vector
+        missing = [key for key in originals if key not in vectors]
+        fresh = []
+        if len(missing) == 1:
+            fresh = [self.embedder.call(self.embeddings.embed_query, originals[missing[0]])]
+        elif missing:
+            # Batched requests (OpenAI embeds queries and documents alike)
+            fresh = self.embedder.embed([originals[key] for key in missing])
+        for key, vector in zip(missing, fresh):
+            self.queries.put(key, vector)
+            vectors[key] = np.asarray(vector, dtype=np.float32)
+        return [vectors[key].tolist() for key in keys]
+
+class DocumentIndex:
+    """A FAISS vector store kept in sync with a document list by content hash"""
+
+    def __init__(self, embeddings: Embeddings, cache: Optional[EmbeddingCache] = None, index_type: str = "auto"):
+        self.embeddings = embeddings if isinstance(embeddings, CachingEmbeddings) else CachingEmbeddings(embeddings, cache)
+        resolve_index_type(index_type, 0)  # validate early
+        self.index_type = index_type
+        self.vector_store = None
+        self._sync_lock = threading.Lock()  # one writer at a time; readers never take it
+
+    def __len__(self) -> int:
+        store = self.vector_store
+        return len(store.index_to_docstore_id) if store else 0
+
+    def ids(self) -> set:
+        store = self.vector_store
+        return set(store.index_to_docstore_id.values()) if store else set()
+
+    def sync(self, documents: List) -> Dict:
+        """
+        Make the index hold exactly `documents` (keyed by content hash)
+
+        Returns dict with added, removed, embedded (API calls' worth of
+        texts), total and seconds
+        """
+        start = time.perf_counter()
+        with self._sync_lock:
+            wanted = {content_hash(doc.page_content): doc for doc in documents}
+            current = self.vector_store
+            existing = self.ids()
+            removed = [key for key in existing if key not in wanted]
+            added = [key for key in wanted if key not in existing]
+            embedded_before = self.embeddings.stats["embedded"]
+
+            if removed or added:
+                store = self._copy(current) if current else None
+                to_add = added
+                if store is not None and removed:
+                    if self._can_remove(store.index):
+                        store.delete(ids=removed)
+                    else:
+                        # HNSW can't delete: rebuild from cached vectors (nothing is re-embedded)
+                        store, to_add = None, list(wanted)
+                if to_add:
+                    texts = [wanted[key].page_content for key in to_add]
+                    vectors = self.embeddings.embed_array(texts, to_add)
+                    metadatas = [wanted[key].metadata for key in to_add]
+                    if store is None:
+                        store = self._new_store(vectors, len(wanted))
+                    store.add_embeddings(list(zip(texts, vectors.tolist())), metadatas=metadatas, ids=to_add)
+                # Swap: readers holding the old store finish on it undisturbed
+                self.vector_store = store
+
+        return {
+            "added": len(added),
+            "removed": len(removed),
+            "embedded": self.embeddings.stats["embedded"] - embedded_before,
+            "total": len(self),
+            "seconds": time.perf_counter() - start,
+        }
+
+    def _new_store(self, sample: np.ndarray, count: int):
+        """Empty FAISS store of this index's type, trained on `sample` if it needs training"""
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+        return FAISS(self.embeddings, new_ann_index(self.index_type, sample, count), InMemoryDocstore(), {})
+
+    @staticmethod
+    def _can_remove(index) -> bool:
+        import faiss
+        return not isinstance(index, faiss.IndexHNSW)
+
+    @staticmethod
+    def _copy(store):
+        """Independent copy of a FAISS store (vectors are copied, not re-embedded)"""
+        import faiss
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+        return FAISS(store.embedding_function, faiss.clone_index(store.index),
+                     InMemoryDocstore(dict(store.docstore._dict)), dict(store.index_to_docstore_id))
+
+    def similarity_search(self, query: str, k: int = 4) -> List:
+        store = self.vector_store  # one read: a concurrent swap can't change it mid-search
+        return store.similarity_search(query, k=k) if store else []
+
+    def similarity_search_many(self, queries: List[str], k: int = 4) -> List[List]:
+        """Results per query, with every uncached query embedded in one batch"""
+        store = self.vector_store
+        if not store:
+            return [[] for _ in queries]
+        vectors = self.embeddings.embed_queries(queries)
+        return [store.similarity_search_by_vector(vector, k=k) for vector in vectors]
+
+    def save(self, path: str):
+        self.vector_store.save_local(path)
+
+    def load(self, path: str):
+        from langchain_community.vectorstores import FAISS
+        # Only ever loads what save() wrote, so unpickling the docstore is safe
+        try:
+            self.vector_store = FAISS.load_local(path, self.embeddings, allow_dangerous_deserialization=True)
+        except TypeError:  # older langchain-community without the flag
+            self.vector_store = FAISS.load_local(path, self.embeddings)
+
+if __name__ == "__main__":
+    import tempfile
+    from langchain.docstore.document import Document
+
+    class CountingEmbeddings(Embeddings):
+        """Deterministic local vectors; counts what would have been API calls"""
+
+        def __init__(self, size: int = 256):
+            self.size = size
+            self.texts = 0
+
+        def embed_documents(self, texts):
+            self.texts += len(texts)
+            return [np.random.default_rng(int(content_hash(t)[:8], 16)).standard_normal(self.size).tolist()
+                    for t in texts]
+
+        def embed_query(self, text):
+            return self.embed_documents([text])[0]
+
+    embeddings = CountingEmbeddings()
+    cache = EmbeddingCache(os.path.join(tempfile.mkdtemp(), "embeddings.sqlite3"))
+    for n in [20, 10000, 30000]:
+        docs = [Document(page_content=f"Route {i}: City{i} to City{i + 1}", metadata={"i": i}) for i in range(n)]
+        index = DocumentIndex(embeddings, cache)
+        embeddings.texts = 0
+        first = index.sync(docs)
+
+        # Edit 1%, delete 1%, add 1%
+        edited = list(docs)
+        for i in random.Random(0).sample(range(n), max(1, n // 100)):
+            edited[i] = Document(page_content=docs[i].page_content + " (updated)", metadata={"i": i})
+        edited = edited[max(1, n // 100):] + [Document(page_content=f"New route {i}") for i in range(max(1, n // 100))]
+        delta = index.sync(edited)
+
+        rebuilt = DocumentIndex(embeddings, cache).sync(edited)
+        print(f"{n:>6} docs: initial {first['seconds']:.2f}s ({first['embedded']} embedded), "
+              f"delta +{delta['added']}/-{delta['removed']} in {delta['seconds']:.2f}s "
+              f"({delta['embedded']} embedded), cached rebuild {rebuilt['seconds']:.2f}s ({rebuilt['embedded']} embedded)")
+
+    # Repetitive route/tip questions: only distinct normalized queries reach the API
+    cities = [f"City{i}" for i in range(50)]
+    questions = [f"Travel from {random.choice(cities)} to {random.choice(cities)}" for _ in range(5000)]
+    questions += [f"travel tips for {random.choice(cities)}?" for _ in range(5000)]
+    index.embeddings.queries = QueryEmbeddingCache(max_bytes=1024 * 1024)
+    embeddings.texts = 0
+    start = time.perf_counter()
+    for question in questions:
+        index.embeddings.embed_query(question)
+    print(f"\n10,000 questions: {embeddings.texts} embedded in {time.perf_counter() - start:.2f}s, "
+          f"cache {index.embeddings.queries.info()}")
+    embeddings.texts = 0
+    index.embeddings.embed_queries([f"Travel tips for {city} in winter" for city in cities])
+    print(f"Batch of 50 new queries: {embeddings.texts} texts in one embed_documents call")
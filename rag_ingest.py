@@ -0,0 +1,263 @@
+"""
+RAG Ingest - streaming JSONL ingestion into a trained ANN index
+Large corpora (national route and station lists) are read line by line;
+only a bounded training sample is ever held as Python objects. A first pass
+records each line's byte offset and a reservoir sample of texts to train
+the index on; a second pass embeds chunks concurrently (through the
+embedding cache) and adds them to the FAISS index. Document text stays in
+the JSONL file: the docstore keeps only offsets and content hashes in NumPy
+arrays and reads a line back when a search returns it.
+"""
+
+import json
+import random
+import time
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+
+from rag_index import DocumentIndex, TRAIN_SAMPLE_SIZE, content_hash, new_ann_index, resolve_index_type
+
+INGEST_CHUNK_SIZE = 8192  # lines embedded and added per step
+TEXT_FIELD = "text"
+
+def record_to_document(record: Dict, text_field: str = TEXT_FIELD) -> Document:
+    """The text field becomes the content, every other field metadata"""
+    metadata = {key: value for key, value in record.items() if key != text_field}
+    return Document(page_content=record[text_field], metadata=metadata)
+
+def _lines(path: str) -> Iterator[Tuple[int, bytes]]:
+    """(byte offset, line) for every non-blank line"""
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                yield offset, line
+            offset += len(line)
+
+class CompactIds:
+    """Index position -> content hash, stored as raw 32-byte digests"""
+
+    def __init__(self, digests: np.ndarray):
+        self.digests = digests  # (n, 32) uint8
+
+    def __getitem__(self, position: int) -> str:
+        if not 0 <= position < len(self.digests):
+            raise KeyError(position)
+        return self.digests[position].tobytes().hex()
+
+    def __len__(self) -> int:
+        return len(self.digests)
+
+    def __iter__(self):
+        return iter(range(len(self.digests)))
+
+    def values(self):
+        return (self[position] for position in range(len(self.digests)))
+
+class JsonlDocstore(Docstore):
+    """Read-only docstore over a JSONL file: content hash -> line, via sorted hash prefixes"""
+
+    def __init__(self, path: str, offsets: np.ndarray, digests: np.ndarray, text_field: str = TEXT_FIELD):
+        self.path = path
+        self.text_field = text_field
+        self.offsets = offsets
+        prefixes = digests[:, :8].copy().view(">u8").ravel()
+        self._order = np.argsort(prefixes, kind="stable")
+        self._prefixes = prefixes[self._order]
+
+    def search(self, search: str) -> Document:
+        prefix = np.frombuffer(bytes.fromhex(search[:16]), dtype=">u8")[0]
+        slot = int(np.searchsorted(self._prefixes, prefix))
+        if slot == len(self._prefixes) or self._prefixes[slot] != prefix:
+            return f"ID {search} not found."
+        with open(self.path, "rb") as f:
+            f.seek(int(self.offsets[self._order[slot]]))
+            return record_to_document(json.loads(f.readline()), self.text_field)
+
+def ingest_jsonl(index: DocumentIndex, path: str, text_field: str = TEXT_FIELD,
+                 chunk_size: int = INGEST_CHUNK_SIZE) -> Dict:
+    """
+    Replace `index`'s store with one built from a JSONL file
+
+    Each line is a JSON object with a `text_field`; its other fields become
+    metadata. The index type comes from `index` ("auto" resolves by line
+    count). The file must stay in place while the index is used. A streamed
+    store is read-only: re-ingest the file rather than sync() it.
+
+    Returns dict with documents, index_type, embedded, and seconds spent
+    scanning, training, embedding and adding
+    """
+    from langchain_community.vectorstores import FAISS
+    timings = {"scan": 0.0, "train": 0.0, "embed": 0.0, "add": 0.0}
+    start = time.perf_counter()
+    embedded_before = index.embeddings.stats["embedded"]
+
+    # Pass 1: offsets + a uniform reservoir sample of texts for training
+    offsets: List[int] = []
+    sample: List[str] = []
+    rng = random.Random(0)
+    for count, (offset, line) in enumerate(_lines(path)):
+        offsets.append(offset)
+        if count < TRAIN_SAMPLE_SIZE:
+            sample.append(json.loads(line)[text_field])
+        else:
+            slot = rng.randrange(count + 1)
+            if slot < TRAIN_SAMPLE_SIZE:
+                sample[slot] = json.loads(line)[text_field]
+    offsets = np.array(offsets, dtype=np.int64)
+    total = len(offsets)
+    timings["scan"] = time.perf_counter() - start
+    if not total:
+        raise ValueError(f"No documents in {path}")
+
+    step = time.perf_counter()
+    # Sample vectors land in the embedding cache, so pass 2 doesn't pay for them again
+    sample_vectors = index.embeddings.embed_array(sample)
+    timings["embed"] += time.perf_counter() - step
+    step = time.perf_counter()
+    ann = new_ann_index(index.index_type, sample_vectors, total)
+    timings["train"] = time.perf_counter() - step
+    del sample, sample_vectors
+
+    # Pass 2: embed and add chunk by chunk
+    digests = np.zeros((total, 32), dtype=np.uint8)
+    position = 0
+    chunk: List[str] = []
+
+    def flush():
+        nonlocal position
+        hashes = [content_hash(text) for text in chunk]
+        step = time.perf_counter()
+        vectors = index.embeddings.embed_array(chunk, hashes)
+        timings["embed"] += time.perf_counter() - step
+        step = time.perf_counter()
+        ann.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        timings["add"] += time.perf_counter() - step
+        digests[position:position + len(chunk)] = np.frombuffer(
+            bytes.fromhex("".join(hashes)), dtype=np.uint8).reshape(-1, 32)
+        position += len(chunk)
+        chunk.clear()
+
+    for _, line in _lines(path):
+        chunk.append(json.loads(line)[text_field])
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    store = FAISS(index.embeddings, ann, JsonlDocstore(path, offsets, digests, text_field), CompactIds(digests))
+    index.vector_store = store
+    return {
+        "documents": total,
+        "index_type": resolve_index_type(index.index_type, total),
+        "embedded": index.embeddings.stats["embedded"] - embedded_before,
+        **{f"{name}_seconds": seconds for name, seconds in timings.items()},
+        "seconds": time.perf_counter() - start,
+    }
+
+if __name__ == "__main__":
+    import gc
+    import os
+    import re
+    import shutil
+    import sys
+    import tempfile
+    import psutil
+    from langchain_core.embeddings import Embeddings
+    from rag_index import EmbeddingCache
+
+    DIM = 128
+    CITIES = 300
+    MODES = ["flight", "train", "bus"]
+
+    class RouteEmbeddings(Embeddings):
+        """
+        Offline stand-in: vectors built from the city/mode/hour tokens of a
+        route line, so near-duplicate routes cluster like real embeddings do
+        """
+
+        model = f"route-stand-in-{DIM}"
+
+        def __init__(self):
+            rng = np.random.default_rng(0)
+            self.cities = rng.standard_normal((CITIES, DIM)).astype(np.float32)
+            self.modes = rng.standard_normal((len(MODES), DIM)).astype(np.float32)
+            self.hours = rng.standard_normal((24, DIM)).astype(np.float32)
+            self.distances = rng.standard_normal((101, DIM)).astype(np.float32)
+
+        def embed_documents(self, texts):
+            parts = [re.match(r"City(\d+) to City(\d+) by (\w+) at (\d+):00(?:, (\d+))?", text).groups()
+                     for text in texts]
+            parts = np.array([(int(o), int(d), MODES.index(m), int(h), int(km or 0) % 101)
+                              for o, d, m, h, km in parts])
+            vectors = (self.cities[parts[:, 0]] + 0.7 * self.cities[parts[:, 1]] + 0.3 * self.modes[parts[:, 2]]
+                       + 0.2 * self.hours[parts[:, 3]] + 0.1 * self.distances[parts[:, 4]])
+            return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        def embed_query(self, text):
+            return self.embed_documents([text])[0]
+
+    def write_corpus(path: str, count: int):
+        rng = np.random.default_rng(count)
+        with open(path, "w", encoding="utf-8") as f:
+            for start in range(0, count, 100000):
+                n = min(100000, count - start)
+                rows = np.column_stack([rng.integers(0, CITIES, n), rng.integers(0, CITIES, n),
+                                        rng.integers(0, len(MODES), n), rng.integers(0, 24, n),
+                                        rng.integers(50, 3000, n)])
+                f.writelines(json.dumps({"text": f"City{o} to City{d} by {MODES[m]} at {h:02d}:00, {km} km",
+                                         "type": "route", "id": start + i}) + "\n"
+                             for i, (o, d, m, h, km) in enumerate(rows.tolist()))
+
+    def rss_mb() -> float:
+        gc.collect()
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+
+    # python rag_ingest.py [sizes...] [--types flat,ivf,hnsw,pq]
+    types = ["flat", "ivf", "hnsw", "pq"]
+    if "--types" in sys.argv:
+        types = sys.argv.pop(sys.argv.index("--types") + 1).split(",")
+        sys.argv.remove("--types")
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+
+    workdir = tempfile.mkdtemp()
+    embeddings = RouteEmbeddings()
+    queries = [f"City{i} to City{(i * 7) % CITIES} by {MODES[i % 3]} at {i % 24:02d}:00" for i in range(200)]
+    query_vectors = np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+    print(f"{DIM}-d vectors (OpenAI's are 1536-d: vector memory scales ~12x), 200 queries, top 10\n")
+    print(f"{'docs':>9} {'index':>5} {'build s':>8} {'embed s':>8} {'train s':>8} {'add s':>7} "
+          f"{'RSS +MB':>8} {'ms/query':>9} {'recall@10':>9}")
+    try:
+        for size in sizes:
+            corpus = os.path.join(workdir, f"routes-{size}.jsonl")
+            write_corpus(corpus, size)
+            cache = EmbeddingCache(os.path.join(workdir, f"embeddings-{size}.sqlite3"))
+            exact = None
+            for index_type in types:
+                before = rss_mb()
+                index = DocumentIndex(embeddings, cache, index_type=index_type)
+                stats = ingest_jsonl(index, corpus)
+                grown = rss_mb() - before
+
+                store = index.vector_store
+                started = time.perf_counter()
+                results = [store.similarity_search_by_vector(vector.tolist(), k=10) for vector in query_vectors]
+                latency = (time.perf_counter() - started) / len(queries) * 1000
+                # Recall: share of results no farther than the exact 10th neighbour (the stand-in has many ties)
+                distances = [np.linalg.norm(np.asarray(embeddings.embed_documents([d.page_content for d in docs]))
+                                            - vector, axis=1) for docs, vector in zip(results, query_vectors)]
+                if exact is None and index_type == "flat":
+                    exact = [d.max() for d in distances]
+                recall = (np.mean([np.mean(d <= kth + 1e-4) for d, kth in zip(distances, exact)])
+                          if exact else float("nan"))
+                print(f"{size:>9,} {stats['index_type']:>5} {stats['seconds']:>8.1f} {stats['embed_seconds']:>8.1f} "
+                      f"{stats['train_seconds']:>8.1f} {stats['add_seconds']:>7.1f} {grown:>8.0f} "
+                      f"{latency:>9.2f} {recall:>9.2f}")
+                del index, store
+            del cache
+            os.remove(corpus)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
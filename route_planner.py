@@ -0,0 +1,419 @@
+"""
+Route Planner - multi-leg itineraries over a precomputed multimodal route graph
+Routes from data/travel_data.json become weighted edges (one per mode) and
+all-pairs fastest, cheapest and shortest paths are precomputed with a
+vectorized Floyd-Warshall into distance + next-hop matrices. A query is then
+a path walk over the next-hop matrix (microseconds). Adding or improving a
+route is an O(n^2) vectorized update; slowing or removing one re-runs
+Dijkstra only from the sources whose paths used it.
+
+Floyd-Warshall is O(n^3), so networks above ALL_PAIRS_LIMIT cities skip
+the precomputation: each query runs Dijkstra from its origin and the
+resulting rows are kept in a small LRU per metric.
+"""
+
+import heapq
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_DATA_PATH = "data/travel_data.json"
+
+METRICS = ("fastest", "cheapest", "shortest")
+CONNECTION_MINUTES = 60  # Buffer added per leg when ranking by time
+
+# Used when a route has no average time for a mode: (km/h, fixed overhead minutes)
+MODE_SPEEDS = {"flight": (600, 60), "train": (60, 0), "bus": (50, 0)}
+# Estimated fare in ₹: base + per-km (the route data has no prices)
+MODE_FARES = {"flight": (1500, 4.0), "train": (200, 1.0), "bus": (100, 1.5)}
+
+# Above this many cities paths are computed per origin on demand instead of all-pairs
+ALL_PAIRS_LIMIT = 1500
+ROW_CACHE_SIZE = 512          # on-demand shortest-path rows kept per metric
+SYNC_REBUILD_CHANGES = 50     # a data sync with more changed routes rebuilds from scratch
+
+INF = np.inf
+
+def parse_duration(text: Optional[str]) -> Optional[int]:
+    """'2h 15m' -> 135"""
+    if not text:
+        return None
+    hours = re.search(r'(\d+)\s*h', text)
+    minutes = re.search(r'(\d+)\s*m', text)
+    if not hours and not minutes:
+        return None
+    return (int(hours.group(1)) * 60 if hours else 0) + (int(minutes.group(1)) if minutes else 0)
+
+def estimate_leg(mode: str, distance_km: float, minutes: Optional[int] = None) -> Dict:
+    """Minutes, km and estimated fare for one mode on one route"""
+    if minutes is None:
+        speed, overhead = MODE_SPEEDS[mode]
+        minutes = int(distance_km / speed * 60 + overhead)
+    base, per_km = MODE_FARES[mode]
+    return {"mode": mode, "minutes": minutes, "km": distance_km, "cost": int(base + per_km * distance_km)}
+
+def _weight(leg: Dict, metric: str) -> float:
+    if metric == "fastest":
+        return leg["minutes"] + CONNECTION_MINUTES
+    if metric == "cheapest":
+        return leg["cost"]
+    return leg["km"]
+
+class RouteGraph:
+    """Cities + per-mode legs, with all-pairs paths for each metric"""
+
+    def __init__(self):
+        self.cities: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.legs: Dict[Tuple[int, int], Dict[str, Dict]] = {}  # (u, v) -> mode -> leg
+        self.dist: Dict[str, np.ndarray] = {}
+        self.next_hop: Dict[str, np.ndarray] = {}
+        self.precomputed = False  # all-pairs matrices (small networks) or on-demand rows
+        self._rows: Dict[str, "OrderedDict[int, np.ndarray]"] = {metric: OrderedDict() for metric in METRICS}
+        self._adjacency: Dict[str, Dict[int, List[Tuple[int, float]]]] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_travel_data(cls, path: str = DEFAULT_DATA_PATH) -> "RouteGraph":
+        with open(path, "r") as f:
+            data = json.load(f)
+        graph = cls()
+        for route in data.get("routes", []):
+            graph._add_legs(route["origin"], route["destination"], graph._route_legs(route))
+        graph.rebuild()
+        return graph
+
+    @staticmethod
+    def _route_legs(route: Dict) -> List[Dict]:
+        return [estimate_leg(mode, route["distance_km"], parse_duration(route.get(f"avg_{mode}_time")))
+                for mode in route.get("modes", []) if mode in MODE_SPEEDS]
+
+    # ------------------------------------------------------------------
+    # Structure
+    # ------------------------------------------------------------------
+
+    def _canonical(self, name: str) -> str:
+        from city_index import get_city_index
+        return get_city_index().canonical_name(name) or name.strip().title()
+
+    def _node(self, name: str) -> int:
+        name = self._canonical(name)
+        if name not in self.index:
+            self.index[name] = len(self.cities)
+            self.cities.append(name)
+        return self.index[name]
+
+    def _add_legs(self, origin: str, destination: str, legs: List[Dict]):
+        u, v = self._node(origin), self._node(destination)
+        # Routes are bidirectional
+        for key in [(u, v), (v, u)]:
+            self.legs[key] = {leg["mode"]: leg for leg in legs}
+        self._adjacency.clear()
+
+    def _best_leg(self, u: int, v: int, metric: str) -> Optional[Dict]:
+        legs = self.legs.get((u, v))
+        return min(legs.values(), key=lambda leg: _weight(leg, metric)) if legs else None
+
+    def _edge_weight(self, u: int, v: int, metric: str) -> float:
+        leg = self._best_leg(u, v, metric)
+        return _weight(leg, metric) if leg else INF
+
+    # ------------------------------------------------------------------
+    # All-pairs precomputation
+    # ------------------------------------------------------------------
+
+    def rebuild(self):
+        """Full all-pairs recomputation (vectorized Floyd-Warshall per metric)"""
+        with self._lock:
+            n = len(self.cities)
+            self._adjacency.clear()
+            for rows in self._rows.values():
+                rows.clear()
+            self.precomputed = n <= ALL_PAIRS_LIMIT
+            if not self.precomputed:
+                self.dist, self.next_hop = {}, {}
+                return
+            for metric in METRICS:
+                dist = np.full((n, n), INF, dtype=np.float32)
+                next_hop = np.full((n, n), -1, dtype=np.int32)
+                np.fill_diagonal(dist, 0)
+                np.fill_diagonal(next_hop, np.arange(n))
+                for (u, v) in self.legs:
+                    dist[u, v] = self._edge_weight(u, v, metric)
+                    next_hop[u, v] = v
+                via = np.empty_like(dist)
+                better = np.empty(dist.shape, dtype=bool)
+                for k in range(n):
+                    # In place: no per-pivot allocations
+                    np.add(dist[:, k:k + 1], dist[k:k + 1, :], out=via)
+                    np.less(via, dist, out=better)
+                    np.copyto(dist, via, where=better)
+                    np.copyto(next_hop, next_hop[:, k:k + 1], where=better)
+                self.dist[metric] = dist
+                self.next_hop[metric] = next_hop
+
+    def _grow(self, n: int):
+        """Make room for newly added cities in the matrices"""
+        for metric in METRICS:
+            old = self.dist[metric].shape[0]
+            if old == n:
+                continue
+            dist = np.full((n, n), INF, dtype=np.float32)
+            dist[:old, :old] = self.dist[metric]
+            next_hop = np.full((n, n), -1, dtype=np.int32)
+            next_hop[:old, :old] = self.next_hop[metric]
+            for i in range(old, n):
+                dist[i, i] = 0
+                next_hop[i, i] = i
+            self.dist[metric], self.next_hop[metric] = dist, next_hop
+
+    def update_route(self, origin: str, destination: str, modes: Optional[Dict[str, Optional[str]]] = None,
+                     distance_km: Optional[float] = None):
+        """
+        Add, change or remove (modes=None) a route and update all paths incrementally
+
+        Args:
+            modes: mode -> average time ("2h 15m") or None to estimate from distance
+        """
+        legs = [estimate_leg(mode, distance_km, parse_duration(time)) for mode, time in (modes or {}).items()]
+        self._set_legs(origin, destination, legs)
+
+    def sync(self, routes: List[Dict]) -> Dict:
+        """
+        Bring the graph in line with a new route list (travel_data.json "routes")
+
+        Only added, changed and removed routes are applied; a large diff
+        rebuilds instead. Returns dict with changed and rebuilt.
+        """
+        with self._lock:
+            wanted = {}
+            for route in routes:
+                u, v = self._node(route["origin"]), self._node(route["destination"])
+                wanted[(min(u, v), max(u, v))] = (route["origin"], route["destination"], self._route_legs(route))
+            changes = [(origin, destination, legs) for (u, v), (origin, destination, legs) in wanted.items()
+                       if self.legs.get((u, v)) != {leg["mode"]: leg for leg in legs}]
+            changes += [(self.cities[u], self.cities[v], []) for (u, v) in self.legs
+                        if u < v and (u, v) not in wanted]
+
+            if len(changes) > SYNC_REBUILD_CHANGES:
+                for origin, destination, legs in changes:
+                    self._replace_legs(origin, destination, legs)
+                self.rebuild()
+                return {"changed": len(changes), "rebuilt": True}
+            for origin, destination, legs in changes:
+                self._set_legs(origin, destination, legs)
+            return {"changed": len(changes), "rebuilt": False}
+
+    def _replace_legs(self, origin: str, destination: str, legs: List[Dict]):
+        if legs:
+            self._add_legs(origin, destination, legs)
+        else:
+            u, v = self._node(origin), self._node(destination)
+            self.legs.pop((u, v), None)
+            self.legs.pop((v, u), None)
+            self._adjacency.clear()
+
+    def _set_legs(self, origin: str, destination: str, legs: List[Dict]):
+        """Replace one route's legs (none: remove it) and update paths incrementally"""
+        with self._lock:
+            u, v = self._node(origin), self._node(destination)
+            if not self.precomputed:
+                # On-demand rows are cheap to recompute: forget them
+                self._replace_legs(origin, destination, legs)
+                for rows in self._rows.values():
+                    rows.clear()
+                return
+            self._grow(len(self.cities))
+            old = {metric: (self._edge_weight(u, v, metric), self._edge_weight(v, u, metric)) for metric in METRICS}
+            self._replace_legs(origin, destination, legs)
+
+            for metric in METRICS:
+                for (a, b), old_weight in zip([(u, v), (v, u)], old[metric]):
+                    new_weight = self._edge_weight(a, b, metric)
+                    if new_weight < old_weight:
+                        self._decrease(metric, a, b, new_weight)
+                    elif new_weight > old_weight:
+                        self._increase(metric, a, b, old_weight)
+
+    def _decrease(self, metric: str, u: int, v: int, weight: float):
+        """Edge u->v got cheaper: every pair may now route through it (O(n^2))"""
+        dist, next_hop = self.dist[metric], self.next_hop[metric]
+        via = dist[:, u:u + 1] + weight + dist[v:v + 1, :]
+        better = via < dist
+        if better.any():
+            first = next_hop[:, u].copy()
+            first[u] = v
+            self.dist[metric] = np.where(better, via, dist)
+            self.next_hop[metric] = np.where(better, first[:, None], next_hop)
+
+    def _increase(self, metric: str, u: int, v: int, old_weight: float):
+        """Edge u->v got dearer or vanished: recompute sources whose paths used it"""
+        dist = self.dist[metric]
+        affected = np.nonzero(np.isclose(dist[:, u] + old_weight, dist[:, v]) & np.isfinite(dist[:, v]))[0]
+        for source in affected:
+            self._dijkstra_row(metric, int(source))
+
+    def _neighbors(self, metric: str) -> Dict[int, List[Tuple[int, float]]]:
+        adjacency = self._adjacency.get(metric)
+        if adjacency is None:
+            adjacency = {}
+            for (a, b) in self.legs:
+                adjacency.setdefault(a, []).append((b, self._edge_weight(a, b, metric)))
+            self._adjacency[metric] = adjacency
+        return adjacency
+
+    def _dijkstra(self, metric: str, source: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Distances, first hops and predecessors from `source`"""
+        n = len(self.cities)
+        adjacency = self._neighbors(metric)
+        # Plain lists in the loop (NumPy scalar indexing is several times slower)
+        dist, first, previous = [INF] * n, [-1] * n, [-1] * n
+        dist[source], first[source] = 0.0, source
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            for neighbor, weight in adjacency.get(node, ()):
+                candidate = d + weight
+                if candidate < dist[neighbor]:
+                    dist[neighbor] = candidate
+                    first[neighbor] = neighbor if node == source else first[node]
+                    previous[neighbor] = node
+                    heapq.heappush(heap, (candidate, neighbor))
+        return np.array(dist), np.array(first, dtype=np.int32), np.array(previous, dtype=np.int32)
+
+    def _dijkstra_row(self, metric: str, source: int):
+        dist, first, _ = self._dijkstra(metric, source)
+        self.dist[metric][source] = dist
+        self.next_hop[metric][source] = first
+
+    def _path(self, metric: str, u: int, v: int) -> Optional[List[int]]:
+        """Cities on the best u -> v path, or None if unreachable"""
+        with self._lock:
+            if self.precomputed:
+                next_hop = self.next_hop[metric]
+                if next_hop[u, v] < 0:
+                    return None
+                path = [u]
+                while path[-1] != v:
+                    path.append(int(next_hop[path[-1], v]))
+                return path
+
+            rows = self._rows[metric]
+            previous = rows.get(u)
+            if previous is None:
+                previous = self._dijkstra(metric, u)[2]
+                rows[u] = previous
+                while len(rows) > ROW_CACHE_SIZE:
+                    rows.popitem(last=False)
+            rows.move_to_end(u)
+        if previous[v] < 0:
+            return None
+        path = [v]
+        while path[-1] != u:
+            path.append(int(previous[path[-1]]))
+        return path[::-1]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def plan(self, origin: str, destination: str, metric: str = "fastest") -> Optional[Dict]:
+        """Best itinerary by `metric`, or None if the cities are not connected"""
+        u = self.index.get(self._canonical(origin))
+        v = self.index.get(self._canonical(destination))
+        if u is None or v is None or u == v or metric not in METRICS:
+            return None
+        path = self._path(metric, u, v)
+        if not path:
+            return None
+
+        legs = [{"from": self.cities[a], "to": self.cities[b], **self._best_leg(a, b, metric)}
+                for a, b in zip(path, path[1:])]
+        return {
+            "origin": self.cities[u],
+            "destination": self.cities[v],
+            "metric": metric,
+            "legs": legs,
+            "minutes": sum(leg["minutes"] for leg in legs) + CONNECTION_MINUTES * (len(legs) - 1),
+            "km": sum(leg["km"] for leg in legs),
+            "cost": sum(leg["cost"] for leg in legs),
+        }
+
+def format_itinerary(plan: Dict) -> str:
+    """Speakable summary of a planned itinerary"""
+    hours, minutes = divmod(plan["minutes"], 60)
+    steps = ", then ".join(f"{leg['mode']} from {leg['from']} to {leg['to']}" for leg in plan["legs"])
+    return (f"The {plan['metric']} way from {plan['origin']} to {plan['destination']} is {steps}. "
+            f"About {hours} hours {minutes} minutes including connections, {plan['km']:.0f} km, "
+            f"roughly ₹{plan['cost']:,}.")
+
+# Singleton instance
+_route_graph_instance = None
+_route_graph_lock = threading.Lock()
+
+def get_route_graph() -> RouteGraph:
+    """Get or create RouteGraph singleton instance"""
+    global _route_graph_instance
+    if _route_graph_instance is None:
+        with _route_graph_lock:
+            if _route_graph_instance is None:
+                _route_graph_instance = RouteGraph.from_travel_data()
+    return _route_graph_instance
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    graph = get_route_graph()
+    for metric in METRICS:
+        print(format_itinerary(graph.plan("Ranchi", "Goa", metric)))
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        graph.plan("Ranchi", "Goa")
+    print(f"\nQuery: {(time.perf_counter() - start) / 10000 * 1e6:.1f} µs")
+
+    graph.update_route("Ranchi", "Goa", {"flight": "2h 30m"}, 1700)
+    print(f"After adding a direct flight: {format_itinerary(graph.plan('Ranchi', 'Goa'))}")
+    graph.update_route("Ranchi", "Goa", None)
+    print(f"After removing it again: {len(graph.plan('Ranchi', 'Goa')['legs'])} legs")
+
+    # Scale: random sparse networks (python route_planner.py 5000 for a bigger run);
+    # above ALL_PAIRS_LIMIT cities, "build" is nothing and queries run Dijkstra per origin
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 500, 1000, 3000]
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        big = RouteGraph()
+        names = [f"City{i}" for i in range(n)]
+        big.cities, big.index = names, {name: i for i, name in enumerate(names)}
+        big._canonical = lambda name: name
+        for u in range(n):
+            for v in rng.choice(n, size=3, replace=False):
+                if u != v:
+                    mode = ["flight", "train", "bus"][int(rng.integers(3))]
+                    leg = estimate_leg(mode, float(rng.integers(50, 2000)))
+                    big.legs[(u, int(v))] = big.legs[(int(v), u)] = {mode: leg}
+        start = time.perf_counter()
+        big.rebuild()
+        build = time.perf_counter() - start
+        pairs = rng.integers(0, n, size=(500, 2))
+        start = time.perf_counter()
+        for a, b in pairs:
+            big.plan(names[a], names[b])
+        query = (time.perf_counter() - start) / len(pairs)
+        start = time.perf_counter()
+        for a, b in pairs:
+            big.plan(names[a], names[b])
+        repeat = (time.perf_counter() - start) / len(pairs)
+        start = time.perf_counter()
+        big.update_route(names[0], names[n // 2], {"flight": "1h"}, 100)
+        update = time.perf_counter() - start
+        mode = "all-pairs" if big.precomputed else "on-demand"
+        print(f"{n:>5} cities ({mode}): build x3 metrics {build:.2f}s, query {query * 1e6:.0f} µs "
+              f"(repeat {repeat * 1e6:.0f} µs), add route {update * 1000:.1f} ms")
@@ -0,0 +1,244 @@
+"""
+Safe Math - sandboxed, bounded-cost arithmetic for the calculator skill
+Spoken expressions are rewritten into Python syntax, parsed once into an AST
+(cached) and evaluated by a whitelisting interpreter that refuses anything
+that could take unbounded time or memory (huge powers, big factorials).
+"""
+
+import ast
+import math
+import operator
+import re
+import time
+from functools import lru_cache
+from typing import Union
+
+Number = Union[int, float]
+
+# Cost limits
+MAX_EXPRESSION_LENGTH = 200
+MAX_AST_NODES = 100
+MAX_FACTORIAL_ARG = 1000        # 1000! has 2568 digits
+MAX_RESULT_DIGITS = 3000        # Bound on any intermediate integer
+MAX_EXPONENT = 10000
+CPU_BUDGET_SECONDS = 0.05
+EXACT_SPOKEN_DIGITS = 21        # Longer integers are read as "about ... times 10 to the power ..."
+
+class CalculationError(ValueError):
+    """Expression is invalid, not allowed, or too expensive to evaluate"""
+
+# ============================================================================
+# SPOKEN TEXT -> EXPRESSION
+# ============================================================================
+
+_WORD_REPLACEMENTS = [
+    (r'\bsquare root of\b', ' sqrt '),
+    (r'\bcube root of\b', ' cbrt '),
+    (r'\bfactorial of\b', ' factorial '),
+    (r'(\d+(?:\.\d+)?)\s*factorial\b', r' factorial(\1) '),
+    (r'\bto the power of\b', ' ** '),
+    (r'\braised to\b', ' ** '),
+    (r'\bmultiplied by\b', ' * '),
+    (r'\bdivided by\b', ' / '),
+    (r'\bover\b', ' / '),
+    (r'\bmod(?:ulo)?\b', ' % '),
+    (r'\bplus\b', ' + '),
+    (r'\bminus\b', ' - '),
+    (r'\btimes\b', ' * '),
+    (r'\bmultiply\b', ' * '),
+    (r'\bsquared\b', ' ** 2 '),
+    (r'\bcubed\b', ' ** 3 '),
+    (r'(?<=\d)\s*[x×]\s*(?=\d)', ' * '),
+    (r'÷', ' / '),
+    (r'\^', ' ** '),
+]
+_WORD_PATTERNS = [(re.compile(p), r) for p, r in _WORD_REPLACEMENTS]
+_FUNCTION_ARG = re.compile(r'\b(sqrt|cbrt|factorial)\s+(\d+(?:\.\d+)?)')
+# A spoken "minus" in front of a number (not between two operands) names a
+# negative number, so "minus 8 to the power of 2" is (-8) ** 2, not -(8 ** 2)
+_NEGATIVE_BASE = re.compile(r'(^|[-+*/%(]\s*)-\s*(\d+(?:\.\d+)?)\s*\*\*')
+_ALLOWED_TOKENS = re.compile(r'\d+(?:\.\d+)?|\*\*|[-+*/%()]|\b(?:sqrt|cbrt|factorial|pi)\b')
+
+def spoken_to_expression(text: str) -> str:
+    """Rewrite spoken arithmetic ("5 plus 3 squared") into an expression"""
+    text = text.lower().replace(",", "")
+    for pattern, replacement in _WORD_PATTERNS:
+        text = pattern.sub(replacement, text)
+    # "sqrt 16" -> "sqrt(16)"
+    text = _FUNCTION_ARG.sub(r'\1(\2)', text)
+    text = _NEGATIVE_BASE.sub(r'\1(-\2) **', text.strip())
+    # Drop everything that is not a number, operator or known function
+    return " ".join(_ALLOWED_TOKENS.findall(text))
+
+# ============================================================================
+# EVALUATOR
+# ============================================================================
+
+def _digits(n: int) -> int:
+    """Cheap upper bound on the decimal digits of an int"""
+    return int(n.bit_length() * 0.30103) + 1
+
+def _check_int(value: Number) -> Number:
+    if isinstance(value, int) and _digits(abs(value)) > MAX_RESULT_DIGITS:
+        raise CalculationError("That number is too large for me to work out")
+    return value
+
+def _safe_pow(base: Number, exponent: Number) -> Number:
+    if abs(exponent) > MAX_EXPONENT:
+        raise CalculationError("That exponent is too large")
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        if _digits(abs(base)) * exponent > MAX_RESULT_DIGITS:
+            raise CalculationError("That power is too large for me to work out")
+    try:
+        result = operator.pow(base, exponent)
+    except OverflowError:
+        raise CalculationError("That power is too large for me to work out")
+    if isinstance(result, complex):
+        raise CalculationError("A negative number to a fractional power has no real answer")
+    return result
+
+def _safe_mul(a: Number, b: Number) -> Number:
+    if isinstance(a, int) and isinstance(b, int) and a and b:
+        if _digits(abs(a)) + _digits(abs(b)) > MAX_RESULT_DIGITS + 1:
+            raise CalculationError("That number is too large for me to work out")
+    return a * b
+
+def _safe_factorial(n: Number) -> int:
+    if isinstance(n, float):
+        if not n.is_integer():
+            raise CalculationError("Factorial needs a whole number")
+        n = int(n)
+    if n < 0:
+        raise CalculationError("Factorial needs a non-negative number")
+    if n > MAX_FACTORIAL_ARG:
+        raise CalculationError(f"I can only work out factorials up to {MAX_FACTORIAL_ARG}")
+    return math.factorial(n)
+
+def _safe_sqrt(x: Number) -> float:
+    if x < 0:
+        raise CalculationError("I can't take the square root of a negative number")
+    return math.isqrt(x) if isinstance(x, int) and math.isqrt(x) ** 2 == x else math.sqrt(x)
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _safe_mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _safe_pow,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_FUNCTIONS = {
+    "sqrt": _safe_sqrt,
+    "cbrt": lambda x: math.copysign(abs(x) ** (1 / 3), x),
+    "factorial": _safe_factorial,
+    "abs": abs,
+}
+_NAMES = {"pi": math.pi, "e": math.e}
+
+@lru_cache(maxsize=512)
+def compile_expression(expression: str) -> ast.Expression:
+    """Parse and validate an expression once; later calls hit the cache"""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalculationError("That expression is too long")
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        raise CalculationError("I couldn't understand that calculation")
+
+    nodes = list(ast.walk(tree))
+    if len(nodes) > MAX_AST_NODES:
+        raise CalculationError("That expression is too long")
+    for node in nodes:
+        if isinstance(node, (ast.Expression, ast.Load)) or type(node) in _BIN_OPS or type(node) in _UNARY_OPS:
+            continue
+        if isinstance(node, (ast.BinOp, ast.UnaryOp)):
+            if type(node.op) not in _BIN_OPS and type(node.op) not in _UNARY_OPS:
+                raise CalculationError("That operation isn't supported")
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+                raise CalculationError("Only numbers are allowed")
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or node.keywords or len(node.args) != 1:
+                raise CalculationError("That function isn't supported")
+        elif isinstance(node, ast.Name):
+            if node.id not in _FUNCTIONS and node.id not in _NAMES:
+                raise CalculationError(f"I don't know what '{node.id}' is")
+        else:
+            raise CalculationError("That expression isn't supported")
+    return tree
+
+def _eval(node: ast.AST, deadline: float) -> Number:
+    if time.perf_counter() > deadline:
+        raise CalculationError("That calculation is taking too long")
+
+    if isinstance(node, ast.Expression):
+        return _eval(node.body, deadline)
+    if isinstance(node, ast.Constant):
+        return _check_int(node.value)
+    if isinstance(node, ast.Name):
+        return _NAMES[node.id]
+    if isinstance(node, ast.UnaryOp):
+        return _UNARY_OPS[type(node.op)](_eval(node.operand, deadline))
+    if isinstance(node, ast.BinOp):
+        left = _eval(node.left, deadline)
+        right = _eval(node.right, deadline)
+        try:
+            return _check_int(_BIN_OPS[type(node.op)](left, right))
+        except ZeroDivisionError:
+            raise CalculationError("You can't divide by zero")
+    if isinstance(node, ast.Call):
+        arg = _eval(node.args[0], deadline)
+        return _check_int(_FUNCTIONS[node.func.id](arg))
+    raise CalculationError("That expression isn't supported")
+
+def evaluate(expression: str, budget: float = CPU_BUDGET_SECONDS) -> Number:
+    """
+    Evaluate an arithmetic expression within the cost limits
+
+    Raises:
+        CalculationError: invalid, disallowed or too expensive
+    """
+    tree = compile_expression(expression.strip())
+    return _eval(tree, time.perf_counter() + budget)
+
+def format_number(value: Number) -> str:
+    """Speakable form of a result"""
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.10g}"
+    if _digits(abs(value)) > EXACT_SPOKEN_DIGITS:
+        digits = len(str(value).lstrip("-"))
+        mantissa = float(str(value).lstrip("-")[:6]) / 10 ** 5
+        sign = "minus " if value < 0 else ""
+        return f"{sign}about {mantissa:.4g} times 10 to the power {digits - 1}"
+    return str(value)
+
+def evaluate_spoken(text: str) -> str:
+    """Evaluate spoken arithmetic and phrase the answer for speech"""
+    expression = spoken_to_expression(text)
+    if not expression:
+        raise CalculationError("I couldn't find a calculation in that")
+    result = evaluate(expression)
+
+    if re.fullmatch(r'sqrt\s*\(\s*[\d.]+\s*\)', expression):
+        return f"The square root is {format_number(result)}"
+    if re.fullmatch(r'factorial\s*\(\s*[\d.]+\s*\)', expression):
+        return f"The factorial is {format_number(result)}"
+    return f"The answer is {format_number(result)}"
+
+if __name__ == "__main__":
+    samples = [
+        "what is 5 plus 3", "calculate 12 times 4 divided by 3", "square root of 144",
+        "factorial of 20", "factorial of 200000", "9 ** 9 ** 9", "2 to the power of 100",
+        "10 divided by 0", "__import__('os')",
+    ]
+    for sample in samples:
+        start = time.perf_counter()
+        try:
+            answer = evaluate_spoken(sample)
+        except CalculationError as e:
+            answer = f"refused: {e}"
+        print(f"{sample!r:45} -> {answer} ({(time.perf_counter() - start) * 1000:.2f} ms)")
@@ -0,0 +1,289 @@
+"""
+Timer & Reminder Scheduler - one background thread driven by a min-heap
+Replaces thread-per-timer sleeping; tasks get unique IDs, can be cancelled,
+listed and snoozed, and are journaled to disk so they survive a restart.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_STORE_PATH = "data/scheduled_tasks.jsonl"
+
+# Rewrite the journal once it holds this many times more lines than live tasks
+COMPACT_RATIO = 4
+
+class TaskScheduler:
+    """Min-heap of due times serviced by a single worker thread"""
+
+    def __init__(self, store_path: Optional[str] = DEFAULT_STORE_PATH):
+        """
+        Args:
+            store_path: Append-only JSONL journal; None keeps tasks in memory only
+        """
+        self.store_path = store_path
+        self._tasks: Dict[int, Dict] = {}  # task_id -> task
+        self._heap: List = []  # (due_ts, seq, task_id); stale entries skipped lazily
+        self._seq = itertools.count()
+        self._next_id = 1
+        self._journal_lines = 0
+        self._listeners: Dict[str, List[Callable[[Dict], None]]] = {}
+        self._cond = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._stopped = False
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def schedule(self, due, message: str, kind: str = "timer") -> Dict:
+        """
+        Schedule a task
+
+        Args:
+            due: datetime or POSIX timestamp when the task fires
+            message: Text announced when it fires
+            kind: "timer" or "reminder" (selects the listeners)
+
+        Returns:
+            The task dict (id, kind, message, due, created)
+        """
+        due_ts = due.timestamp() if isinstance(due, datetime) else float(due)
+        with self._cond:
+            task = {
+                "id": self._next_id,
+                "kind": kind,
+                "message": message,
+                "due": due_ts,
+                "created": time.time(),
+            }
+            self._next_id += 1
+            self._tasks[task["id"]] = task
+            heapq.heappush(self._heap, (due_ts, next(self._seq), task["id"]))
+            self._journal({"op": "add", "task": task})
+            self._wake()
+            return dict(task)
+
+    def schedule_in(self, seconds: float, message: str, kind: str = "timer") -> Dict:
+        """Schedule a task relative to now"""
+        return self.schedule(time.time() + seconds, message, kind)
+
+    def cancel(self, task_id: int) -> bool:
+        """Cancel a pending task; its heap entry is discarded when reached"""
+        with self._cond:
+            if self._tasks.pop(task_id, None) is None:
+                return False
+            self._journal({"op": "remove", "id": task_id})
+            self._wake()
+            return True
+
+    def snooze(self, task_id: int, seconds: float) -> Optional[Dict]:
+        """Push a pending task back by `seconds` from now"""
+        with self._cond:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            task["due"] = time.time() + seconds
+            heapq.heappush(self._heap, (task["due"], next(self._seq), task_id))
+            self._journal({"op": "due", "id": task_id, "due": task["due"]})
+            self._wake()
+            return dict(task)
+
+    def list_tasks(self, kind: Optional[str] = None) -> List[Dict]:
+        """Pending tasks ordered by due time"""
+        with self._cond:
+            tasks = [dict(t) for t in self._tasks.values() if kind is None or t["kind"] == kind]
+        return sorted(tasks, key=lambda t: t["due"])
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        with self._cond:
+            task = self._tasks.get(task_id)
+            return dict(task) if task else None
+
+    def add_listener(self, kind: str, callback: Callable[[Dict], None]):
+        """Call `callback(task)` whenever a task of this kind ("*" = any) fires"""
+        with self._cond:
+            self._listeners.setdefault(kind, []).append(callback)
+            if self._tasks:
+                # Restored tasks wait for a listener so overdue ones are announced
+                self._wake()
+
+    def shutdown(self):
+        """Stop the worker thread (pending tasks stay in the journal)"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=1)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def _wake(self):
+        """Start the worker if needed, or nudge it to re-check the heap head"""
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped = False
+            self._worker = threading.Thread(target=self._run, name="task-scheduler", daemon=True)
+            self._worker.start()
+        else:
+            self._cond.notify()
+
+    def _pop_due(self) -> Optional[Dict]:
+        """Return the next due task, waiting until it is due; None once idle"""
+        with self._cond:
+            while not self._stopped:
+                # Drop cancelled or rescheduled entries
+                while self._heap:
+                    due_ts, _, task_id = self._heap[0]
+                    task = self._tasks.get(task_id)
+                    if task is not None and task["due"] == due_ts:
+                        break
+                    heapq.heappop(self._heap)
+
+                if not self._heap:
+                    # Nothing pending: let the thread exit instead of idling
+                    self._worker = None
+                    return None
+
+                delay = self._heap[0][0] - time.time()
+                if delay <= 0:
+                    _, _, task_id = heapq.heappop(self._heap)
+                    task = self._tasks.pop(task_id)
+                    self._journal({"op": "remove", "id": task_id})
+                    return task
+
+                self._cond.wait(timeout=delay)
+            return None
+
+    def _run(self):
+        while True:
+            task = self._pop_due()
+            if task is None:
+                return
+            self._fire(task)
+
+    def _fire(self, task: Dict):
+        listeners = self._listeners.get(task["kind"], []) + self._listeners.get("*", [])
+        if not listeners:
+            icon = "🔔 REMINDER" if task["kind"] == "reminder" else "⏰ TIMER ALERT"
+            print(f"\n{icon}: {task['message']}")
+        for callback in listeners:
+            try:
+                callback(dict(task))
+            except Exception as e:
+                print(f"⚠️ Scheduler callback error: {e}")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _journal(self, entry: Dict):
+        """Append one operation to the journal (caller holds the lock)"""
+        if not self.store_path:
+            return
+        try:
+            with open(self.store_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._journal_lines += 1
+            if self._journal_lines > COMPACT_RATIO * max(len(self._tasks), 16):
+                self._compact()
+        except Exception as e:
+            print(f"⚠️ Could not persist scheduled task: {e}")
+
+    def _compact(self):
+        """Rewrite the journal with only the live tasks"""
+        tmp_path = self.store_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps({"op": "next_id", "value": self._next_id}) + "\n")
+            for task in self._tasks.values():
+                f.write(json.dumps({"op": "add", "task": task}) + "\n")
+        os.replace(tmp_path, self.store_path)
+        self._journal_lines = len(self._tasks) + 1
+
+    def _load(self):
+        """Replay the journal; overdue tasks fire once the worker starts"""
+        if not self.store_path or not os.path.exists(self.store_path):
+            return
+        try:
+            with open(self.store_path, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn write at the end of the journal
+                    op = entry.get("op")
+                    if op == "add":
+                        task = entry["task"]
+                        self._tasks[task["id"]] = task
+                        self._next_id = max(self._next_id, task["id"] + 1)
+                    elif op == "remove":
+                        self._tasks.pop(entry["id"], None)
+                    elif op == "due" and entry["id"] in self._tasks:
+                        self._tasks[entry["id"]]["due"] = entry["due"]
+                    elif op == "next_id":
+                        self._next_id = max(self._next_id, entry["value"])
+
+            self._heap = [(t["due"], next(self._seq), t["id"]) for t in self._tasks.values()]
+            heapq.heapify(self._heap)
+            with self._cond:
+                self._compact()
+                if self._tasks:
+                    print(f"✅ Restored {len(self._tasks)} scheduled task(s)")
+        except Exception as e:
+            print(f"❌ Error loading scheduled tasks: {e}")
+
+# Singleton instance
+_scheduler_instance = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> TaskScheduler:
+    """Get or create TaskScheduler singleton instance"""
+    global _scheduler_instance
+    if _scheduler_instance is None:
+        with _scheduler_lock:
+            if _scheduler_instance is None:
+                _scheduler_instance = TaskScheduler()
+    return _scheduler_instance
+
+if __name__ == "__main__":
+    import tempfile
+
+    # Benchmark: schedule many far-future timers, then cancel half of them
+    n = 10000
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler = TaskScheduler(os.path.join(tmp, "tasks.jsonl"))
+        threads_before = threading.active_count()
+
+        start = time.perf_counter()
+        ids = [scheduler.schedule_in(3600 + i, f"Timer {i}")["id"] for i in range(n)]
+        insert_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for task_id in ids[::2]:
+            scheduler.cancel(task_id)
+        cancel_s = time.perf_counter() - start
+
+        print(f"Scheduled {n} timers in {insert_s * 1000:.1f} ms ({insert_s / n * 1e6:.1f} µs each)")
+        print(f"Cancelled {n // 2} timers in {cancel_s * 1000:.1f} ms")
+        print(f"Unique IDs: {len(set(ids)) == n}, pending: {len(scheduler)}")
+        print(f"Extra threads: {threading.active_count() - threads_before}")
+
+        start = time.perf_counter()
+        restored = TaskScheduler(os.path.join(tmp, "tasks.jsonl"))
+        print(f"Restored {len(restored)} timers in {(time.perf_counter() - start) * 1000:.1f} ms")
+        scheduler.shutdown()
+        restored.shutdown()
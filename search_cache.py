@@ -0,0 +1,179 @@
+"""
+Search Cache - TTL cache for travel searches keyed by the normalized query
+Keys are (kind, origin code, destination code, date, passengers), with city
+names resolved through the city index, so "Bengaluru"/"Bangalore"/"BLR" and
+a repeat after a language switch all hit the same entry. Each kind (flight,
+train, bus, booking-site URLs, route info) has its own TTL, identical searches already
+in flight are coalesced into one computation, and hit rates are tracked.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+from datetime import date as Date, datetime
+from typing import Callable, Dict, Optional, Tuple, Union
+
+# Fares move quickly; URL bundles are a pure function of the key
+DEFAULT_TTLS = {
+    "flight": 5 * 60,
+    "train": 15 * 60,
+    "bus": 15 * 60,
+    "urls": 24 * 3600,
+    "route_info": 3600,  # also dropped whenever the travel data is reloaded
+}
+DEFAULT_TTL_SECONDS = 5 * 60
+MAX_ENTRIES = 2000
+
+def city_code(name: str) -> str:
+    """Stable key for a city: IATA, else station code, else its normalized name"""
+    from city_index import get_city_index, normalize_name
+    city = get_city_index().resolve(name or "")
+    if city:
+        return city.iata or city.station or city.name.upper()
+    return normalize_name(name or "")
+
+def search_key(kind: str, origin: str, destination: str, date: Union[datetime, Date, str, None],
+               passengers: int = 1, variant: str = "") -> Tuple:
+    """(kind, origin code, destination code, ISO date, passengers[, variant])"""
+    if isinstance(date, (datetime, Date)):
+        date = date.strftime("%Y-%m-%d")
+    key = (kind, city_code(origin), city_code(destination), date or "", int(passengers or 1))
+    return key + (variant,) if variant else key
+
+class SearchCache:
+    """Per-kind TTL cache with single-flight computation and hit-rate stats"""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = MAX_ENTRIES):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple, Tuple[float, object]]" = OrderedDict()  # key -> (stored_at, value)
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0, "coalesced": 0})
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], object]) -> object:
+        """
+        Cached value for `key`, computing it at most once per TTL window
+
+        Concurrent callers with the same key wait for the first caller's
+        result instead of repeating the search. Returns a copy, so callers
+        may modify the result freely.
+        """
+        kind = key[0]
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and now - entry[0] < self.ttls.get(kind, DEFAULT_TTL_SECONDS):
+                self._cache.move_to_end(key)
+                self._stats[kind]["hits"] += 1
+                return copy.deepcopy(entry[1])
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self._stats[kind]["misses"] += 1
+                future = self._inflight[key] = Future()
+            else:
+                self._stats[kind]["coalesced"] += 1
+
+        if owner:
+            # The first caller computes outside the lock
+            try:
+                value = compute()
+                self.put(key, value)
+                future.set_result(value)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    if self._inflight.get(key) is future:
+                        del self._inflight[key]
+        return copy.deepcopy(future.result())
+
+    def put(self, key: Tuple, value: object):
+        """Store a value computed elsewhere (e.g. one day of a batched calendar search)"""
+        with self._lock:
+            self._cache[key] = (time.time(), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def get(self, key: Tuple) -> Optional[object]:
+        """A copy of the fresh cached value, or None (never computes)"""
+        kind = key[0]
+        with self._lock:
+            entry = self._cache.get(key)
+            if not entry or time.time() - entry[0] >= self.ttls.get(kind, DEFAULT_TTL_SECONDS):
+                self._stats[kind]["misses"] += 1
+                return None
+            self._cache.move_to_end(key)
+            self._stats[kind]["hits"] += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def peek(self, key: Tuple) -> bool:
+        """True if a fresh entry exists (does not count as a hit)"""
+        with self._lock:
+            entry = self._cache.get(key)
+            return bool(entry) and time.time() - entry[0] < self.ttls.get(key[0], DEFAULT_TTL_SECONDS)
+
+    def invalidate(self, kind: Optional[str] = None):
+        with self._lock:
+            if kind is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == kind]:
+                    del self._cache[key]
+
+    def stats(self) -> Dict:
+        """Hits, misses, coalesced and hit rate per kind and overall"""
+        with self._lock:
+            per_kind = {kind: dict(counts) for kind, counts in self._stats.items()}
+        total = {"hits": 0, "misses": 0, "coalesced": 0}
+        for counts in per_kind.values():
+            for name in total:
+                total[name] += counts[name]
+        for counts in [*per_kind.values(), total]:
+            lookups = counts["hits"] + counts["misses"] + counts["coalesced"]
+            # Coalesced callers were served without their own computation
+            counts["hit_rate"] = (counts["hits"] + counts["coalesced"]) / lookups if lookups else 0.0
+        return {"kinds": per_kind, "total": total, "entries": len(self._cache)}
+
+# Singleton instance
+_search_cache_instance = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache() -> SearchCache:
+    """Get or create SearchCache singleton instance"""
+    global _search_cache_instance
+    if _search_cache_instance is None:
+        with _search_cache_lock:
+            if _search_cache_instance is None:
+                _search_cache_instance = SearchCache()
+    return _search_cache_instance
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = SearchCache()
+    calls = []
+
+    def slow_search():
+        calls.append(1)
+        time.sleep(0.3)
+        return [{"price": 4500}]
+
+    # Same trip, spelled three ways, asked by 20 users at once
+    names = [("Bengaluru", "Delhi"), ("bangalore", "New Delhi"), ("BLR", "DEL")]
+    keys = [search_key("flight", o, d, datetime(2026, 12, 25), 2) for o, d in names]
+    print(f"Keys: {set(keys)}")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        list(pool.map(lambda i: cache.get_or_compute(keys[i % 3], slow_search), range(20)))
+    print(f"20 concurrent searches -> {len(calls)} computation in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    cache.get_or_compute(keys[0], slow_search)
+    print(f"Repeat: {(time.perf_counter() - start) * 1000:.2f} ms, stats: {cache.stats()['total']}")
@@ -0,0 +1,303 @@
+"""
+Session Manager - per-user conversation and booking state with bounded memory
+Each session (keyed by session/user ID) holds the multi-turn booking fields,
+language, conversation context and recent history. Live sessions sit in an
+LRU map; the least recently used ones beyond `max_sessions`, and any idle for
+longer than `idle_timeout`, are spilled to disk as JSON and reloaded
+transparently on their next turn. Turns for the same session are serialized;
+different sessions proceed concurrently.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_SPILL_DIR = "data/sessions"
+MAX_SESSIONS = 1000                  # live sessions kept in memory
+IDLE_TIMEOUT_SECONDS = 30 * 60       # idle sessions are spilled after this
+SPILL_TTL_SECONDS = 7 * 24 * 3600    # spilled sessions are deleted after this
+SWEEP_INTERVAL_SECONDS = 60
+MAX_HISTORY = 20                     # turns of history kept per session
+
+BOOKING_FIELDS = ("booking_intent", "booking_data", "booking_step", "search_results", "selected_option")
+
+def initial_booking_state() -> Dict:
+    return {
+        "booking_intent": None,
+        "booking_data": {},
+        "booking_step": "initial",
+        "search_results": [],
+        "selected_option": None
+    }
+
+def _encode(value):
+    # booking_data carries parsed datetimes; keep their type across a spill
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot store {type(value).__name__} in a session")
+
+def _decode(obj: Dict):
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+class Session:
+    """Booking state, language, context and history for one user"""
+
+    def __init__(self, session_id: str, user_id: Optional[str] = None):
+        self.session_id = session_id
+        self.user_id = user_id or session_id
+        self.booking = initial_booking_state()
+        self.language = "english"
+        self.context = {"last_search": None, "last_location": None, "preferences": {}, "language": "english"}
+        self.history: List[Dict] = []  # [{"role": "user"/"assistant", "content": ...}]
+        self.created_at = time.time()
+        self.last_active = self.created_at
+        self.lock = threading.RLock()
+        self.holders = 0  # turns holding the session; held sessions are never evicted
+
+    def booking_state(self) -> Dict:
+        """Booking fields to spread into a conversation state"""
+        return {field: self.booking[field] for field in BOOKING_FIELDS}
+
+    def update_booking(self, state: Dict):
+        """Keep the booking fields of a finished turn"""
+        defaults = initial_booking_state()
+        self.booking = {field: state.get(field, defaults[field]) for field in BOOKING_FIELDS}
+        if state.get("language"):
+            self.language = self.context["language"] = state["language"]
+
+    def add_turn(self, user_text: str, assistant_text: Optional[str]):
+        self.history.append({"role": "user", "content": user_text})
+        if assistant_text:
+            self.history.append({"role": "assistant", "content": assistant_text})
+        del self.history[:-2 * MAX_HISTORY]
+
+    def to_dict(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "booking": self.booking,
+            "language": self.language,
+            "context": self.context,
+            "history": self.history,
+            "created_at": self.created_at,
+            "last_active": self.last_active,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Session":
+        session = cls(data["session_id"], data.get("user_id"))
+        session.booking = {**initial_booking_state(), **data.get("booking", {})}
+        session.language = data.get("language", "english")
+        session.context.update(data.get("context", {}))
+        session.history = data.get("history", [])
+        session.created_at = data.get("created_at", session.created_at)
+        session.last_active = data.get("last_active", session.last_active)
+        return session
+
+class SessionManager:
+    """LRU + idle-timeout bounded session map with a disk spill"""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+                 spill_dir: Optional[str] = DEFAULT_SPILL_DIR, spill_ttl: float = SPILL_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.spill_dir = spill_dir
+        self.spill_ttl = spill_ttl
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._spilling: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.stats = {"created": 0, "restored": 0, "spilled": 0, "expired": 0}
+
+    @staticmethod
+    def new_session_id() -> str:
+        return uuid.uuid4().hex
+
+    @contextmanager
+    def session(self, session_id: Optional[str] = None, user_id: Optional[str] = None) -> Iterator[Session]:
+        """
+        Hold a session for one turn (created or restored as needed)
+
+        The session stays locked until the block exits, so concurrent turns
+        for the same user cannot interleave, and it cannot be evicted meanwhile.
+        """
+        session = self._checkout(session_id or self.new_session_id(), user_id)
+        try:
+            with session.lock:
+                yield session
+        finally:
+            with self._lock:
+                session.holders -= 1
+                session.last_active = time.time()
+                evicted = self._over_capacity()
+            self._spill_all(evicted)
+            self._maybe_sweep()
+
+    def _checkout(self, session_id: str, user_id: Optional[str]) -> Session:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session:
+                self._sessions.move_to_end(session_id)
+            else:
+                # A session still being written out is reused, not re-read from disk
+                session = self._spilling.get(session_id) or self._restore(session_id)
+                if session:
+                    self.stats["restored"] += 1
+                else:
+                    session = Session(session_id, user_id)
+                    self.stats["created"] += 1
+                self._sessions[session_id] = session
+            session.holders += 1
+            session.last_active = time.time()
+            evicted = self._over_capacity()
+        self._spill_all(evicted)
+        return session
+
+    def end(self, session_id: str):
+        """Forget a session, in memory and on disk"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._spilling.pop(session_id, None)
+        path = self._path(session_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def sweep(self):
+        """Spill sessions idle past the timeout and delete expired spill files"""
+        self._last_sweep = time.monotonic()
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            idle = [s for s in self._sessions.values() if s.last_active < cutoff and not s.holders]
+            for session in idle:
+                del self._sessions[session.session_id]
+                self._spilling[session.session_id] = session
+        self._spill_all(idle)
+
+        if self.spill_dir:
+            expired_before = time.time() - self.spill_ttl
+            for name in os.listdir(self.spill_dir):
+                path = os.path.join(self.spill_dir, name)
+                if name.endswith(".json") and os.path.getmtime(path) < expired_before:
+                    os.remove(path)
+                    self.stats["expired"] += 1
+
+    def flush(self):
+        """Spill every live session (call on shutdown)"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            with session.lock:
+                self._spill(session)
+
+    def live_count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    # ------------------------------------------------------------------
+    # Spill
+    # ------------------------------------------------------------------
+
+    def _path(self, session_id: str) -> Optional[str]:
+        if not self.spill_dir:
+            return None
+        # IDs come from clients; hash them so they can't address other files
+        return os.path.join(self.spill_dir, hashlib.sha256(session_id.encode()).hexdigest()[:32] + ".json")
+
+    def _over_capacity(self) -> List[Session]:
+        """Unlink least recently used, unheld sessions beyond capacity (manager lock held)"""
+        evicted = []
+        excess = len(self._sessions) - self.max_sessions
+        for session_id, session in list(self._sessions.items()):
+            if len(evicted) >= excess:
+                break
+            if not session.holders:
+                del self._sessions[session_id]
+                self._spilling[session_id] = session
+                evicted.append(session)
+        return evicted
+
+    def _spill_all(self, sessions: List[Session]):
+        for session in sessions:
+            # Waits if the session was checked out again meanwhile
+            with session.lock:
+                self._spill(session)
+            with self._lock:
+                if self._spilling.get(session.session_id) is session:
+                    del self._spilling[session.session_id]
+
+    def _spill(self, session: Session):
+        path = self._path(session.session_id)
+        if not path:
+            return
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(session.to_dict(), f, default=_encode, ensure_ascii=False)
+            os.replace(temp_path, path)
+            self.stats["spilled"] += 1
+        except (OSError, TypeError) as e:
+            print(f"⚠️ Could not spill session {session.session_id}: {e}")
+
+    def _restore(self, session_id: str) -> Optional[Session]:
+        path = self._path(session_id)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return Session.from_dict(json.load(f, object_hook=_decode))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Could not restore session {session_id}: {e}")
+            return None
+
+    def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+            self.sweep()
+
+# Singleton instance
+_session_manager_instance = None
+_session_manager_lock = threading.Lock()
+
+def get_session_manager() -> SessionManager:
+    """Get or create SessionManager singleton instance"""
+    global _session_manager_instance
+    if _session_manager_instance is None:
+        with _session_manager_lock:
+            if _session_manager_instance is None:
+                _session_manager_instance = SessionManager()
+    return _session_manager_instance
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    spill_dir = tempfile.mkdtemp()
+    manager = SessionManager(max_sessions=100, spill_dir=spill_dir)
+
+    def turn(i: int):
+        with manager.session(f"user-{i % 1000}") as session:
+            session.booking["booking_data"]["parsed_date"] = datetime(2026, 12, 25)
+            session.add_turn(f"turn {i}", "ok")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(turn, range(20000)))
+    elapsed = time.perf_counter() - start
+    print(f"20,000 turns for 1,000 users: {elapsed:.2f}s ({elapsed / 20000 * 1e6:.0f} µs/turn), "
+          f"{manager.live_count()} live, stats {manager.stats}")
+
+    with manager.session("user-7") as session:
+        print(f"user-7 after restore: {len(session.history) // 2} turns kept, "
+              f"date {session.booking['booking_data']['parsed_date']!r}")
+    shutil.rmtree(spill_dir)
@@ -0,0 +1,143 @@
+"""
+Skill Executor - deadline-bounded asyncio execution for network-bound skills
+Skills run on a background event loop. If a skill misses its deadline the
+caller gets an interim "still working on it" reply immediately and the real
+answer is delivered through a callback when it arrives, so the listen loop
+never waits on a slow upstream.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Callable, Dict, Optional
+
+# After this long a skill is abandoned altogether
+HARD_TIMEOUT_SECONDS = 30
+
+INTERIM_MESSAGES = {
+    "weather": "Still checking the weather, I'll tell you in a moment.",
+    "wikipedia": "Still looking that up, I'll tell you in a moment.",
+    "music": "Still finding that song, it will start in a moment.",
+}
+DEFAULT_INTERIM_MESSAGE = "Still working on it, I'll tell you when it's ready."
+
+class SkillExecutor:
+    """Runs blocking skill functions on an event loop with per-call deadlines"""
+
+    def __init__(self, max_workers: int = 4, hard_timeout: float = HARD_TIMEOUT_SECONDS):
+        self.hard_timeout = hard_timeout
+        self.on_late_result: Optional[Callable[[str, str], None]] = None
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="skill")
+        self._loop = asyncio.new_event_loop()
+        self._pending: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="skill-executor", daemon=True)
+        self._thread.start()
+
+    def run(self, name: str, func: Callable, *args, deadline: Optional[float] = None) -> Optional[str]:
+        """
+        Run `func(*args)` and wait at most `deadline` seconds for it
+
+        Returns:
+            The skill result, or an interim message if the deadline passed (the
+            result is then passed to `on_late_result(name, result)` later)
+        """
+        # A new request for the same skill supersedes the old one
+        self.cancel(name)
+
+        future = asyncio.run_coroutine_threadsafe(self._run(name, func, args), self._loop)
+        with self._lock:
+            self._pending[name] = future
+
+        try:
+            result = future.result(timeout=deadline)
+        except concurrent.futures.TimeoutError:
+            print(f"⏳ Skill '{name}' missed its {deadline:.1f}s deadline, answering later")
+            future.add_done_callback(lambda f: self._deliver_late(name, f))
+            return INTERIM_MESSAGES.get(name, DEFAULT_INTERIM_MESSAGE)
+        except concurrent.futures.CancelledError:
+            return None
+        except Exception as e:
+            print(f"❌ Skill '{name}' failed: {e}")
+            result = None
+
+        self._forget(name, future)
+        return result
+
+    async def _run(self, name: str, func: Callable, args) -> Optional[str]:
+        try:
+            return await asyncio.wait_for(
+                self._loop.run_in_executor(self._pool, func, *args),
+                timeout=self.hard_timeout
+            )
+        except asyncio.TimeoutError:
+            return "Sorry, that is taking too long. Please try again later."
+
+    def cancel(self, name: Optional[str] = None) -> int:
+        """Cancel pending work for one skill (or all); late results are dropped"""
+        with self._lock:
+            names = [name] if name else list(self._pending)
+            futures = [self._pending.pop(n) for n in names if n in self._pending]
+        for future in futures:
+            future.cancel()
+        return len(futures)
+
+    def pending(self) -> list:
+        with self._lock:
+            return [name for name, future in self._pending.items() if not future.done()]
+
+    def _forget(self, name: str, future: concurrent.futures.Future):
+        with self._lock:
+            if self._pending.get(name) is future:
+                del self._pending[name]
+
+    def _deliver_late(self, name: str, future: concurrent.futures.Future):
+        self._forget(name, future)
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"❌ Skill '{name}' failed: {e}")
+            return
+        if result and self.on_late_result:
+            try:
+                self.on_late_result(name, result)
+            except Exception as e:
+                print(f"⚠️ Late result delivery error: {e}")
+        elif result:
+            print(f"🔔 {name}: {result}")
+
+    def shutdown(self):
+        self.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._pool.shutdown(wait=False)
+
+# Singleton instance
+_skill_executor_instance = None
+_skill_executor_lock = threading.Lock()
+
+def get_skill_executor() -> SkillExecutor:
+    """Get or create SkillExecutor singleton instance"""
+    global _skill_executor_instance
+    if _skill_executor_instance is None:
+        with _skill_executor_lock:
+            if _skill_executor_instance is None:
+                _skill_executor_instance = SkillExecutor()
+    return _skill_executor_instance
+
+if __name__ == "__main__":
+    import time
+
+    executor = SkillExecutor()
+    executor.on_late_result = lambda name, result: print(f"  late {name}: {result}")
+
+    def slow(seconds: float) -> str:
+        time.sleep(seconds)
+        return f"done after {seconds}s"
+
+    start = time.perf_counter()
+    print(executor.run("fast", slow, 0.1, deadline=1.0), f"({time.perf_counter() - start:.2f}s)")
+    start = time.perf_counter()
+    print(executor.run("weather", slow, 2.0, deadline=0.5), f"({time.perf_counter() - start:.2f}s)")
+    time.sleep(2)
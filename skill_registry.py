@@ -0,0 +1,239 @@
+"""
+Skill Registry - declarative skill triggers with lazy loading
+Each skill declares the patterns that trigger it and a "module:function"
+entry point; the module (and its heavy dependencies) is only imported the
+first time the skill is actually used.
+"""
+
+import importlib
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Target for process start -> first "Listening..." prompt, in seconds
+COLD_START_TARGET_SECONDS = 1.5
+
+# Network-bound skills answer with an interim reply after this many seconds
+NETWORK_SKILL_DEADLINE = 2.0
+
+# Modules that used to be imported eagerly by voice_assistant.py
+HEAVY_MODULES = [
+    "advanced_skills",
+    "travel_booking",
+    "travel_rag",
+    "booking_nodes",
+    "wikipedia",
+    "requests",
+    "dateparser",
+    "pygame",
+    "langchain_openai",
+    "langchain_community.vectorstores",
+]
+
+# ============================================================================
+# SKILL DEFINITION
+# ============================================================================
+
+class Skill:
+    """A voice skill with trigger patterns and a lazily imported handler"""
+
+    def __init__(self, name: str, triggers: List[str], entry_point: str, deadline: Optional[float] = None):
+        """
+        Args:
+            name: Skill name used in logs and reports
+            triggers: Regular expressions; the skill runs if any matches
+            entry_point: "module:function" of the handler, imported on first use
+            deadline: Seconds to wait before answering with an interim reply
+                (network-bound skills, see skill_executor.py); None runs inline
+        """
+        self.name = name
+        self.triggers = triggers
+        self.entry_point = entry_point
+        self.deadline = deadline
+        self._patterns = [re.compile(t) for t in triggers]
+        self._handler: Optional[Callable[[str], Optional[str]]] = None
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._handler is not None
+
+    def matches(self, text: str) -> bool:
+        """Check whether any trigger pattern matches the (lowercased) text"""
+        return any(p.search(text) for p in self._patterns)
+
+    def load(self) -> Callable[[str], Optional[str]]:
+        """Import the handler module on first use"""
+        if self._handler is None:
+            with self._lock:
+                if self._handler is None:
+                    module_name, func_name = self.entry_point.split(":")
+                    start = time.perf_counter()
+                    module = importlib.import_module(module_name)
+                    self._handler = getattr(module, func_name)
+                    self.load_seconds = time.perf_counter() - start
+                    print(f"📦 Loaded skill '{self.name}' in {self.load_seconds * 1000:.0f} ms")
+        return self._handler
+
+    def __call__(self, text: str) -> Optional[str]:
+        if self.deadline is None:
+            return self.load()(text)
+        from skill_executor import get_skill_executor
+        return get_skill_executor().run(self.name, lambda: self.load()(text), deadline=self.deadline)
+
+def _keywords(*words: str) -> List[str]:
+    """Build substring trigger patterns from plain keywords"""
+    return [re.escape(w) for w in words]
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+
+class SkillRegistry:
+    """Ordered collection of skills; the first skill that answers wins"""
+
+    def __init__(self):
+        self.skills: List[Skill] = []
+
+    def register(self, name: str, triggers: List[str], entry_point: str,
+                 deadline: Optional[float] = None) -> Skill:
+        """Register a skill; earlier registrations have higher priority"""
+        skill = Skill(name, triggers, entry_point, deadline)
+        self.skills.append(skill)
+        return skill
+
+    def get(self, name: str) -> Optional[Skill]:
+        for skill in self.skills:
+            if skill.name == name:
+                return skill
+        return None
+
+    def dispatch(self, user_input: str) -> Optional[str]:
+        """Run the first matching skill that produces a response"""
+        text = user_input.lower()
+        for skill in self.skills:
+            if skill.matches(text):
+                response = skill(text)
+                if response is not None:
+                    return response
+        return None  # No skill matched
+
+    def preload(self, names: Optional[List[str]] = None):
+        """Load skills ahead of time (e.g. from a background thread once idle)"""
+        for skill in self.skills:
+            if names is None or skill.name in names:
+                try:
+                    skill.load()
+                except Exception as e:
+                    print(f"⚠️ Could not preload skill '{skill.name}': {e}")
+
+def create_default_registry() -> SkillRegistry:
+    """Registry of the built-in skills in advanced_skills.py, in priority order"""
+    registry = SkillRegistry()
+
+    # Music/Video Playback - HIGH PRIORITY
+    registry.register("music", _keywords("play", "listen", "song", "music", "video"),
+                      "advanced_skills:handle_music", deadline=NETWORK_SKILL_DEADLINE)
+    registry.register("weather", _keywords("weather", "temperature", "forecast"),
+                      "advanced_skills:handle_weather", deadline=NETWORK_SKILL_DEADLINE)
+    registry.register("calculate", _keywords("calculate", "what is", "plus", "minus", "times", "divided", "multiply"),
+                      "advanced_skills:handle_calculation")
+    registry.register("convert", _keywords("convert"),
+                      "advanced_skills:handle_unit_conversion")
+    registry.register("timer", _keywords("timer", "snooze"),
+                      "advanced_skills:handle_timer")
+    registry.register("reminder", _keywords("remind"),
+                      "advanced_skills:handle_reminder")
+    registry.register("system_status", _keywords("system info", "system status", "battery", "cpu",
+                                                 "are you using", "your memory", "resource usage"),
+                      "advanced_skills:handle_system_status")
+    registry.register("news", _keywords("news"),
+                      "advanced_skills:handle_news")
+    registry.register("wikipedia", _keywords("who is", "what is", "tell me about", "information about"),
+                      "advanced_skills:handle_wikipedia", deadline=NETWORK_SKILL_DEADLINE)
+    registry.register("joke", _keywords("joke", "make me laugh"),
+                      "advanced_skills:handle_joke")
+    registry.register("fun_fact", _keywords("fun fact", "interesting fact"),
+                      "advanced_skills:handle_fun_fact")
+    registry.register("open_application", _keywords("open"),
+                      "advanced_skills:handle_open_application")
+
+    return registry
+
+# Singleton instance
+_skill_registry_instance = None
+
+def get_skill_registry() -> SkillRegistry:
+    """Get or create SkillRegistry singleton instance"""
+    global _skill_registry_instance
+    if _skill_registry_instance is None:
+        _skill_registry_instance = create_default_registry()
+    return _skill_registry_instance
+
+# ============================================================================
+# IMPORT-TIME REPORT
+# ============================================================================
+
+def measure_import_time(module_name: str) -> Dict:
+    """
+    Measure the cold import cost of a module in a fresh interpreter
+
+    Uses `python -X importtime` so that modules already imported by this
+    process don't hide the real cost.
+
+    Returns:
+        Dict with module, cumulative_ms and the slowest nested imports
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True, text=True
+    )
+
+    nested: List[Tuple[str, float]] = []
+    cumulative_ms = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if not parts[1].isdigit():
+            continue  # Header line
+        name = parts[2].strip()
+        ms = int(parts[1]) / 1000
+        nested.append((name, ms))
+        if name == module_name:
+            cumulative_ms = ms
+
+    nested.sort(key=lambda x: x[1], reverse=True)
+    return {
+        "module": module_name,
+        "ok": result.returncode == 0,
+        "cumulative_ms": cumulative_ms,
+        "slowest": nested[:5],
+    }
+
+def import_time_report(modules: Optional[List[str]] = None) -> str:
+    """Format a per-module import cost report"""
+    lines = ["Import time report (fresh interpreter, cumulative):"]
+    for module_name in modules or HEAVY_MODULES:
+        info = measure_import_time(module_name)
+        if not info["ok"] or info["cumulative_ms"] is None:
+            lines.append(f"  {module_name:<35} not importable")
+            continue
+        lines.append(f"  {module_name:<35} {info['cumulative_ms']:>9.1f} ms")
+        for name, ms in info["slowest"][1:4]:
+            lines.append(f"      {name:<31} {ms:>9.1f} ms")
+    return "\n".join(lines)
+
+def report_cold_start(started_at: float) -> float:
+    """Print cold-start-to-listening time against the target"""
+    elapsed = time.perf_counter() - started_at
+    status = "✅" if elapsed <= COLD_START_TARGET_SECONDS else "⚠️"
+    print(f"{status} Cold start to listening: {elapsed:.2f}s (target {COLD_START_TARGET_SECONDS:.1f}s)")
+    return elapsed
+
+if __name__ == "__main__":
+    print(import_time_report())
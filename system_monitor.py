@@ -0,0 +1,151 @@
+"""
+System Monitor - background sampler for system and assistant resource use
+A daemon thread samples CPU, memory, battery and the assistant's own process
+stats into a fixed-size ring buffer, so status queries answer instantly
+instead of blocking on psutil.cpu_percent(interval=1).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+SAMPLE_INTERVAL_SECONDS = 2.0
+HISTORY_SIZE = 300               # 10 minutes at the default interval
+BATTERY_INTERVAL_SECONDS = 30.0  # sensors_battery() is slow on some platforms
+
+class SystemMonitor:
+    """Rolling system + self metrics kept in a ring buffer"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS, history: int = HISTORY_SIZE):
+        import psutil
+        self._psutil = psutil
+        self.interval = interval
+        self.samples: deque = deque(maxlen=history)
+        self._process = psutil.Process(os.getpid())
+        self._battery = None
+        self._battery_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Prime the CPU counters; the first non-blocking reading is always 0.0
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+
+    def start(self) -> "SystemMonitor":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="system-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"⚠️ System sample failed: {e}")
+
+    def sample(self) -> Dict:
+        """Take one non-blocking sample and append it to the ring buffer"""
+        psutil = self._psutil
+        now = time.time()
+
+        if now - self._battery_at >= BATTERY_INTERVAL_SECONDS:
+            try:
+                self._battery = psutil.sensors_battery()
+            except Exception:
+                self._battery = None
+            self._battery_at = now
+
+        memory = psutil.virtual_memory()
+        with self._process.oneshot():
+            process_cpu = self._process.cpu_percent(interval=None)
+            process_rss = self._process.memory_info().rss
+            process_threads = self._process.num_threads()
+
+        sample = {
+            "time": now,
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": memory.percent,
+            "battery_percent": self._battery.percent if self._battery else None,
+            "power_plugged": self._battery.power_plugged if self._battery else None,
+            "process_cpu_percent": process_cpu,
+            "process_rss_mb": process_rss / (1024 * 1024),
+            "process_threads": process_threads,
+        }
+        with self._lock:
+            self.samples.append(sample)
+        return sample
+
+    def latest(self) -> Dict:
+        """Most recent sample (taken on the spot if the buffer is still empty)"""
+        with self._lock:
+            if self.samples:
+                return self.samples[-1]
+        return self.sample()
+
+    def window(self, seconds: float) -> List[Dict]:
+        cutoff = time.time() - seconds
+        with self._lock:
+            return [s for s in self.samples if s["time"] >= cutoff]
+
+    def average(self, key: str, seconds: float = 60.0) -> Optional[float]:
+        values = [s[key] for s in self.window(seconds) if s[key] is not None]
+        return sum(values) / len(values) if values else None
+
+    def self_report(self, seconds: float = 300.0) -> Dict:
+        """The assistant's own resource use over a recent window"""
+        samples = self.window(seconds) or [self.latest()]
+        rss = [s["process_rss_mb"] for s in samples]
+        cpu = [s["process_cpu_percent"] for s in samples]
+        return {
+            "window_seconds": seconds,
+            "samples": len(samples),
+            "rss_mb": rss[-1],
+            "peak_rss_mb": max(rss),
+            "avg_cpu_percent": sum(cpu) / len(cpu),
+            "peak_cpu_percent": max(cpu),
+            "threads": samples[-1]["process_threads"],
+        }
+
+# Singleton instance
+_system_monitor_instance = None
+_system_monitor_lock = threading.Lock()
+
+def get_system_monitor() -> SystemMonitor:
+    """Get or create the SystemMonitor singleton (started on first use)"""
+    global _system_monitor_instance
+    if _system_monitor_instance is None:
+        with _system_monitor_lock:
+            if _system_monitor_instance is None:
+                _system_monitor_instance = SystemMonitor().start()
+    return _system_monitor_instance
+
+def format_system_status(sample: Dict) -> str:
+    """Speakable system status"""
+    info = f"CPU usage: {sample['cpu_percent']:.0f}%. Memory usage: {sample['memory_percent']:.0f}%."
+    if sample["battery_percent"] is not None:
+        info += f" Battery: {sample['battery_percent']:.0f}%"
+        if sample["power_plugged"]:
+            info += " (charging)"
+    return info
+
+def format_self_report(report: Dict) -> str:
+    """Speakable summary of the assistant's own resource use"""
+    return (f"I'm using {report['rss_mb']:.0f} megabytes of memory "
+            f"(peak {report['peak_rss_mb']:.0f}), {report['avg_cpu_percent']:.1f}% CPU on average "
+            f"and {report['threads']} threads.")
+
+if __name__ == "__main__":
+    monitor = SystemMonitor(interval=0.5).start()
+    time.sleep(2.2)
+    start = time.perf_counter()
+    status = format_system_status(monitor.latest())
+    print(f"{status} (answered in {(time.perf_counter() - start) * 1000:.2f} ms)")
+    print(format_self_report(monitor.self_report()))
@@ -0,0 +1,67 @@
+import time
+from datetime import datetime
+
+from fare_aggregator import CircuitBreaker, FareAggregator, Provider, StandInProvider, make_query
+
+QUERY = make_query("flight", "Delhi", "Mumbai", datetime(2026, 12, 10), 2)
+
+def fixed(prices, delay=0.0):
+    """Stub adapter returning one fare per price"""
+    def search(query):
+        time.sleep(delay)
+        return [{"price": price, "origin": query["origin"]} for price in prices]
+    return search
+
+def test_top_k_merges_cheapest_across_providers_in_price_order():
+    aggregator = FareAggregator([
+        Provider("a", fixed([5000, 3000, 9000])),
+        Provider("b", fixed([4000, 2500], delay=0.05)),
+        Provider("c", fixed([7000, 3500], delay=0.1)),
+    ])
+    result = aggregator.search(QUERY, k=3, stable_for=1.0)
+
+    assert [fare["price"] for fare in result["fares"]] == [2500, 3000, 3500]
+    assert [fare["provider"] for fare in result["fares"]] == ["b", "a", "c"]
+    assert result["complete"]
+    assert result["providers"] == {"a": "ok", "b": "ok", "c": "ok"}
+
+def test_stream_snapshots_only_ever_get_cheaper():
+    aggregator = FareAggregator([
+        Provider("fast", StandInProvider("fast", latency=(0.01, 0.02), seed=1)),
+        Provider("slow", StandInProvider("slow", latency=(0.05, 0.06), seed=2, price_factor=0.5)),
+    ])
+    worst = [max(fare["price"] for fare in event["top"]) for event in aggregator.stream(QUERY, k=3)
+             if len(event["top"]) == 3]
+    assert worst == sorted(worst, reverse=True)
+
+def test_breaker_opens_after_repeated_failures_and_skips_the_provider():
+    flaky = Provider("flaky", StandInProvider("flaky", latency=(0.0, 0.01), failure_rate=1.0, seed=3),
+                     breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    aggregator = FareAggregator([Provider("ok", fixed([3000])), flaky])
+
+    outcomes = [aggregator.search(QUERY, k=1, stable_for=1.0)["providers"]["flaky"] for _ in range(3)]
+
+    assert outcomes == ["error", "error", "skipped"]
+    assert flaky.breaker.state == "open"
+
+def test_timeout_counts_against_the_breaker():
+    slow = Provider("slow", fixed([1000], delay=0.5), timeout=0.05,
+                    breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    result = FareAggregator([Provider("ok", fixed([3000])), slow]).search(QUERY, k=1, stable_for=1.0)
+
+    assert result["providers"]["slow"] == "timeout"
+    assert [fare["price"] for fare in result["fares"]] == [3000]
+    assert slow.breaker.state == "open"
+
+def test_half_open_trial_settles_after_an_early_answer():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()  # open, immediately due a trial
+    trial = Provider("trial", fixed([9000], delay=0.3), breaker=breaker)
+    aggregator = FareAggregator([Provider("fast", fixed([1000, 2000])), trial])
+
+    result = aggregator.search(QUERY, k=2, stable_for=0.05)
+    assert result["providers"]["trial"] == "pending"
+
+    time.sleep(0.5)  # the abandoned trial finishes and its done callback records the success
+    assert breaker.state == "closed"
+    assert breaker.allow()
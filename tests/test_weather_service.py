@@ -0,0 +1,57 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from weather_service import StubWeatherServer, WeatherService
+
+@pytest.fixture
+def stub():
+    with StubWeatherServer(latency=0.2) as server:
+        yield server
+
+def test_concurrent_identical_lookups_share_one_upstream_call(stub):
+    service = WeatherService(wttr_base_url=stub.url, openweather_base_url=stub.url)
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        payloads = list(pool.map(lambda _: service.get_wttr("Delhi"), range(10)))
+
+    assert stub.hits == 1
+    assert all(payload == payloads[0] for payload in payloads)
+    assert service.stats["misses"] == 1
+    assert service.stats["coalesced"] == 9
+
+def test_fresh_entry_is_served_from_cache(stub):
+    service = WeatherService(wttr_base_url=stub.url, openweather_base_url=stub.url)
+    service.get_wttr("Delhi")
+    service.get_wttr(" delhi ")
+
+    assert stub.hits == 1
+    assert service.stats["hits"] == 1
+
+def test_stale_entry_is_served_then_revalidated(stub):
+    service = WeatherService(ttl=0.05, stale_ttl=60, wttr_base_url=stub.url, openweather_base_url=stub.url)
+    first = service.get_wttr("Delhi")
+    fetched_at = service._cache[("wttr", "delhi")][0]
+    time.sleep(0.1)
+
+    started = time.perf_counter()
+    stale = service.get_wttr("Delhi")
+    assert time.perf_counter() - started < 0.1  # answered without waiting for upstream
+    assert stale == first
+    assert service.stats["stale_hits"] == 1
+
+    deadline = time.monotonic() + 2
+    while service._cache[("wttr", "delhi")][0] == fetched_at and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert stub.hits == 2
+    assert service._cache[("wttr", "delhi")][0] > fetched_at
+
+def test_expired_entry_is_fetched_again(stub):
+    service = WeatherService(ttl=0.01, stale_ttl=0.01, wttr_base_url=stub.url, openweather_base_url=stub.url)
+    service.get_wttr("Delhi")
+    time.sleep(0.05)
+    service.get_wttr("Delhi")
+
+    assert stub.hits == 2
+    assert service.stats["misses"] == 2
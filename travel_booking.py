@@ -4,20 +4,23 @@ Includes entity extraction and booking state management
 """
 
 import re
-import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-import dateparser
+import numpy as np
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
+from itinerary_generator import ResultBatch, generate
+from booking_store import get_booking_store
+from search_cache import get_search_cache, search_key
+from date_resolver import now_ist, resolve_date
 
 class TravelBookingService:
     """Mock travel booking service"""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
         self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        self.bookings = []  # Store completed bookings
-        self.booking_counter = 1000
+        self.rng = np.random.default_rng(seed)  # Seed for reproducible search results
+        self.store = get_booking_store()  # Completed bookings (SQLite, survives restarts)
     
     def extract_booking_entities(self, text: str) -> Dict:
         """
@@ -29,7 +32,7 @@ class TravelBookingService:
 Extract the following information from user input:
 - origin: departure city
 - destination: arrival city  
-- date: travel date (extract as natural language)
+- date: travel date (extract as natural language, keeping words like "around")
 - travel_mode: flight, train, or bus
 - passengers: number of passengers (default 1)
 
@@ -47,9 +50,9 @@ Example: {"origin": "Delhi", "destination": "Mumbai", "date": "December 10th", "
             import json
             entities = json.loads(response.content)
             
-            # Parse date if present
+            # Parse date if present (fast path + memoization; dateparser only for the long tail)
             if entities.get('date'):
-                parsed_date = dateparser.parse(entities['date'])
+                parsed_date = resolve_date(entities['date'])
                 if parsed_date:
                     entities['parsed_date'] = parsed_date
             
@@ -59,128 +62,110 @@ Example: {"origin": "Delhi", "destination": "Mumbai", "date": "December 10th", "
             return {}
     
     def search_flights(self, origin: str, destination: str, date: datetime, passengers: int = 1) -> List[Dict]:
-        """Search for available flights"""
-        flights = []
-        airlines = ["Air India", "IndiGo", "SpiceJet", "Vistara", "Go First"]
-        
-        # Generate 3-5 flight options
-        num_flights = random.randint(3, 5)
-        base_price = random.randint(3000, 8000)
-        
-        for i in range(num_flights):
-            departure_hour = random.choice([6, 9, 12, 15, 18, 21])
-            departure_time = date.replace(hour=departure_hour, minute=random.choice([0, 15, 30, 45]))
-            duration_minutes = random.randint(90, 180)
-            arrival_time = departure_time + timedelta(minutes=duration_minutes)
-            
-            price_variation = random.randint(-1000, 2000)
-            price = base_price + price_variation + (i * 500)
-            
-            flight = {
-                "id": f"FL{random.randint(1000, 9999)}",
-                "airline": random.choice(airlines),
-                "flight_number": f"{random.choice(['6E', 'AI', 'SG', 'UK'])}{random.randint(100, 999)}",
-                "origin": origin,
-                "destination": destination,
-                "departure": departure_time.strftime("%I:%M %p"),
-                "arrival": arrival_time.strftime("%I:%M %p"),
-                "duration": f"{duration_minutes // 60}h {duration_minutes % 60}m",
-                "price": price * passengers,
-                "seats_available": random.randint(5, 50),
-                "class": "Economy"
-            }
-            flights.append(flight)
-        
-        # Sort by price
-        flights.sort(key=lambda x: x['price'])
-        return flights
+        """Cheapest flights across all providers (sorted by price, cached per normalized query)"""
+        return self._cached_search("flight", origin, destination, date, passengers)
     
     def search_trains(self, origin: str, destination: str, date: datetime, passengers: int = 1) -> List[Dict]:
-        """Search for available trains"""
-        trains = []
-        train_names = [
-            "Rajdhani Express", "Shatabdi Express", "Duronto Express",
-            "Garib Rath", "Jan Shatabdi", "Superfast Express"
-        ]
-        
-        num_trains = random.randint(3, 5)
-        base_price = random.randint(800, 2500)
-        
-        for i in range(num_trains):
-            departure_hour = random.choice([7, 10, 14, 17, 20, 23])
-            departure_time = date.replace(hour=departure_hour, minute=random.choice([0, 15, 30]))
-            duration_hours = random.randint(6, 20)
-            arrival_time = departure_time + timedelta(hours=duration_hours)
-            
-            price_variation = random.randint(-300, 800)
-            price = base_price + price_variation + (i * 200)
-            
-            train = {
-                "id": f"TR{random.randint(10000, 99999)}",
-                "name": random.choice(train_names),
-                "train_number": f"{random.randint(10000, 99999)}",
-                "origin": origin,
-                "destination": destination,
-                "departure": departure_time.strftime("%I:%M %p"),
-                "arrival": arrival_time.strftime("%I:%M %p, %d %b"),
-                "duration": f"{duration_hours}h {random.randint(0, 59)}m",
-                "price": price * passengers,
-                "seats_available": random.randint(10, 100),
-                "class": random.choice(["3AC", "2AC", "1AC", "Sleeper"])
-            }
-            trains.append(train)
-        
-        trains.sort(key=lambda x: x['price'])
-        return trains
+        """Cheapest trains across all providers (sorted by price, cached per normalized query)"""
+        return self._cached_search("train", origin, destination, date, passengers)
     
     def search_buses(self, origin: str, destination: str, date: datetime, passengers: int = 1) -> List[Dict]:
-        """Search for available buses"""
-        buses = []
-        operators = ["RedBus", "VRL Travels", "SRS Travels", "Orange Travels", "Kallada Travels"]
+        """Cheapest buses across all providers (sorted by price, cached per normalized query)"""
+        return self._cached_search("bus", origin, destination, date, passengers)
+    
+    def _cached_search(self, travel_mode: str, origin: str, destination: str, date: datetime,
+                       passengers: int) -> List[Dict]:
+        # Providers are queried concurrently behind their circuit breakers; the merged top-k is cached
+        key = search_key(travel_mode, origin, destination, date, passengers)
+        return get_search_cache().get_or_compute(
+            key, lambda: self.search_fares(travel_mode, origin, destination, date, passengers)["fares"]
+        )
+    
+    def search_many(self, travel_mode: str, queries: List[Tuple[str, str, datetime, int]]) -> ResultBatch:
+        """
+        Search many (origin, destination, date, passengers) queries in one batch
         
-        num_buses = random.randint(4, 6)
-        base_price = random.randint(500, 1500)
+        Returns columnar results; call .to_dicts(i) only for what gets presented
+        """
+        return generate(travel_mode, queries, rng=self.rng)
+    
+    def search_price_calendar(self, travel_mode: str, origin: str, destination: str, date: datetime,
+                              passengers: int = 1, window: int = 3) -> Dict:
+        """
+        Cheapest fare per day for date ± `window` days, searched as one batch
         
-        for i in range(num_buses):
-            departure_hour = random.choice([6, 9, 12, 15, 18, 21, 23])
-            departure_time = date.replace(hour=departure_hour, minute=random.choice([0, 30]))
-            duration_hours = random.randint(6, 14)
-            arrival_time = departure_time + timedelta(hours=duration_hours)
-            
-            price_variation = random.randint(-200, 400)
-            price = base_price + price_variation + (i * 150)
-            
-            bus = {
-                "id": f"BS{random.randint(1000, 9999)}",
-                "operator": random.choice(operators),
-                "bus_type": random.choice(["AC Sleeper", "AC Seater", "Non-AC Sleeper", "Volvo AC"]),
-                "origin": origin,
-                "destination": destination,
-                "departure": departure_time.strftime("%I:%M %p"),
-                "arrival": arrival_time.strftime("%I:%M %p, %d %b"),
-                "duration": f"{duration_hours}h {random.randint(0, 59)}m",
-                "price": price * passengers,
-                "seats_available": random.randint(5, 40)
-            }
-            buses.append(bus)
+        Days already in the search cache are reused and the rest are drawn in a
+        single generate() call, then cached per day, so picking a day afterwards
+        is a cache hit. Past days are skipped.
         
-        buses.sort(key=lambda x: x['price'])
-        return buses
+        Returns dict with days [{date, price, options}] and the cheapest day
+        """
+        today = now_ist().replace(hour=0, minute=0, second=0, microsecond=0)
+        center = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        days = [day for day in (center + timedelta(days=offset) for offset in range(-window, window + 1))
+                if day >= today]
+        if not days:
+            return {"days": [], "cheapest": None}
+        
+        cache = get_search_cache()
+        # Cities are resolved once; each day's key differs only in the date
+        base = search_key(travel_mode, origin, destination, None, passengers)
+        keys = [base[:3] + (day.strftime("%Y-%m-%d"),) + base[4:] for day in days]
+        options: List[List[Dict]] = [[] for _ in days]
+        prices = np.full(len(days), np.iinfo(np.int64).max, dtype=np.int64)
+        missing = []
+        for i, key in enumerate(keys):
+            # One lookup: an entry expiring between a check and a read can't cache an empty day
+            cached = cache.get(key)
+            if cached is None:
+                missing.append(i)
+                continue
+            options[i] = cached
+            if cached:
+                prices[i] = cached[0]["price"]
+        
+        if missing:
+            batch = generate(travel_mode, [(origin, destination, days[i], passengers) for i in missing], rng=self.rng)
+            prices[missing] = batch.cheapest()
+            for j, i in enumerate(missing):
+                options[i] = batch.to_dicts(j)
+                cache.put(keys[i], options[i])
+        
+        # Ranking is one argmin over the per-day minimums
+        entries = [{"date": day, "price": int(price), "options": day_options}
+                   for day, price, day_options in zip(days, prices, options)]
+        best = int(np.argmin(prices))
+        return {"days": [entry for entry in entries if entry["options"]],
+                "cheapest": entries[best] if entries[best]["options"] else None}
     
-    def book_travel(self, booking_details: Dict) -> Dict:
-        """Complete a booking"""
-        self.booking_counter += 1
-        booking_id = f"BK{self.booking_counter}"
-        
-        booking = {
-            "booking_id": booking_id,
-            "status": "CONFIRMED",
-            "booked_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            **booking_details
-        }
+    def format_price_calendar(self, calendar: Dict, travel_mode: str) -> str:
+        """Short spoken summary: the cheapest day, then the price on each day"""
+        if not calendar["cheapest"]:
+            return f"Sorry, no {travel_mode}s found around that date."
+        
+        cheapest = calendar["cheapest"]
+        per_day = ", ".join(f"{day['date'].strftime('%a %d')} ₹{day['price']:,}" for day in calendar["days"])
+        return (f"The cheapest {travel_mode} is on {cheapest['date'].strftime('%A, %d %B')} "
+                f"at ₹{cheapest['price']:,}. Day by day: {per_day}.")
+    
+    def search_fares(self, travel_mode: str, origin: str, destination: str, date: datetime,
+                     passengers: int = 1, k: int = 5) -> Dict:
+        """
+        Cheapest k fares across all providers, queried concurrently
         
-        self.bookings.append(booking)
-        return booking
+        Returns dict with fares, per-provider outcome, complete and elapsed_ms
+        """
+        from fare_aggregator import get_fare_aggregator, make_query
+        query = make_query(travel_mode, origin, destination, date, passengers)
+        return get_fare_aggregator().search(query, k=k)
+    
+    def book_travel(self, booking_details: Dict, user_id: str = "local") -> Dict:
+        """Complete a booking (persisted; IDs are allocated atomically by the store)"""
+        return self.store.add(booking_details, user_id=user_id)
+    
+    def booking_history(self, user_id: str = "local", limit: int = 20, before: Optional[int] = None) -> Dict:
+        """Newest-first page of a user's bookings; pass `before=page['next']` for more"""
+        return self.store.history(user_id=user_id, limit=limit, before=before)
     
     def format_options(self, options: List[Dict], travel_mode: str, top_n: int = 3) -> str:
         """Format search results for voice output"""
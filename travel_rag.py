@@ -3,43 +3,211 @@ RAG (Retrieval-Augmented Generation) System for Travel Information
 Uses FAISS vector store and OpenAI embeddings for semantic search
 """
 
+import hashlib
 import json
 import os
-from typing import List, Dict
-from langchain_community.vectorstores import FAISS
+import shutil
+import threading
+import time
+from typing import List, Dict, Optional
 from langchain_openai import OpenAIEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.docstore.document import Document
+from rag_index import DocumentIndex
+from hybrid_search import HybridRetriever
+
+INDEX_DIR = "data/faiss_index"
+# Bump when the document text built from travel_data.json changes shape
+DOCUMENT_FORMAT_VERSION = 2
+WATCH_INTERVAL_SECONDS = 2.0
 
 class TravelRAG:
-    def __init__(self, data_path: str = "data/travel_data.json"):
-        """Initialize RAG system with travel data"""
+    def __init__(self, data_path: str = "data/travel_data.json", embeddings=None, index_dir: str = INDEX_DIR,
+                 index_type: str = "auto"):
+        """Initialize RAG system with travel data (index_type: auto, flat, ivf, hnsw or pq)"""
         self.data_path = data_path
-        self.embeddings = OpenAIEmbeddings()
-        self.vector_store = None
+        self.index_dir = index_dir
+        self.embeddings = embeddings or OpenAIEmbeddings()
+        # Content-hashed documents; unchanged ones never hit the embeddings API again
+        self.index = DocumentIndex(self.embeddings, index_type=index_type)
+        self.retriever = None  # BM25 + vectors with metadata filters (hybrid_search)
         self.travel_data = None
+        self.startup = {}  # {"mode": "warm"/"cold", "seconds": ...}
+        self._data_digest = ""
+        self._reload_lock = threading.Lock()
+        self.dataset_path = None  # set by ingest_dataset(): retrieval then comes from that JSONL file
+        self._watcher = None
+        self._stop_watching = threading.Event()
         
         # Load and index travel data
         self._load_data()
+        self._index_routes()
         self._create_vector_store()
     
-    def _load_data(self):
-        """Load travel data from JSON"""
+    def _load_data(self) -> bool:
+        """Load travel data from JSON (a failed reload keeps the current data)"""
         try:
-            with open(self.data_path, 'r') as f:
-                self.travel_data = json.load(f)
+            with open(self.data_path, 'rb') as f:
+                raw = f.read()
+            self.travel_data = json.loads(raw)
+            self._data_digest = hashlib.sha256(raw).hexdigest()
             print(f"✅ Loaded travel data from {self.data_path}")
+            return True
         except Exception as e:
             print(f"❌ Error loading travel data: {e}")
-            self.travel_data = {"routes": [], "travel_tips": [], "popular_destinations": []}
+            if self.travel_data is None:
+                self.travel_data = {"routes": [], "travel_tips": [], "popular_destinations": []}
+            return False
+    
+    def _index_routes(self):
+        """Key routes by canonical (origin, destination) for O(1) lookup"""
+        from city_index import get_city_index
+        city_index = get_city_index()
+        routes_by_pair = {}
+        for route in self.travel_data.get("routes", []):
+            key = (city_index.canonical_name(route['origin']) or route['origin'].lower(),
+                   city_index.canonical_name(route['destination']) or route['destination'].lower())
+            routes_by_pair[key] = route
+        self.routes_by_pair = routes_by_pair  # swapped whole, so lookups never see a partial map
+    
+    def _index_key(self) -> str:
+        """Content hash of the data file + embedding model + index type (+ document format)"""
+        digest = hashlib.sha256(self._data_digest.encode())
+        model = getattr(self.embeddings, "model", type(self.embeddings).__name__)
+        digest.update(f"|{model}|{self.index.index_type}|{DOCUMENT_FORMAT_VERSION}".encode())
+        return digest.hexdigest()[:16]
+    
+    @property
+    def vector_store(self):
+        return self.index.vector_store
     
     def _create_vector_store(self):
-        """Create FAISS vector store from travel data"""
-        documents = []
+        """Load the saved FAISS index for this data + model, or build and save it"""
+        start = time.perf_counter()
+        key = self._index_key()
+        path = os.path.join(self.index_dir, key)
+        documents = self._build_documents()
         
-        # Add routes as documents
-        for route in self.travel_data.get("routes", []):
-            content = f"""
+        if os.path.isdir(path):
+            try:
+                self.index.load(path)
+                self.retriever = HybridRetriever(documents, self.index)
+                self.startup = {"mode": "warm", "seconds": time.perf_counter() - start}
+                print(f"✅ Loaded vector store {key} from disk in {self.startup['seconds'] * 1000:.0f} ms (warm start)")
+                return
+            except Exception as e:
+                print(f"⚠️ Saved vector store unusable, rebuilding: {e}")
+        
+        try:
+            stats = self.index.sync(documents)
+        except Exception as e:
+            print(f"❌ Error creating vector store: {e}")
+            # Lexical search still works without embeddings
+            self.retriever = HybridRetriever(documents)
+            return
+        self.retriever = HybridRetriever(documents, self.index)
+        self.startup = {"mode": "cold", "seconds": time.perf_counter() - start, "embedded": stats["embedded"]}
+        print(f"✅ Created vector store with {stats['total']} documents ({stats['embedded']} embedded, "
+              f"rest from cache) in {self.startup['seconds']:.2f}s (cold start)")
+        self._save_vector_store(path)
+    
+    def reload(self) -> Optional[Dict]:
+        """
+        Re-read the data file and hot-swap the index
+        
+        Only new or edited documents are embedded and removed ones are deleted
+        in place; searches keep using the previous index until the swap. The
+        route planner's graph is synced under the same lock. Returns the sync
+        stats, or None if the file could not be loaded (or the index is an
+        ingested dataset, which only re-ingesting changes).
+        """
+        with self._reload_lock:
+            if not self._load_data():
+                return None
+            self._index_routes()
+            if self.dataset_path:
+                from route_planner import get_route_graph
+                get_route_graph().sync(self.travel_data.get("routes", []))
+                return None
+            documents = self._build_documents()
+            try:
+                stats = self.index.sync(documents)
+            except Exception as e:
+                print(f"❌ Error updating vector store: {e}")
+                return None
+            self.retriever = HybridRetriever(documents, self.index)
+            # Multi-leg plans follow the same edit (only changed routes are re-weighted)
+            from route_planner import get_route_graph
+            from search_cache import get_search_cache
+            stats["routes_changed"] = get_route_graph().sync(self.travel_data.get("routes", []))["changed"]
+            get_search_cache().invalidate("route_info")
+            print(f"🔄 Reloaded travel data: +{stats['added']} -{stats['removed']} documents "
+                  f"({stats['embedded']} embedded, {stats['routes_changed']} routes re-planned) "
+                  f"in {stats['seconds'] * 1000:.0f} ms")
+            self._save_vector_store(os.path.join(self.index_dir, self._index_key()))
+            return stats
+    
+    def ingest_dataset(self, path: str, text_field: str = "text") -> Dict:
+        """
+        Serve retrieval from a large JSONL dataset (national route and station lists)
+        
+        The file is streamed into a trained ANN index (rag_ingest) rather than
+        loaded as documents, so retrieval becomes vector-only and metadata
+        filters are not applied. Route lookups and the planner still come
+        from the data file. Returns the ingest stats.
+        """
+        from rag_ingest import ingest_jsonl
+        with self._reload_lock:
+            stats = ingest_jsonl(self.index, path, text_field)
+            self.dataset_path = path
+            self.retriever = None
+        print(f"✅ Ingested {stats['documents']:,} documents from {path} into a {stats['index_type']} index "
+              f"in {stats['seconds']:.1f}s")
+        return stats
+    
+    def watch(self, interval: float = WATCH_INTERVAL_SECONDS):
+        """Reload whenever the data file changes (polls its mtime on a daemon thread)"""
+        if self._watcher:
+            return
+        
+        def modified() -> float:
+            try:
+                return os.path.getmtime(self.data_path)
+            except OSError:
+                return 0.0
+        
+        def poll():
+            last = modified()
+            while not self._stop_watching.wait(interval):
+                current = modified()
+                if current != last:
+                    last = current
+                    self.reload()
+        
+        self._watcher = threading.Thread(target=poll, name="travel-rag-watch", daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self):
+        self._stop_watching.set()
+    
+    def _save_vector_store(self, path: str):
+        """Write the index next to its key; indexes for older keys are removed"""
+        temp_path = f"{path}.tmp"
+        try:
+            shutil.rmtree(temp_path, ignore_errors=True)
+            self.index.save(temp_path)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(temp_path, path)
+            for name in os.listdir(self.index_dir):
+                if name != os.path.basename(path):
+                    shutil.rmtree(os.path.join(self.index_dir, name), ignore_errors=True)
+        except OSError as e:
+            print(f"⚠️ Could not save vector store: {e}")
+    
+    @staticmethod
+    def _route_text(route: Dict) -> str:
+        """The structured route record as text (also the route document's content)"""
+        content = f"""
 Route: {route['origin']} to {route['destination']}
 Distance: {route['distance_km']} km
 Available modes: {', '.join(route['modes'])}
@@ -49,13 +217,21 @@ Available modes: {', '.join(route['modes'])}
 Popular times: {', '.join(route['popular_times'])}
 Tips: {route['tips']}
 """
+        return content.strip()
+    
+    def _build_documents(self) -> List[Document]:
+        """Routes, tips and destinations as documents"""
+        documents = []
+        
+        # Add routes as documents
+        for route in self.travel_data.get("routes", []):
             metadata = {
                 "type": "route",
                 "origin": route['origin'],
                 "destination": route['destination'],
                 "modes": route['modes']
             }
-            documents.append(Document(page_content=content.strip(), metadata=metadata))
+            documents.append(Document(page_content=self._route_text(route), metadata=metadata))
         
         # Add travel tips as documents
         for tip in self.travel_data.get("travel_tips", []):
@@ -77,29 +253,28 @@ Popular routes from: {', '.join(dest['travel_from'])}
                 metadata={"type": "destination", "city": dest['city']}
             ))
         
-        # Create vector store
-        try:
-            self.vector_store = FAISS.from_documents(documents, self.embeddings)
-            print(f"✅ Created vector store with {len(documents)} documents")
-        except Exception as e:
-            print(f"❌ Error creating vector store: {e}")
+        return documents
     
-    def retrieve_travel_info(self, query: str, k: int = 3) -> List[Dict]:
+    def retrieve_travel_info(self, query: str, k: int = 3, filters: Optional[Dict] = None) -> List[Dict]:
         """
-        Retrieve relevant travel information using semantic search
+        Retrieve relevant travel information using hybrid (BM25 + vector) search
         
         Args:
             query: User's travel query
             k: Number of results to return
+            filters: Metadata the results must match, applied before ranking,
+                e.g. {"type": "route", "cities": ["Delhi", "Goa"], "modes": "train"}
             
         Returns:
             List of relevant documents with content and metadata
         """
-        if not self.vector_store:
-            return []
+        if not self.retriever:
+            # Ingested dataset: nearest neighbours straight from the ANN index
+            return [{"content": doc.page_content, "metadata": doc.metadata}
+                    for doc in self.index.similarity_search(query, k=k)] if self.dataset_path else []
         
         try:
-            results = self.vector_store.similarity_search(query, k=k)
+            results = [doc for doc, _ in self.retriever.search(query, k=k, filters=filters)]
             return [
                 {
                     "content": doc.page_content,
@@ -111,36 +286,58 @@ Popular routes from: {', '.join(dest['travel_from'])}
             print(f"❌ Error retrieving info: {e}")
             return []
     
+    def retrieve_many(self, queries: List[str], k: int = 3, filters: Optional[Dict] = None) -> List[List[Dict]]:
+        """retrieve_travel_info for a batch of queries (one embeddings call for all misses)"""
+        try:
+            self.index.embeddings.embed_queries(queries)
+        except Exception as e:
+            print(f"⚠️ Batch query embedding failed: {e}")
+        return [self.retrieve_travel_info(query, k=k, filters=filters) for query in queries]
+    
+    def query_cache_stats(self) -> Dict:
+        """Hit rate and memory use of the query-embedding cache"""
+        return self.index.embeddings.queries.info()
+    
     def get_route_info(self, origin: str, destination: str) -> Dict:
-        """Get specific route information"""
-        for route in self.travel_data.get("routes", []):
-            if (route['origin'].lower() == origin.lower() and 
-                route['destination'].lower() == destination.lower()):
-                return route
-        return None
+        """Get specific route information (aliases and misspellings resolve too)"""
+        from city_index import get_city_index
+        city_index = get_city_index()
+        key = (city_index.canonical_name(origin) or origin.lower(),
+               city_index.canonical_name(destination) or destination.lower())
+        return self.routes_by_pair.get(key)
+    
+    def plan_itinerary(self, origin: str, destination: str, metric: str = "fastest") -> Optional[Dict]:
+        """Multi-leg itinerary (fastest, cheapest or shortest) over all known routes"""
+        from route_planner import get_route_graph
+        return get_route_graph().plan(origin, destination, metric)
     
     def get_route_suggestions(self, origin: str, destination: str) -> str:
         """Get AI-enhanced route suggestions using RAG"""
+        # Known route: answer from the structured record, no retrieval needed
+        route = self.get_route_info(origin, destination)
+        if route:
+            return self._route_text(route)
+        
+        # No direct route: suggest connections instead
+        from route_planner import format_itinerary
+        plan = self.plan_itinerary(origin, destination)
+        if plan:
+            return format_itinerary(plan)
+        
         query = f"Travel from {origin} to {destination}"
-        results = self.retrieve_travel_info(query, k=2)
+        results = self.retrieve_travel_info(query, k=2, filters={"type": "route", "cities": [origin, destination]})
         
         if not results:
             return f"I don't have specific information about traveling from {origin} to {destination}."
         
-        # Combine retrieved information
-        info_parts = []
-        for result in results:
-            if result['metadata'].get('type') == 'route':
-                info_parts.append(result['content'])
-        
-        return "\n\n".join(info_parts) if info_parts else "No route information found."
+        return "\n\n".join(result['content'] for result in results)
     
     def get_travel_tips(self, location: str = None) -> List[str]:
         """Get general or location-specific travel tips"""
         if location:
             query = f"Travel tips for {location}"
-            results = self.retrieve_travel_info(query, k=3)
-            return [r['content'] for r in results if 'tip' in r['content'].lower()]
+            results = self.retrieve_travel_info(query, k=3, filters={"type": "tip"})
+            return [r['content'] for r in results]
         else:
             return self.travel_data.get("travel_tips", [])[:5]
 
@@ -152,4 +349,28 @@ def get_travel_rag() -> TravelRAG:
     global _travel_rag_instance
     if _travel_rag_instance is None:
         _travel_rag_instance = TravelRAG()
+        _travel_rag_instance.watch()
     return _travel_rag_instance
+
+def cached_route_info(origin: str, destination: str) -> Dict:
+    """Route record and suggestions through the shared search cache (key: route only)"""
+    from search_cache import get_search_cache, search_key
+    
+    def compute() -> Dict:
+        rag = get_travel_rag()
+        return {"route": rag.get_route_info(origin, destination),
+                "suggestions": rag.get_route_suggestions(origin, destination)}
+    
+    return get_search_cache().get_or_compute(search_key("route_info", origin, destination, None), compute)
+
+if __name__ == "__main__":
+    import sys
+    
+    # python travel_rag.py --cold: drop the saved index first to time a full rebuild
+    if "--cold" in sys.argv:
+        shutil.rmtree(INDEX_DIR, ignore_errors=True)
+    timings = []
+    for _ in range(2):
+        rag = TravelRAG()
+        timings.append(rag.startup)
+    print(f"\nStartup: first {timings[0]}, second {timings[1]}")
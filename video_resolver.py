@@ -0,0 +1,202 @@
+"""
+Video Resolver - query -> YouTube video ID with early-exit streaming
+The search results page is stream-read and the connection is dropped at the
+first "videoId" match instead of downloading the whole (1MB+) page. Results
+are cached with a TTL, recently played artists are prefetched, and bytes
+transferred / latency are recorded for every upstream request.
+"""
+
+import os
+import re
+import threading
+import time
+import urllib.parse
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+YOUTUBE_BASE_URL = os.getenv("YOUTUBE_BASE_URL", "https://www.youtube.com")
+
+CACHE_TTL_SECONDS = 24 * 3600
+CACHE_MAX_ENTRIES = 500
+CHUNK_SIZE = 16 * 1024
+MAX_BYTES = 4 * 1024 * 1024
+REQUEST_TIMEOUT = 5
+PREFETCH_ARTISTS = 3
+
+VIDEO_ID_PATTERN = re.compile(rb'"videoId":"([A-Za-z0-9_-]{11})"')
+
+# Words stripped from a query to guess the artist being played
+_NON_ARTIST_WORDS = re.compile(r'\b(songs?|music|video|latest|new|top|hits?|best|full|audio|lyrics?)\b')
+
+def normalize_query(query: str) -> str:
+    return re.sub(r'\s+', ' ', query.lower()).strip()
+
+def guess_artist(query: str) -> Optional[str]:
+    """'tum hi ho by arijit singh' -> 'arijit singh'; 'arijit singh songs' -> 'arijit singh'"""
+    query = normalize_query(query)
+    match = re.search(r'\bby (.+)$', query)
+    if match:
+        return match.group(1).strip()
+    stripped = re.sub(r'\s+', ' ', _NON_ARTIST_WORDS.sub(' ', query)).strip()
+    stripped = re.sub(r'^(of|the|by) ', '', stripped)
+    # Only treat short queries as artist names
+    if stripped and stripped != query and len(stripped.split()) <= 3:
+        return stripped
+    return None
+
+class VideoResolver:
+    """Cached YouTube search -> video ID resolver"""
+
+    def __init__(self, base_url: str = YOUTUBE_BASE_URL, ttl: float = CACHE_TTL_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # query -> (video_id, resolved_at)
+        self._lock = threading.Lock()
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._artists = Counter()
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="video-prefetch")
+        # Per-request metrics: query, bytes, latency_ms, found, cached
+        self.requests: deque = deque(maxlen=200)
+
+    @property
+    def session(self):
+        """Keep-alive session, created on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    session = requests.Session()
+                    session.headers["User-Agent"] = "Mozilla/5.0"
+                    self._session = session
+        return self._session
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Video ID for a search query, from cache when fresh"""
+        key = normalize_query(query)
+        start = time.perf_counter()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and time.time() - entry[1] < self.ttl:
+                self._cache.move_to_end(key)
+                self.requests.append({
+                    "query": key, "bytes": 0, "found": True, "cached": True,
+                    "latency_ms": (time.perf_counter() - start) * 1000,
+                })
+                return entry[0]
+
+        video_id = self._fetch(key)
+        if video_id:
+            with self._lock:
+                self._cache[key] = (video_id, time.time())
+                self._cache.move_to_end(key)
+                while len(self._cache) > CACHE_MAX_ENTRIES:
+                    self._cache.popitem(last=False)
+        return video_id
+
+    def _fetch(self, query: str) -> Optional[str]:
+        """Stream the results page and stop at the first video ID"""
+        url = f"{self.base_url}/results?search_query={urllib.parse.quote(query)}"
+        start = time.perf_counter()
+        received = 0
+        video_id = None
+        tail = b""
+        try:
+            with self.session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    received += len(chunk)
+                    # Keep a small overlap so a match split across chunks is found
+                    buffer = tail + chunk
+                    match = VIDEO_ID_PATTERN.search(buffer)
+                    if match:
+                        video_id = match.group(1).decode()
+                        break
+                    tail = buffer[-64:]
+                    if received > MAX_BYTES:
+                        break
+        except Exception as e:
+            print(f"⚠️ Video lookup failed for '{query}': {e}")
+
+        self.requests.append({
+            "query": query, "bytes": received, "found": video_id is not None, "cached": False,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+        })
+        return video_id
+
+    # ------------------------------------------------------------------
+    # Prefetching
+    # ------------------------------------------------------------------
+
+    def note_played(self, query: str):
+        """Record a played query and prefetch for the most played artists"""
+        artist = guess_artist(query)
+        if not artist:
+            return
+        with self._lock:
+            self._artists[artist] += 1
+            top = [a for a, _ in self._artists.most_common(PREFETCH_ARTISTS)]
+        for name in top:
+            self.prefetch([f"{name} songs", f"{name} latest song"])
+
+    def prefetch(self, queries: List[str]):
+        for query in queries:
+            key = normalize_query(query)
+            with self._lock:
+                entry = self._cache.get(key)
+                if entry and time.time() - entry[1] < self.ttl:
+                    continue
+            self._prefetch_pool.submit(self.resolve, key)
+
+    def stats(self) -> Dict:
+        """Aggregate metrics over the recent requests"""
+        requests = list(self.requests)
+        upstream = [r for r in requests if not r["cached"]]
+        return {
+            "requests": len(requests),
+            "cache_hits": len(requests) - len(upstream),
+            "upstream": len(upstream),
+            "avg_bytes": sum(r["bytes"] for r in upstream) / len(upstream) if upstream else 0,
+            "avg_upstream_ms": sum(r["latency_ms"] for r in upstream) / len(upstream) if upstream else 0,
+        }
+
+# Singleton instance
+_video_resolver_instance = None
+_video_resolver_lock = threading.Lock()
+
+def get_video_resolver() -> VideoResolver:
+    """Get or create VideoResolver singleton instance"""
+    global _video_resolver_instance
+    if _video_resolver_instance is None:
+        with _video_resolver_lock:
+            if _video_resolver_instance is None:
+                _video_resolver_instance = VideoResolver()
+    return _video_resolver_instance
+
+if __name__ == "__main__":
+    # Demo against a local page: the match sits near the top of a 2MB body
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    page = b"<html>" + b"x" * 50000 + b'"videoId":"dQw4w9WgXcQ"' + b"y" * 2000000
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            try:
+                self.wfile.write(page)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    resolver = VideoResolver(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+
+    for query in ["tum hi ho by arijit singh", "Tum hi ho by Arijit Singh"]:
+        print(f"{query!r} -> {resolver.resolve(query)}  {resolver.requests[-1]}")
+    print(f"Page size: {len(page)} bytes, stats: {resolver.stats()}")
+    server.shutdown()
@@ -1,3 +1,6 @@
+import time
+_PROCESS_START = time.perf_counter()
+
 import speech_recognition as sr
 import pyttsx3
 from typing import TypedDict, Annotated, Optional
@@ -6,10 +9,8 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langgraph.checkpoint.memory import MemorySaver
 import operator
-import webbrowser
 import os
 from dotenv import load_dotenv
-import time
 import urllib.parse
 import subprocess
 import platform
@@ -19,15 +20,13 @@ import json
 import re
 import threading
 from pathlib import Path
-import psutil
-import requests
 from typing import Dict, List
 import tempfile
+import importlib.util
+from io import BytesIO
 from openai import OpenAI
 
-# Travel booking imports
-from travel_booking import get_booking_service
-from travel_rag import get_travel_rag
+# Travel booking nodes (booking/RAG services are imported lazily on first use)
 from booking_nodes import (
     detect_booking_intent_node,
     extract_entities_node,
@@ -37,7 +36,12 @@ from booking_nodes import (
     confirm_booking_node
 )
 from language_support import detect_language_change
-from advanced_skills import detect_and_execute_skill
+from skill_registry import get_skill_registry, report_cold_start, NETWORK_SKILL_DEADLINE
+from scheduler import get_scheduler
+from skill_executor import get_skill_executor
+from system_monitor import get_system_monitor, format_system_status
+from browser_launcher import open_url
+from session_manager import get_session_manager
 
 load_dotenv()
 
@@ -53,19 +57,36 @@ recognizer.pause_threshold = 0.8
 # Text-to-speech setup
 tts_engine = None
 tts_lock = threading.Lock()
-USE_GTTS = True
-
-try:
-    from gtts import gTTS
-    from io import BytesIO
-    import pygame
-    pygame.mixer.init()
-    USE_GTTS = True
-    print("✅ Google TTS (gTTS) loaded")
-except ImportError:
-    USE_GTTS = False
+
+# gTTS + pygame are only located here; they are imported and the mixer is
+# initialized on first speech (see ensure_audio_output) to keep startup fast
+USE_GTTS = all(importlib.util.find_spec(m) is not None for m in ("gtts", "pygame"))
+gTTS = None
+pygame = None
+
+if USE_GTTS:
+    print("✅ Google TTS (gTTS) available")
+else:
     print("⚠️  gTTS not available, using pyttsx3")
 
+def ensure_audio_output() -> bool:
+    """Import gTTS/pygame and initialize the mixer on first use"""
+    global gTTS, pygame, USE_GTTS
+    
+    if pygame is not None:
+        return True
+    
+    try:
+        from gtts import gTTS as _gTTS
+        import pygame as _pygame
+        _pygame.mixer.init()
+        gTTS, pygame = _gTTS, _pygame
+        return True
+    except Exception as e:
+        USE_GTTS = False
+        print(f"⚠️  gTTS unavailable ({e}), using pyttsx3")
+        return False
+
 def init_tts_engine():
     """Initialize TTS engine"""
     global tts_engine
@@ -111,9 +132,11 @@ def init_tts_engine():
 
 init_tts_engine()
 
-# Reminder system
-reminders = []
-reminder_lock = threading.Lock()
+# Reminder system: timers and reminders share one scheduler thread
+get_scheduler().add_listener("*", lambda task: announce_scheduled_task(task))
+
+# Network-bound skills that miss their deadline are spoken when they finish
+get_skill_executor().on_late_result = lambda name, result: speak_text(result)
 
 # Speech interrupt flag
 is_speaking = False
@@ -139,7 +162,10 @@ SUPPORTED_LANGUAGES = {
 # Current language (default: English)
 current_language = "english"
 
-# Conversation context
+# The CLI is a single local user (same ID the booking store defaults to)
+LOCAL_SESSION_ID = "local"
+
+# Conversation context (main() rebinds this to the local session's context)
 conversation_context = {
     "last_search": None,
     "last_location": None,
@@ -155,6 +181,7 @@ class ConversationState(TypedDict):
     iteration_count: int
     response_to_speak: str
     context: dict
+    session_id: str  # keys per-user state such as booking prefetches
     # Language field
     language: str  # Current conversation language
     # Booking fields
@@ -204,7 +231,7 @@ def speak_text(text: str, priority: bool = False, language: str = None):
             text = re.sub(r'\*+', '', text)
             text = text.replace("_", " ")
             
-            if USE_GTTS:
+            if USE_GTTS and ensure_audio_output():
                 try:
                     tts = gTTS(text=text, lang=lang_code, slow=False)
                     fp = BytesIO()
@@ -250,19 +277,20 @@ def get_weather(city: str = "Delhi") -> str:
     try:
         api_key = os.getenv("OPENWEATHER_API_KEY")
         if api_key:
-            url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-            response = requests.get(url, timeout=5)
-            data = response.json()
-            
-            if response.status_code == 200:
+            from weather_service import get_weather_service
+            try:
+                data = get_weather_service().get_openweather(city, api_key)
+                
                 temp = data['main']['temp']
                 feels_like = data['main']['feels_like']
                 description = data['weather'][0]['description']
                 humidity = data['main']['humidity']
                 
                 return f"Weather in {city}: {temp}°C, feels like {feels_like}°C. {description}. Humidity: {humidity}%"
+            except Exception as e:
+                print(f"⚠️ OpenWeather error: {e}")
         
-        webbrowser.open(f"https://www.google.com/search?q=weather+in+{city}")
+        open_url(f"https://www.google.com/search?q=weather+in+{city}")
         return f"Opening weather information for {city}"
     except Exception as e:
         return f"Sorry, couldn't fetch weather. Opening web search."
@@ -272,10 +300,10 @@ def get_news(topic: str = "latest") -> str:
     try:
         if topic and topic != "latest":
             search_url = f"https://news.google.com/search?q={urllib.parse.quote(topic)}"
-            webbrowser.open(search_url)
+            open_url(search_url)
             return f"Opening latest news about {topic}"
         else:
-            webbrowser.open("https://news.google.com")
+            open_url("https://news.google.com")
             return "Opening latest news for you"
     except Exception as e:
         return f"Sorry, couldn't fetch news."
@@ -284,27 +312,16 @@ def search_web(query: str) -> str:
     """Web search"""
     try:
         search_url = f"https://www.google.com/search?q={urllib.parse.quote(query)}"
-        webbrowser.open(search_url)
+        open_url(search_url)
         conversation_context["last_search"] = query
         return f"Searching for: {query}"
     except Exception as e:
         return f"Sorry, search failed."
 
 def get_system_info() -> str:
-    """Get system information"""
+    """Get system information from the background sampler (never blocks)"""
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        battery = psutil.sensors_battery()
-        
-        info = f"CPU usage: {cpu_percent}%. Memory usage: {memory.percent}%."
-        
-        if battery:
-            info += f" Battery: {battery.percent}%"
-            if battery.power_plugged:
-                info += " (charging)"
-        
-        return info
+        return format_system_status(get_system_monitor().latest())
     except Exception as e:
         return "Sorry, couldn't fetch system information"
 
@@ -348,34 +365,17 @@ def open_application(app_name: str) -> str:
 
 def set_reminder(reminder_text: str, minutes_from_now: int) -> str:
     """Set a reminder"""
-    global reminders
-    
-    reminder_time = datetime.now() + timedelta(minutes=minutes_from_now)
-    reminder_data = {
-        "text": reminder_text,
-        "time": reminder_time,
-        "triggered": False
-    }
-    
-    with reminder_lock:
-        reminders.append(reminder_data)
-    
-    threading.Thread(target=trigger_reminder, args=(reminder_data,), daemon=True).start()
+    task = get_scheduler().schedule_in(minutes_from_now * 60, reminder_text, kind="reminder")
     
-    time_str = reminder_time.strftime('%I:%M %p')
+    time_str = datetime.fromtimestamp(task["due"]).strftime('%I:%M %p')
     return f"Reminder set for {time_str}: {reminder_text}"
 
-def trigger_reminder(reminder_data: dict):
-    """Trigger reminder at specified time"""
-    time_diff = (reminder_data["time"] - datetime.now()).total_seconds()
-    if time_diff > 0:
-        time.sleep(time_diff)
-    
-    if not reminder_data["triggered"]:
-        reminder_data["triggered"] = True
-        message = f"⏰ REMINDER: {reminder_data['text']}"
-        print(f"\n{message}")
-        speak_text(message, priority=True)
+def announce_scheduled_task(task: dict):
+    """Speak a timer or reminder when the scheduler fires it"""
+    label = "REMINDER" if task["kind"] == "reminder" else "TIMER"
+    message = f"⏰ {label}: {task['message']}"
+    print(f"\n{message}")
+    speak_text(message, priority=True)
 
 def play_music(song_name: str, platform: str = "youtube") -> str:
     """Play music"""
@@ -383,12 +383,12 @@ def play_music(song_name: str, platform: str = "youtube") -> str:
         if platform == "spotify":
             query = urllib.parse.quote(song_name)
             spotify_url = f"https://open.spotify.com/search/{query}"
-            webbrowser.open(spotify_url)
+            open_url(spotify_url)
             return f"Playing {song_name} on Spotify"
         else:
             query = urllib.parse.quote(song_name)
             youtube_url = f"https://www.youtube.com/results?search_query={query}"
-            webbrowser.open(youtube_url)
+            open_url(youtube_url)
             return f"Playing {song_name} on YouTube"
     except Exception as e:
         return f"Music playback failed"
@@ -405,7 +405,7 @@ def execute_command(text: str) -> Optional[str]:
     if "weather" in text_lower:
         match = re.search(r'weather (?:in |at |for )?(.+?)(?:\s|$)', text_lower)
         city = match.group(1).strip() if match else "Delhi"
-        return get_weather(city)
+        return get_skill_executor().run("weather", get_weather, city, deadline=NETWORK_SKILL_DEADLINE)
     
     # News
     if "news" in text_lower:
@@ -457,7 +457,7 @@ def execute_command(text: str) -> Optional[str]:
     if "open" in text_lower:
         for site, url in websites.items():
             if site in text_lower:
-                webbrowser.open(url)
+                open_url(url)
                 return f"Opening {site.title()}"
     
     # Music
@@ -592,7 +592,7 @@ def process_input_node(state: ConversationState) -> ConversationState:
     user_input = state["user_input"]
     
     # First, check if this is an advanced skill command
-    skill_response = detect_and_execute_skill(user_input)
+    skill_response = get_skill_registry().dispatch(user_input)
     if skill_response:
         state["response_to_speak"] = skill_response
         state["skip_processing"] = True
@@ -784,7 +784,7 @@ def create_conversation_graph():
 
 def main():
     """Main voice assistant loop with continuous listening"""
-    global stop_speaking, is_speaking
+    global stop_speaking, is_speaking, conversation_context, current_language
     
     print("\n" + "="*60)
     print("🎙️  VOICE ASSISTANT (CONTINUOUS LISTENING)")
@@ -804,19 +804,23 @@ def main():
     # Conversation state
     config = {"configurable": {"thread_id": "voice_assistant_session"}}
     
-    # Persistent booking state across turns
-    persistent_booking_state = {
-        "booking_intent": None,
-        "booking_data": {},
-        "booking_step": "initial",
-        "search_results": [],
-        "selected_option": None
-    }
+    # Booking state, language and context persist in the session (and across restarts)
+    sessions = get_session_manager()
+    with sessions.session(LOCAL_SESSION_ID) as session:
+        conversation_context = session.context
+        current_language = session.language
+    
+    # Start sampling system/self metrics in the background
+    get_system_monitor()
     
     # Main continuous listening loop
+    first_listen = True
     while True:
         try:
             print("\n🎤 Listening... (Speak now)")
+            if first_listen:
+                report_cold_start(_PROCESS_START)
+                first_listen = False
             
             # Listen for user command directly
             user_input = listen_for_speech_whisper()
@@ -830,31 +834,28 @@ def main():
                 print("\n👋 Assistant stopped")
                 break
             
-            # Process through graph - use persistent booking state and language
-            initial_state: ConversationState = {
-                "messages": [],
-                "user_input": user_input,
-                "should_continue": True,
-                "skip_processing": False,
-                "iteration_count": 0,
-                "response_to_speak": "",
-                "context": conversation_context,
-                "language": current_language,  # Current language
-                # Use persistent booking fields
-                **persistent_booking_state
-            }
-            
-            # Run conversation graph
-            final_state = app.invoke(initial_state, config)
-            
-            # Update persistent booking state from final state
-            persistent_booking_state = {
-                "booking_intent": final_state.get("booking_intent"),
-                "booking_data": final_state.get("booking_data", {}),
-                "booking_step": final_state.get("booking_step", "initial"),
-                "search_results": final_state.get("search_results", []),
-                "selected_option": final_state.get("selected_option")
-            }
+            with sessions.session(LOCAL_SESSION_ID) as session:
+                # Process through graph - use the session's booking state and language
+                initial_state: ConversationState = {
+                    "messages": [],
+                    "user_input": user_input,
+                    "should_continue": True,
+                    "skip_processing": False,
+                    "iteration_count": 0,
+                    "response_to_speak": "",
+                    "context": session.context,
+                    "session_id": session.session_id,
+                    "language": current_language,  # Current language
+                    # Use persistent booking fields
+                    **session.booking_state()
+                }
+                
+                # Run conversation graph
+                final_state = app.invoke(initial_state, config)
+                
+                # Keep the booking state for the next turn
+                session.update_booking(final_state)
+                session.add_turn(user_input, final_state.get("response_to_speak"))
                 
         except KeyboardInterrupt:
             print("\n\n👋 Assistant stopped by user")
@@ -864,6 +865,9 @@ def main():
             print(f"\n❌ Error: {e}")
             speak_text("Sorry, I encountered an error.")
             time.sleep(1)
+    
+    # Keep an unfinished booking for the next run
+    sessions.flush()
 
 # Entry point
 if __name__ == "__main__":
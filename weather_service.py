@@ -0,0 +1,246 @@
+"""
+Weather Service - shared keep-alive HTTP session with a TTL cache
+One upstream fetch per city per TTL window serves both current conditions
+and forecasts; stale entries are served while a background refresh runs,
+and concurrent asks for the same city are coalesced into one request.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+
+WTTR_BASE_URL = os.getenv("WTTR_BASE_URL", "https://wttr.in")
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org")
+
+# Fresh for 10 minutes, then served stale (and refreshed) for another 50
+DEFAULT_TTL_SECONDS = 600
+DEFAULT_STALE_SECONDS = 3000
+REQUEST_TIMEOUT = 5
+
+class WeatherService:
+    """Cached, coalescing weather fetcher over one pooled requests.Session"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, stale_ttl: float = DEFAULT_STALE_SECONDS,
+                 wttr_base_url: str = WTTR_BASE_URL, openweather_base_url: str = OPENWEATHER_BASE_URL):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.wttr_base_url = wttr_base_url.rstrip("/")
+        self.openweather_base_url = openweather_base_url.rstrip("/")
+        self._session = None
+        self._cache: Dict[Tuple, Tuple[float, Dict]] = {}  # key -> (fetched_at, payload)
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._session_lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0}
+
+    @property
+    def session(self):
+        """Keep-alive session, created on first use"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    # ------------------------------------------------------------------
+    # Providers
+    # ------------------------------------------------------------------
+
+    def get_wttr(self, city: str) -> Dict:
+        """wttr.in j1 payload (current_condition + weather forecast days)"""
+        key = ("wttr", city.strip().lower())
+        url = f"{self.wttr_base_url}/{city.strip()}"
+        return self._get(key, url, {"format": "j1"})
+
+    def get_openweather(self, city: str, api_key: str) -> Dict:
+        """OpenWeather current conditions in metric units"""
+        key = ("openweather", city.strip().lower())
+        url = f"{self.openweather_base_url}/data/2.5/weather"
+        return self._get(key, url, {"q": city.strip(), "appid": api_key, "units": "metric"})
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _get(self, key: Tuple, url: str, params: Dict) -> Dict:
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry:
+                age = now - entry[0]
+                if age < self.ttl:
+                    self.stats["hits"] += 1
+                    return entry[1]
+                if age < self.ttl + self.stale_ttl:
+                    # Stale-while-revalidate: answer now, refresh in the background
+                    self.stats["stale_hits"] += 1
+                    if key not in self._inflight:
+                        self._start_fetch(key, url, params, background=True)
+                    return entry[1]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                self.stats["misses"] += 1
+                future = self._start_fetch(key, url, params, background=False)
+            else:
+                self.stats["coalesced"] += 1
+
+        if owner:
+            # The first caller performs the request outside the lock
+            self._fetch(key, url, params, future)
+        return future.result(timeout=REQUEST_TIMEOUT * 2)
+
+    def _start_fetch(self, key: Tuple, url: str, params: Dict, background: bool) -> Future:
+        """Register an in-flight fetch (caller holds the lock)"""
+        future = Future()
+        self._inflight[key] = future
+        if background:
+            threading.Thread(target=self._fetch, args=(key, url, params, future), daemon=True).start()
+        return future
+
+    def _fetch(self, key: Tuple, url: str, params: Dict, future: Future):
+        try:
+            with self._lock:
+                self.stats["upstream_calls"] += 1
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            payload = response.json()
+            with self._lock:
+                self._cache[key] = (time.time(), payload)
+            future.set_result(payload)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+# Singleton instance
+_weather_service_instance = None
+_weather_service_lock = threading.Lock()
+
+def get_weather_service() -> WeatherService:
+    """Get or create WeatherService singleton instance"""
+    global _weather_service_instance
+    if _weather_service_instance is None:
+        with _weather_service_lock:
+            if _weather_service_instance is None:
+                _weather_service_instance = WeatherService()
+    return _weather_service_instance
+
+# ============================================================================
+# LOCAL STUB SERVER
+# ============================================================================
+
+class StubWeatherServer:
+    """
+    Local HTTP server answering wttr.in and OpenWeather style requests
+
+    Usage:
+        with StubWeatherServer(latency=0.2) as stub:
+            service = WeatherService(wttr_base_url=stub.url, openweather_base_url=stub.url)
+            ...
+            stub.hits  # number of upstream requests received
+    """
+
+    def __init__(self, latency: float = 0.0, port: int = 0):
+        self.latency = latency
+        self.hits = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub._lock:
+                    stub.hits += 1
+                time.sleep(stub.latency)
+                path = self.path.split("?")[0]
+                if path.startswith("/data/2.5/weather"):
+                    body = stub.openweather_payload()
+                else:
+                    body = stub.wttr_payload(path.strip("/"))
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    @staticmethod
+    def wttr_payload(city: str) -> Dict:
+        day = lambda date, lo, hi: {
+            "date": date, "mintempC": str(lo), "maxtempC": str(hi),
+            "hourly": [{"weatherDesc": [{"value": "Sunny"}]}],
+        }
+        return {
+            "current_condition": [{
+                "temp_C": "30", "FeelsLikeC": "33", "humidity": "40",
+                "weatherDesc": [{"value": "Sunny"}],
+            }],
+            "weather": [day("2024-12-25", 18, 29), day("2024-12-26", 17, 28), day("2024-12-27", 19, 30)],
+        }
+
+    @staticmethod
+    def openweather_payload() -> Dict:
+        return {
+            "main": {"temp": 30, "feels_like": 33, "humidity": 40},
+            "weather": [{"description": "clear sky"}],
+        }
+
+    def start(self) -> "StubWeatherServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == "__main__":
+    # Demo against the stub: 20 simultaneous asks for one city, then repeats
+    from concurrent.futures import ThreadPoolExecutor
+
+    with StubWeatherServer(latency=0.3) as stub:
+        service = WeatherService(wttr_base_url=stub.url, openweather_base_url=stub.url)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            list(pool.map(lambda _: service.get_wttr("Delhi"), range(20)))
+        print(f"20 concurrent lookups: {(time.perf_counter() - start) * 1000:.0f} ms, upstream hits: {stub.hits}")
+
+        start = time.perf_counter()
+        for _ in range(100):
+            service.get_wttr("Delhi")
+        print(f"100 cached lookups: {(time.perf_counter() - start) * 1000:.1f} ms, upstream hits: {stub.hits}")
+        print(f"Stats: {service.stats}")